@@ -2,9 +2,13 @@ from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
-from typing import Optional
+from collections import OrderedDict
+from typing import Optional, Tuple
 from pydantic import BaseModel
+import threading
+import time
 
+from app import config
 from app.models.schemas import TokenResponse, AuthStatus
 
 # Constants for JWT
@@ -12,6 +16,10 @@ SECRET_KEY = "YOUR_SECRET_KEY_HERE"  # In production, use environment variable
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
+# Constants for the verified token cache
+TOKEN_CACHE_SIZE = 1024
+TOKEN_CACHE_TTL = 60  # seconds
+
 router = APIRouter(tags=["authentication"])
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
@@ -26,6 +34,78 @@ class User(BaseModel):
 fake_users_db = {}
 
 
+class TokenCache:
+    """
+    TTL and LRU cache of verified tokens
+
+    Maps a token to the username it was issued for, so repeated requests with
+    the same token skip signature verification. Entries expire after the TTL
+    or at the token's own exp claim, whichever comes first.
+    """
+
+    def __init__(self, max_size: int = TOKEN_CACHE_SIZE, ttl: float = TOKEN_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[str]:
+        """Get the username for a cached token, if still valid"""
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            username, expires_at = entry
+            if time.time() >= expires_at:
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return username
+
+    def put(self, token: str, username: str, exp: Optional[float] = None) -> None:
+        """Cache a verified token"""
+        expires_at = time.time() + self.ttl
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+        with self._lock:
+            self._entries[token] = (username, expires_at)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached tokens"""
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache()
+
+
+def verify_token(token: str) -> Optional[str]:
+    """
+    Verify a JWT token and get its subject
+
+    Args:
+        token: JWT token
+
+    Returns:
+        Username from the token, or None if the token has no subject
+
+    Raises:
+        JWTError: If the token is invalid or expired
+    """
+    username = token_cache.get(token)
+    if username is not None:
+        return username
+
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    username = payload.get("sub")
+    if username is not None:
+        token_cache.put(token, username, payload.get("exp"))
+    return username
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """
     Create a JWT access token
@@ -66,8 +146,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
+        username = verify_token(token)
         if username is None or username not in fake_users_db:
             raise credentials_exception
     except JWTError:
@@ -76,6 +155,28 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     return fake_users_db[username]
 
 
+async def get_admin_user(current_user: User = Depends(get_current_user)):
+    """
+    Require the current user to be an admin
+    
+    Args:
+        current_user: Current authenticated user
+        
+    Returns:
+        User object if the user is listed in TOTAL_RECALL_ADMIN_USERS
+        
+    Raises:
+        HTTPException: If the user is not an admin
+    """
+    if current_user.username not in config.ADMIN_USERS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+    
+    return current_user
+
+
 @router.post("/token", response_model=TokenResponse)
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
     """
@@ -155,8 +256,7 @@ async def check_auth_status(request: Request):
     token = authorization.replace("Bearer ", "")
     
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
+        username = verify_token(token)
         if username is None or username not in fake_users_db:
             return AuthStatus(authenticated=False)
         
@@ -1,37 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Path
-from typing import List, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Path
+from typing import Any, Dict, List, Optional, Set, Tuple
 from datetime import datetime
+import asyncio
+import threading
+
+import requests
 
 from app.api.endpoints.auth import get_current_user, User
 from app.models.schemas import ConversationBase, ConversationDetail, ConversationList, ConversationFilter
+from app.services.conversation_repository import conversation_repository
+from app.services.conversation_sync_service import ConversationSyncService, to_repository_record
 
 router = APIRouter(tags=["conversations"])
 
-# Simulated conversation database - in production, use a real database
-fake_conversations_db = {
-    "conv1": {
-        "id": "conv1",
-        "title": "Discussion about AI ethics",
-        "create_time": datetime(2025, 4, 20, 10, 30),
-        "update_time": datetime(2025, 4, 20, 11, 45),
-        "messages": [
-            {"role": "user", "content": "What are the main ethical concerns with AI?"},
-            {"role": "assistant", "content": "The main ethical concerns with AI include bias, privacy, job displacement, security, and control issues..."}
-        ]
-    },
-    "conv2": {
-        "id": "conv2",
-        "title": "Python programming tips",
-        "create_time": datetime(2025, 4, 22, 14, 15),
-        "update_time": datetime(2025, 4, 22, 15, 30),
-        "messages": [
-            {"role": "user", "content": "What are some best practices for Python?"},
-            {"role": "assistant", "content": "Some Python best practices include using virtual environments, following PEP 8 style guide..."}
-        ]
-    }
-}
-
-
 @router.get("/conversations", response_model=ConversationList)
 async def list_conversations(
     page: int = Query(1, ge=1, description="Page number"),
@@ -56,7 +37,7 @@ async def list_conversations(
         ConversationList with paginated conversations
     """
     # Apply filters
-    filtered_conversations = list(fake_conversations_db.values())
+    filtered_conversations = conversation_repository.list_all(current_user.username)
     
     if start_date:
         filtered_conversations = [c for c in filtered_conversations if c["create_time"] >= start_date]
@@ -94,6 +75,73 @@ async def list_conversations(
     )
 
 
+# (owner, account) pairs whose whole sync cache has been loaded into the repository
+_loaded_caches: Set[Tuple[str, str]] = set()
+_loaded_caches_lock = threading.Lock()
+
+
+def run_sync(access_token: str, owner: str) -> Dict[str, Any]:
+    """
+    Sync the account's cache with ChatGPT and apply the changes to the repository
+    
+    The first sync of an account in this process loads its whole cache; after
+    that only the conversations the sync fetched or deleted are applied.
+    Synced conversations belong to `owner` and are hidden from other users.
+    """
+    with ConversationSyncService(access_token) as sync_service:
+        result = sync_service.sync()
+        fetched_ids = result.pop("fetched_ids")
+        deleted_ids = result.pop("deleted_ids")
+        
+        key = (owner, sync_service.account)
+        with _loaded_caches_lock:
+            first_load = key not in _loaded_caches
+        if first_load:
+            fetched_ids = list(sync_service.cache.load_checkpoint())
+        
+        for conversation_id in fetched_ids:
+            conversation = sync_service.cache.load_conversation(conversation_id)
+            record = to_repository_record(conversation) if conversation is not None else None
+            if record is not None:
+                conversation_repository.save(dict(record, owner=owner))
+        
+        for conversation_id in deleted_ids:
+            conversation = conversation_repository.get(conversation_id)
+            if conversation is not None and conversation.get("owner") == owner:
+                conversation_repository.delete(conversation_id)
+        
+        with _loaded_caches_lock:
+            _loaded_caches.add(key)
+    return result
+
+
+@router.post("/conversations/sync")
+async def sync_conversations(
+    access_token: str = Body(..., embed=True, description="ChatGPT access token"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Incrementally sync conversations from ChatGPT
+    
+    Only conversations changed since the last sync are downloaded. The sync
+    runs on a worker thread so it doesn't block the event loop.
+    
+    Args:
+        access_token: ChatGPT access token used against the backend API
+        current_user: Current authenticated user
+        
+    Returns:
+        Counts of listed, fetched, unchanged, deleted and failed conversations
+        
+    Raises:
+        HTTPException: If the conversation list can't be retrieved
+    """
+    try:
+        return await asyncio.to_thread(run_sync, access_token, current_user.username)
+    except requests.RequestException as e:
+        raise HTTPException(status_code=502, detail=f"Conversation sync failed: {e}")
+
+
 @router.get("/conversations/{conversation_id}", response_model=ConversationDetail)
 async def get_conversation(
     conversation_id: str = Path(..., description="Conversation ID"),
@@ -112,11 +160,10 @@ async def get_conversation(
     Raises:
         HTTPException: If conversation not found
     """
-    if conversation_id not in fake_conversations_db:
+    conv = conversation_repository.get(conversation_id, current_user.username)
+    if conv is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
     
-    conv = fake_conversations_db[conversation_id]
-    
     return ConversationDetail(
         id=conv["id"],
         title=conv["title"],
@@ -146,7 +193,7 @@ async def filter_conversations(
         ConversationList with filtered and paginated conversations
     """
     # Apply filters
-    filtered_conversations = list(fake_conversations_db.values())
+    filtered_conversations = conversation_repository.list_all(current_user.username)
     
     if filter_params.start_date:
         filtered_conversations = [c for c in filtered_conversations if c["create_time"] >= filter_params.start_date]
@@ -207,7 +254,7 @@ async def search_conversations(
     query = query.lower()
     search_results = []
     
-    for conv in fake_conversations_db.values():
+    for conv in conversation_repository.list_all(current_user.username):
         # Check title
         if query in conv["title"].lower():
             search_results.append(conv)
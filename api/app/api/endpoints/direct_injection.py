@@ -4,6 +4,7 @@ import asyncio
 
 from app.api.endpoints.auth import get_current_user, User
 from app.models.schemas import InjectionConfig
+from app.services.conversation_repository import conversation_repository
 
 router = APIRouter(tags=["direct_injection"])
 
@@ -31,32 +32,8 @@ async def direct_inject_memory(
     Raises:
         HTTPException: If injection fails
     """
-    # Simulated conversation database - in production, fetch from real database
-    fake_conversations_db = {
-        "conv1": {
-            "id": "conv1",
-            "title": "Discussion about AI ethics",
-            "messages": [
-                {"role": "user", "content": "What are the main ethical concerns with AI?"},
-                {"role": "assistant", "content": "The main ethical concerns with AI include bias, privacy, job displacement, security, and control issues..."}
-            ]
-        },
-        "conv2": {
-            "id": "conv2",
-            "title": "Python programming tips",
-            "messages": [
-                {"role": "user", "content": "What are some best practices for Python?"},
-                {"role": "assistant", "content": "Some Python best practices include using virtual environments, following PEP 8 style guide..."}
-            ]
-        }
-    }
-    
-    # Filter conversations to inject
-    conversations_to_inject = {
-        conv_id: fake_conversations_db[conv_id]
-        for conv_id in conversation_ids
-        if conv_id in fake_conversations_db
-    }
+    # Fetch all requested conversations in one batch
+    conversations_to_inject = conversation_repository.get_many(conversation_ids, current_user.username)
     
     if not conversations_to_inject:
         raise HTTPException(status_code=404, detail="No valid conversations found")
@@ -118,31 +95,10 @@ async def direct_inject_single_conversation(
     Raises:
         HTTPException: If conversation not found or injection fails
     """
-    # Simulated conversation database - in production, fetch from real database
-    fake_conversations_db = {
-        "conv1": {
-            "id": "conv1",
-            "title": "Discussion about AI ethics",
-            "messages": [
-                {"role": "user", "content": "What are the main ethical concerns with AI?"},
-                {"role": "assistant", "content": "The main ethical concerns with AI include bias, privacy, job displacement, security, and control issues..."}
-            ]
-        },
-        "conv2": {
-            "id": "conv2",
-            "title": "Python programming tips",
-            "messages": [
-                {"role": "user", "content": "What are some best practices for Python?"},
-                {"role": "assistant", "content": "Some Python best practices include using virtual environments, following PEP 8 style guide..."}
-            ]
-        }
-    }
-    
-    if conversation_id not in fake_conversations_db:
+    conv = conversation_repository.get(conversation_id, current_user.username)
+    if conv is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
     
-    conv = fake_conversations_db[conversation_id]
-    
     # Format conversation for injection
     formatted_conversation = {
         "title": conv["title"] if config.include_titles else None,
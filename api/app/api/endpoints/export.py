@@ -1,13 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Body
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import uuid
 import asyncio
-import json
-import csv
-import io
 
 from app.api.endpoints.auth import get_current_user, User
 from app.models.schemas import ExportFormat, ExportRequest, ExportResponse, ProcessingStatus
+from app.services.conversation_repository import conversation_repository
+from app.services.progress_tracking_service import progress_hub
+from app.services.export_formatting_service import format_export
 
 router = APIRouter(tags=["export"])
 
@@ -16,7 +16,8 @@ export_tasks = {}
 export_files = {}
 
 
-async def export_conversations_task(task_id: str, conversation_ids: List[str], format: ExportFormat, include_metadata: bool):
+async def export_conversations_task(task_id: str, conversation_ids: List[str], format: ExportFormat, include_metadata: bool,
+                                    owner: Optional[str] = None):
     """
     Background task to export conversations
     
@@ -25,44 +26,18 @@ async def export_conversations_task(task_id: str, conversation_ids: List[str], f
         conversation_ids: List of conversation IDs to export
         format: Export format (JSON, CSV, TXT)
         include_metadata: Whether to include metadata in export
+        owner: User the export runs for; other users' conversations are skipped
     """
-    # Simulated conversation database - in production, fetch from real database
-    fake_conversations_db = {
-        "conv1": {
-            "id": "conv1",
-            "title": "Discussion about AI ethics",
-            "create_time": "2025-04-20T10:30:00",
-            "update_time": "2025-04-20T11:45:00",
-            "messages": [
-                {"role": "user", "content": "What are the main ethical concerns with AI?"},
-                {"role": "assistant", "content": "The main ethical concerns with AI include bias, privacy, job displacement, security, and control issues..."}
-            ]
-        },
-        "conv2": {
-            "id": "conv2",
-            "title": "Python programming tips",
-            "create_time": "2025-04-22T14:15:00",
-            "update_time": "2025-04-22T15:30:00",
-            "messages": [
-                {"role": "user", "content": "What are some best practices for Python?"},
-                {"role": "assistant", "content": "Some Python best practices include using virtual environments, following PEP 8 style guide..."}
-            ]
-        }
-    }
-    
     # Update task status
     export_tasks[task_id] = {
         "status": ProcessingStatus.PROCESSING,
         "progress": 0.0,
         "message": "Starting export"
     }
+    progress_hub.publish(task_id, export_tasks[task_id], "export")
     
-    # Filter conversations to export
-    conversations_to_export = {
-        conv_id: fake_conversations_db[conv_id]
-        for conv_id in conversation_ids
-        if conv_id in fake_conversations_db
-    }
+    # Fetch all requested conversations in one batch
+    conversations_to_export = conversation_repository.get_many(conversation_ids, owner)
     
     # Simulate processing time
     await asyncio.sleep(2)
@@ -70,69 +45,19 @@ async def export_conversations_task(task_id: str, conversation_ids: List[str], f
     # Update progress
     export_tasks[task_id]["progress"] = 0.5
     export_tasks[task_id]["message"] = "Formatting data"
-    
-    # Format data based on requested format
-    if format == ExportFormat.JSON:
-        # JSON export
-        export_data = []
-        for conv_id, conv in conversations_to_export.items():
-            export_item = {
-                "id": conv["id"],
-                "title": conv["title"],
-                "messages": [
-                    {
-                        "role": msg["role"],
-                        "content": msg["content"]
-                    }
-                    for msg in conv["messages"]
-                ]
-            }
-            
-            if include_metadata:
-                export_item["create_time"] = conv["create_time"]
-                export_item["update_time"] = conv["update_time"]
-            
-            export_data.append(export_item)
-        
-        # Convert to JSON string
-        export_content = json.dumps(export_data, indent=2)
-    
-    elif format == ExportFormat.CSV:
-        # CSV export
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Write header
-        header = ["Conversation ID", "Title", "Role", "Content"]
-        if include_metadata:
-            header.extend(["Create Time", "Update Time"])
-        writer.writerow(header)
-        
-        # Write data
-        for conv_id, conv in conversations_to_export.items():
-            for msg in conv["messages"]:
-                row = [conv["id"], conv["title"], msg["role"], msg["content"]]
-                if include_metadata:
-                    row.extend([conv["create_time"], conv["update_time"]])
-                writer.writerow(row)
-        
-        export_content = output.getvalue()
-    
-    else:  # TXT format
-        # TXT export
-        export_content = ""
-        for conv_id, conv in conversations_to_export.items():
-            export_content += f"Conversation: {conv['title']}\n"
-            if include_metadata:
-                export_content += f"ID: {conv['id']}\n"
-                export_content += f"Created: {conv['create_time']}\n"
-                export_content += f"Updated: {conv['update_time']}\n"
-            export_content += "=" * 50 + "\n\n"
-            
-            for msg in conv["messages"]:
-                export_content += f"{msg['role'].upper()}: {msg['content']}\n\n"
-            
-            export_content += "\n" + "=" * 50 + "\n\n"
+    progress_hub.publish(task_id, export_tasks[task_id], "export")
+    
+    # Format data off the event loop, reporting progress between chunks
+    def report_progress(fraction: float):
+        export_tasks[task_id]["progress"] = 0.5 + 0.5 * fraction
+        progress_hub.publish(task_id, export_tasks[task_id], "export")
+    
+    export_content = await format_export(
+        list(conversations_to_export.values()),
+        format,
+        include_metadata,
+        on_progress=report_progress
+    )
     
     # Store export file
     file_id = f"export_{task_id}"
@@ -148,6 +73,7 @@ async def export_conversations_task(task_id: str, conversation_ids: List[str], f
         "message": "Export completed",
         "file_id": file_id
     }
+    progress_hub.publish(task_id, export_tasks[task_id], "export")
 
 
 @router.post("/export", response_model=ExportResponse)
@@ -176,6 +102,7 @@ async def export_conversations(
         "progress": 0.0,
         "message": "Task initialized"
     }
+    progress_hub.register(task_id, current_user.username)
     
     # Start background export
     background_tasks.add_task(
@@ -183,7 +110,8 @@ async def export_conversations(
         task_id=task_id,
         conversation_ids=export_request.conversation_ids,
         format=export_request.format,
-        include_metadata=export_request.include_metadata
+        include_metadata=export_request.include_metadata,
+        owner=current_user.username
     )
     
     # Generate download URL
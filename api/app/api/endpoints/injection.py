@@ -5,6 +5,7 @@ import asyncio
 
 from app.api.endpoints.auth import get_current_user, User
 from app.models.schemas import InjectionConfig, InjectionRequest, InjectionStatus, ProcessingStatus
+from app.services.progress_tracking_service import progress_hub
 
 router = APIRouter(tags=["injection"])
 
@@ -23,6 +24,7 @@ async def inject_memory_task(task_id: str, conversation_ids: List[str], config:
     """
     # Update task status to processing
     injection_tasks[task_id]["status"] = ProcessingStatus.PROCESSING
+    progress_hub.publish(task_id, injection_tasks[task_id], "injection")
     
     total_conversations = len(conversation_ids)
     successful = 0
@@ -37,6 +39,7 @@ async def inject_memory_task(task_id: str, conversation_ids: List[str], config:
         progress = (i + 1) / total_conversations
         injection_tasks[task_id]["progress"] = progress
         injection_tasks[task_id]["message"] = f"Injecting conversation {i+1}/{total_conversations}"
+        progress_hub.publish(task_id, injection_tasks[task_id], "injection")
         
         # Simulate injection with retry logic
         success = False
@@ -60,11 +63,13 @@ async def inject_memory_task(task_id: str, conversation_ids: List[str], config:
         # Update task with current stats
         injection_tasks[task_id]["successful_injections"] = successful
         injection_tasks[task_id]["failed_injections"] = failed
+        progress_hub.publish(task_id, injection_tasks[task_id], "injection")
     
     # Complete the task
     injection_tasks[task_id]["status"] = ProcessingStatus.COMPLETED
     injection_tasks[task_id]["progress"] = 1.0
     injection_tasks[task_id]["message"] = "Injection completed"
+    progress_hub.publish(task_id, injection_tasks[task_id], "injection")
 
 
 @router.post("/inject", response_model=InjectionStatus)
@@ -99,6 +104,7 @@ async def inject_memory(
     
     # Store task
     injection_tasks[task_id] = task
+    progress_hub.register(task_id, current_user.username)
     
     # Start background processing
     background_tasks.add_task(
@@ -164,5 +170,6 @@ async def cancel_injection_task(
     # Update task status
     task["status"] = ProcessingStatus.FAILED
     task["message"] = "Task cancelled by user"
+    progress_hub.publish(task_id, task, "injection")
     
     return {"success": True, "message": "Task cancelled successfully"}
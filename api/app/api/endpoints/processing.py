@@ -5,6 +5,7 @@ import asyncio
 
 from app.api.endpoints.auth import get_current_user, User
 from app.models.schemas import ProcessingConfig, ProcessingTask, ProcessingStatus
+from app.services.progress_tracking_service import progress_hub
 
 router = APIRouter(tags=["processing"])
 
@@ -23,6 +24,7 @@ async def process_conversations_task(task_id: str, conversation_ids: List[str],
     """
     # Update task status to processing
     processing_tasks[task_id]["status"] = ProcessingStatus.PROCESSING
+    progress_hub.publish(task_id, processing_tasks[task_id], "processing")
     
     total_conversations = len(conversation_ids)
     
@@ -35,6 +37,7 @@ async def process_conversations_task(task_id: str, conversation_ids: List[str],
         progress = (i + 1) / total_conversations
         processing_tasks[task_id]["progress"] = progress
         processing_tasks[task_id]["message"] = f"Processing conversation {i+1}/{total_conversations}"
+        progress_hub.publish(task_id, processing_tasks[task_id], "processing")
         
         # Simulate chunking based on config
         chunk_size = config.chunking.chunk_size
@@ -54,6 +57,7 @@ async def process_conversations_task(task_id: str, conversation_ids: List[str],
         "total_chunks": total_conversations * 3,  # Simulated chunk count
         "summarization_applied": config.summarization.enabled
     }
+    progress_hub.publish(task_id, processing_tasks[task_id], "processing")
 
 
 @router.post("/process", response_model=ProcessingTask)
@@ -89,6 +93,7 @@ async def process_conversations(
     
     # Store task
     processing_tasks[task_id] = task
+    progress_hub.register(task_id, current_user.username)
     
     # Start background processing
     background_tasks.add_task(
@@ -154,5 +159,6 @@ async def cancel_processing_task(
     # Update task status
     task["status"] = ProcessingStatus.FAILED
     task["message"] = "Task cancelled by user"
+    progress_hub.publish(task_id, task, "processing")
     
     return {"success": True, "message": "Task cancelled successfully"}
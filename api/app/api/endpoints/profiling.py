@@ -0,0 +1,85 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from typing import Dict, Any, Literal
+
+from app import config
+from app.api.endpoints.auth import get_admin_user, User
+from app.services.profiler_service import profiler_service, ProfilerBusyError
+from app.utils.loop_monitor import loop_monitor
+
+router = APIRouter(tags=["admin"])
+
+
+@router.get("/profile")
+async def profile_process(
+    duration: float = Query(5.0, gt=0, description="Seconds to profile for"),
+    interval: float = Query(0.005, ge=0.001, le=1.0, description="Seconds between stack samples"),
+    format: Literal["json", "collapsed"] = Query("json", description="json or collapsed"),
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Profile the API process with a sampling profiler
+    
+    The stacks of all threads, including the event loop, are sampled for
+    `duration` seconds while the event loop lag is measured.
+    
+    Args:
+        duration: Seconds to profile for
+        interval: Seconds between stack samples
+        format: "json" for stacks and loop lag, "collapsed" for a
+            flamegraph-ready collapsed stacks file
+        current_user: Current authenticated admin user
+        
+    Returns:
+        Profile with collapsed stacks and loop lag
+        
+    Raises:
+        HTTPException: If the duration is too long or a profile is already running
+    """
+    if duration > config.PROFILER_MAX_DURATION:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Duration must not exceed {config.PROFILER_MAX_DURATION:g} seconds"
+        )
+    
+    try:
+        result = await profiler_service.profile(duration, interval)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    if format == "collapsed":
+        lag = result["loop_lag"]
+        return PlainTextResponse(
+            result["collapsed"],
+            headers={
+                "Content-Disposition": 'attachment; filename="profile.collapsed"',
+                "X-Profile-Samples": str(result["samples"]),
+                "X-Loop-Lag-Mean-Ms": str(lag["mean_ms"]),
+                "X-Loop-Lag-P99-Ms": str(lag["p99_ms"]),
+                "X-Loop-Lag-Max-Ms": str(lag["max_ms"])
+            }
+        )
+    
+    return result
+
+
+@router.get("/slow-callbacks")
+async def get_slow_callbacks(
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of slow callbacks"),
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Get recent callbacks that blocked the event loop
+    
+    Args:
+        limit: Maximum number of slow callbacks to return
+        current_user: Current authenticated admin user
+        
+    Returns:
+        Monitor settings and the most recent slow callbacks with their stacks
+    """
+    return {
+        "running": loop_monitor.running,
+        "threshold": loop_monitor.threshold,
+        "slow_callbacks": loop_monitor.recent(limit)
+    }
@@ -1,14 +1,188 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import Dict, List, Any
-import json
+from jose import JWTError
+from typing import Dict, List, Any, Iterable, Optional, Set
 import asyncio
 
+from app import config
+from app.api.endpoints.auth import fake_users_db, verify_token, User
 from app.models.schemas import WebSocketMessage
+from app.services.progress_tracking_service import progress_hub, PROGRESS_EVENT
+from app.services.pubsub_service import create_broker
+from app.utils import serialization
 
 router = APIRouter(tags=["websocket"])
 
-# Store active connections
-active_connections: Dict[str, WebSocket] = {}
+# Outbound queue settings
+SEND_QUEUE_SIZE = 256  # Messages buffered per client before the slow-consumer policy applies
+DROP_OLDEST = "drop_oldest"  # Discard the oldest queued message to make room
+DISCONNECT = "disconnect"  # Close the connection of a client that can't keep up
+SLOW_CONSUMER_POLICY = DROP_OLDEST
+SLOW_CONSUMER_CLOSE_CODE = 1013  # Try again later
+
+
+class ClientConnection:
+    """
+    A connected WebSocket client with its own bounded outbound queue
+
+    Messages are queued without waiting and sent by a dedicated writer task,
+    so a slow client never holds up messages to other clients.
+
+    Progress updates are deltas, so dropping one would leave the client with
+    stale fields. When the drop-oldest policy discards a task's update, the
+    task's other queued updates are discarded too and the client gets one
+    full snapshot of the task instead, built when the writer gets to it.
+    """
+
+    def __init__(self, client_id: str, websocket: WebSocket,
+                 max_queue_size: int = SEND_QUEUE_SIZE, policy: str = SLOW_CONSUMER_POLICY,
+                 username: Optional[str] = None):
+        self.client_id = client_id
+        self.websocket = websocket
+        self.username = username  # User the socket authenticated as, if any
+        self.policy = policy
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)  # (text, progress task ID)
+        self.dropped = 0
+        self.closed = False
+        self._resync: Dict[str, None] = {}  # Tasks owed a full snapshot, in order
+        self._closing: Optional[asyncio.Task] = None
+        self._writer = asyncio.create_task(self._write_loop())
+
+    async def _write_loop(self):
+        """Send queued messages in order until the connection closes"""
+        try:
+            while True:
+                if self._resync:
+                    task_id = next(iter(self._resync))
+                    del self._resync[task_id]
+                    snapshot = progress_hub.snapshot(task_id)
+                    if snapshot is not None:
+                        await self.websocket.send_text(serialize_message(PROGRESS_EVENT, snapshot))
+                    continue
+                text, _ = await self.queue.get()
+                if text is not None:
+                    await self.websocket.send_text(text)
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            # The client went away - stop accepting messages for it
+            self._mark_closed()
+
+    def _mark_closed(self):
+        """Stop accepting messages and drop this connection from the registry"""
+        self.closed = True
+        if active_connections.get(self.client_id) is self:
+            del active_connections[self.client_id]
+
+    def _drop_oldest(self):
+        """Discard the oldest queued message, resyncing its task if it was a progress update"""
+        _, task_id = self.queue.get_nowait()
+        self.dropped += 1
+        if task_id is None or task_id in self._resync:
+            return
+
+        # Later deltas would build on the lost one, so they are replaced by the snapshot too
+        kept = [item for item in self.queue._queue if item[1] != task_id]
+        self.dropped += self.queue.qsize() - len(kept)
+        self.queue._queue.clear()
+        self.queue._queue.extend(kept)
+        self._resync[task_id] = None
+        if not kept:
+            # Wake the writer so it sends the snapshot
+            self.queue.put_nowait((None, None))
+
+    def enqueue(self, text: str, task_id: Optional[str] = None) -> bool:
+        """
+        Queue a serialized message for sending
+
+        Args:
+            text: Serialized message
+            task_id: Task ID if the message is a progress update
+
+        Returns:
+            True if the message was queued or will be covered by a snapshot
+        """
+        if self.closed or self._closing is not None:
+            return False
+
+        while True:
+            if task_id is not None and task_id in self._resync:
+                # The snapshot sent for this task will include this update
+                return True
+            try:
+                self.queue.put_nowait((text, task_id))
+                return True
+            except asyncio.QueueFull:
+                pass
+
+            if self.policy == DISCONNECT:
+                self._closing = asyncio.create_task(self.close(code=SLOW_CONSUMER_CLOSE_CODE))
+                return False
+
+            self._drop_oldest()
+
+    async def close(self, code: int = 1000):
+        """Stop the writer and close the socket"""
+        if self.closed and self._writer.done():
+            return
+        self._mark_closed()
+        self._writer.cancel()
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass
+
+
+# Store active connections (only those connected to this worker)
+active_connections: Dict[str, ClientConnection] = {}
+
+# Backplane that carries events between workers
+backplane = create_broker()
+
+
+def serialize_message(event: str, data: Dict[str, Any]) -> str:
+    """Serialize a WebSocket message once so it can be sent to many clients"""
+    return serialization.dumps_str(WebSocketMessage(event=event, data=data))
+
+
+def _send_local(client_ids: Iterable[str], event: str, data: Dict[str, Any]) -> Set[str]:
+    """
+    Queue a message for the given clients connected to this worker
+
+    Returns:
+        Client IDs that are not connected to this worker
+    """
+    text = None
+    remote = set()
+    for client_id in client_ids:
+        connection = active_connections.get(client_id)
+        if connection is None:
+            remote.add(client_id)
+            continue
+        if text is None:
+            text = serialize_message(event, data)
+        connection.enqueue(text, data.get("task_id") if event == PROGRESS_EVENT else None)
+    return remote
+
+
+def _backplane_running() -> bool:
+    """Check whether events can be shared with other workers"""
+    return backplane.handler is not None
+
+
+async def send_to_clients(client_ids: Iterable[str], event: str, data: Dict[str, Any]):
+    """
+    Send the same message to several clients
+
+    Clients connected to other workers are reached through the backplane.
+
+    Args:
+        client_ids: Client IDs
+        event: Event name
+        data: Event data
+    """
+    remote = _send_local(client_ids, event, data)
+    if remote and _backplane_running():
+        await backplane.publish("direct", {"client_ids": sorted(remote), "event": event, "data": data})
 
 
 async def send_progress_update(client_id: str, event: str, data: Dict[str, Any]):
@@ -20,9 +194,76 @@ async def send_progress_update(client_id: str, event: str, data: Dict[str, Any])
         event: Event name
         data: Event data
     """
-    if client_id in active_connections:
-        message = WebSocketMessage(event=event, data=data)
-        await active_connections[client_id].send_text(json.dumps(message.dict()))
+    await send_to_clients([client_id], event, data)
+
+
+async def _publish_progress(task_id: str, state: Dict[str, Any]):
+    """Share a task state with the progress hubs of all workers"""
+    await backplane.publish("progress", {"task_id": task_id, "state": state})
+
+
+async def _handle_backplane_event(channel: str, message: Dict[str, Any]):
+    """Deliver an event from the backplane to clients on this worker"""
+    if channel == "progress":
+        progress_hub.apply(message["task_id"], message["state"])
+    elif channel == "broadcast":
+        _send_local(list(active_connections), message["event"], message["data"])
+    elif channel == "direct":
+        _send_local(message["client_ids"], message["event"], message["data"])
+
+
+async def start_backplane():
+    """Start receiving events published by any worker"""
+    await backplane.start(_handle_backplane_event)
+    progress_hub.set_backplane(_publish_progress)
+
+
+async def stop_backplane():
+    """Stop receiving events from other workers"""
+    progress_hub.set_backplane(None)
+    await backplane.stop()
+
+
+progress_hub.set_sender(send_to_clients)
+
+
+def authenticate_websocket(websocket: WebSocket) -> Optional[User]:
+    """
+    Get the user a WebSocket connection authenticated as
+
+    Browsers can't set headers on WebSocket requests, so the token may also
+    be passed as the `token` query parameter.
+    """
+    token = websocket.query_params.get("token")
+    authorization = websocket.headers.get("authorization", "")
+    if not token and authorization.startswith("Bearer "):
+        token = authorization[len("Bearer "):]
+    if not token:
+        return None
+    try:
+        username = verify_token(token)
+    except JWTError:
+        return None
+    return fake_users_db.get(username) if username is not None else None
+
+
+def subscribe_to_progress(client_id: str, user: Optional[User], task_id: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Subscribe a client to a task on behalf of its user
+
+    Admins may subscribe to any task, including ALL_TASKS; other users only
+    to tasks they own.
+
+    Raises:
+        PermissionError: If the subscription isn't allowed
+    """
+    if user is None:
+        raise PermissionError("Authentication required")
+    if not task_id:
+        raise PermissionError("task_id is required")
+    if user.username in config.ADMIN_USERS:
+        return progress_hub.subscribe(client_id, task_id)
+    return progress_hub.subscribe(client_id, task_id, user=user.username)
 
 
 @router.websocket("/ws/{client_id}")
@@ -35,7 +276,20 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
         client_id: Client ID
     """
     await websocket.accept()
-    active_connections[client_id] = websocket
+    user = authenticate_websocket(websocket)
+    
+    username = user.username if user is not None else None
+    
+    # A reconnecting client replaces its previous connection
+    previous = active_connections.get(client_id)
+    if previous is not None:
+        if username is None or previous.username != username:
+            # The subscriptions were authorized for someone else - don't hand them over
+            progress_hub.unsubscribe(client_id)
+        await previous.close()
+    
+    connection = ClientConnection(client_id, websocket, username=username)
+    active_connections[client_id] = connection
     
     try:
         # Send initial connection confirmation
@@ -50,7 +304,7 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
             data = await websocket.receive_text()
             
             try:
-                message = json.loads(data)
+                message = serialization.loads(data)
                 
                 # Handle ping messages to keep connection alive
                 if message.get("event") == "ping":
@@ -59,27 +313,45 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
                         event="pong",
                         data={"timestamp": message.get("data", {}).get("timestamp")}
                     )
-            except json.JSONDecodeError:
+                
+                # Handle task progress subscriptions
+                elif message.get("event") == "subscribe":
+                    task_id = message.get("data", {}).get("task_id")
+                    try:
+                        snapshot = subscribe_to_progress(client_id, user, task_id)
+                    except PermissionError as e:
+                        await send_progress_update(
+                            client_id=client_id,
+                            event="error",
+                            data={"message": str(e), "task_id": task_id}
+                        )
+                        continue
+                    if snapshot:
+                        await send_progress_update(
+                            client_id=client_id,
+                            event=PROGRESS_EVENT,
+                            data=snapshot
+                        )
+                elif message.get("event") == "unsubscribe":
+                    progress_hub.unsubscribe(client_id, message.get("data", {}).get("task_id"))
+            except serialization.JSONDecodeError:
                 # Ignore invalid JSON
                 pass
             
     except WebSocketDisconnect:
         # Remove connection when client disconnects
-        if client_id in active_connections:
-            del active_connections[client_id]
+        pass
     except Exception as e:
         # Handle other exceptions
-        if client_id in active_connections:
-            try:
-                await send_progress_update(
-                    client_id=client_id,
-                    event="error",
-                    data={"message": f"Error: {str(e)}"}
-                )
-            except:
-                pass
-            
-            del active_connections[client_id]
+        try:
+            await websocket.send_text(serialize_message("error", {"message": f"Error: {str(e)}"}))
+        except:
+            pass
+    finally:
+        # Keep subscriptions if a newer connection has taken over this client ID
+        if active_connections.get(client_id) in (None, connection):
+            progress_hub.unsubscribe(client_id)
+        await connection.close()
 
 
 # Function to broadcast message to all clients
@@ -87,20 +359,14 @@ async def broadcast_message(event: str, data: Dict[str, Any]):
     """
     Broadcast message to all connected clients
     
+    The message is serialized once per worker and queued for every client;
+    delivery happens in each client's writer task.
+    
     Args:
         event: Event name
         data: Event data
     """
-    disconnected_clients = []
-    
-    for client_id, connection in active_connections.items():
-        try:
-            message = WebSocketMessage(event=event, data=data)
-            await connection.send_text(json.dumps(message.dict()))
-        except:
-            disconnected_clients.append(client_id)
-    
-    # Clean up disconnected clients
-    for client_id in disconnected_clients:
-        if client_id in active_connections:
-            del active_connections[client_id]
+    if _backplane_running():
+        await backplane.publish("broadcast", {"event": event, "data": data})
+    else:
+        _send_local(list(active_connections), event, data)
@@ -1,18 +1,42 @@
 from fastapi import FastAPI, Depends, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from contextlib import asynccontextmanager
 import logging
-import time
 import os
 
-from app.api.endpoints import auth, conversations, processing, export, injection, direct_injection, websocket
+from app import config
+from app.api.endpoints import auth, conversations, processing, export, injection, direct_injection, websocket, profiling
+from app.models.schemas import ProcessingStatus
+from app.services import export_formatting_service
+from app.utils import metrics
+from app.utils.serialization import FastJSONResponse
+from app.utils.loop_monitor import loop_monitor
+from app.utils.logger import ACCESS_LOGGER_NAME, configure_logging, parse_sample_rates, start_logging, stop_logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+# Configure logging (records are written by a background thread once the app starts)
+configure_logging(
+    level=config.LOG_LEVEL,
+    fmt=config.LOG_FORMAT,
+    sample_rates=parse_sample_rates(config.LOG_SAMPLE_RATES),
 )
 logger = logging.getLogger("total_recall")
+access_logger = logging.getLogger(ACCESS_LOGGER_NAME)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop shared background services"""
+    start_logging()
+    if config.LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+    await websocket.start_backplane()
+    yield
+    await websocket.stop_backplane()
+    await loop_monitor.stop()
+    export_formatting_service.shutdown_executor()
+    stop_logging()
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -21,6 +45,8 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/api/docs",
     openapi_url="/api/openapi.json",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # Add CORS middleware
@@ -32,28 +58,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add request logging middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start_time = time.time()
-    
-    # Process the request
-    response = await call_next(request)
-    
-    # Log request details
-    process_time = time.time() - start_time
-    logger.info(
-        f"Request: {request.method} {request.url.path} - "
-        f"Status: {response.status_code} - "
-        f"Time: {process_time:.4f}s"
+# Add request metrics and logging middleware
+app.add_middleware(
+    metrics.RequestMetricsMiddleware,
+    logger=access_logger,
+    log_requests=config.REQUEST_LOG_ENABLED,
+)
+
+
+def background_queue_depths():
+    """Count background tasks that are still pending or running"""
+    active = (ProcessingStatus.PENDING, ProcessingStatus.PROCESSING)
+    depths = {}
+    for queue, tasks in (("processing", processing.processing_tasks),
+                         ("injection", injection.injection_tasks),
+                         ("export", export.export_tasks)):
+        depths[(queue,)] = sum(1 for task in list(tasks.values()) if task["status"] in active)
+    depths[("websocket_outbound",)] = sum(
+        connection.queue.qsize() for connection in list(websocket.active_connections.values())
     )
-    
-    return response
+    return depths
+
+
+metrics.registry.gauge(
+    "total_recall_queue_depth",
+    "Background tasks pending or running, and queued outbound WebSocket messages",
+    ("queue",),
+    callback=background_queue_depths,
+)
 
 # Add global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
-    logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
+    logger.error("Unhandled exception: %s", exc, exc_info=True)
     return JSONResponse(
         status_code=500,
         content={"detail": "An unexpected error occurred", "code": "internal_server_error"}
@@ -67,6 +104,7 @@ app.include_router(export.router, prefix="/api/export")
 app.include_router(injection.router, prefix="/api/injection")
 app.include_router(direct_injection.router, prefix="/api/direct-injection")
 app.include_router(websocket.router, prefix="/api")
+app.include_router(profiling.router, prefix="/api/admin")
 
 # Root endpoint
 @app.get("/")
@@ -82,3 +120,8 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+# Metrics endpoint (Prometheus text format)
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,40 @@
+"""
+Total Recall API configuration
+
+Settings are read from environment variables so each deployment (and each
+uvicorn worker) can be configured without code changes.
+"""
+
+import os
+
+# Pub/sub backplane used to fan WebSocket events out across workers.
+# "memory://" keeps events inside one process; "sqlite:///path/to/events.db"
+# shares them between all workers on the same host.
+BROKER_URL = os.environ.get("TOTAL_RECALL_BROKER_URL", "memory://")
+BROKER_POLL_INTERVAL = float(os.environ.get("TOTAL_RECALL_BROKER_POLL_INTERVAL", "0.02"))  # seconds
+BROKER_RETENTION = float(os.environ.get("TOTAL_RECALL_BROKER_RETENTION", "60"))  # seconds
+
+# Per-request access log line written by the request metrics middleware
+REQUEST_LOG_ENABLED = os.environ.get("TOTAL_RECALL_REQUEST_LOG", "1").lower() in ("1", "true", "yes")
+
+# Logging: level, output format ("json" or "text") and per-route access log
+# sampling as route=rate pairs, e.g. "/api/processing/process/{task_id}=0.1"
+LOG_LEVEL = os.environ.get("TOTAL_RECALL_LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("TOTAL_RECALL_LOG_FORMAT", "json").lower()
+LOG_SAMPLE_RATES = os.environ.get("TOTAL_RECALL_LOG_SAMPLE_RATES", "")
+
+# Users allowed to use admin-only endpoints such as the profiler
+ADMIN_USERS = {name.strip() for name in os.environ.get("TOTAL_RECALL_ADMIN_USERS", "").split(",") if name.strip()}
+PROFILER_MAX_DURATION = float(os.environ.get("TOTAL_RECALL_PROFILER_MAX_DURATION", "60"))  # seconds
+
+# Event loop watchdog: heartbeat interval and how long the loop may be
+# blocked before the blocking stack is captured (seconds)
+LOOP_MONITOR_ENABLED = os.environ.get("TOTAL_RECALL_LOOP_MONITOR", "1").lower() in ("1", "true", "yes")
+LOOP_MONITOR_INTERVAL = float(os.environ.get("TOTAL_RECALL_LOOP_MONITOR_INTERVAL", "0.05"))
+SLOW_CALLBACK_THRESHOLD = float(os.environ.get("TOTAL_RECALL_SLOW_CALLBACK_THRESHOLD", "0.1"))
+
+# Export formatting runs on an executor ("thread" or "process") in chunks
+# of this many conversations
+EXPORT_EXECUTOR = os.environ.get("TOTAL_RECALL_EXPORT_EXECUTOR", "thread").lower()
+EXPORT_WORKERS = int(os.environ.get("TOTAL_RECALL_EXPORT_WORKERS", "2"))
+EXPORT_CHUNK_SIZE = int(os.environ.get("TOTAL_RECALL_EXPORT_CHUNK_SIZE", "50"))
@@ -0,0 +1,254 @@
+"""
+Browser Pool Service - warm, reusable headless browser sessions
+
+This module keeps a single Playwright browser running with one warm browser
+context per user session, and leases pages from those contexts to retrieval
+and injection jobs. Pages are health-checked before they are handed out and
+returned to the pool afterwards, so jobs don't pay browser startup per request.
+
+The Playwright sync API is bound to the thread that started it, so a pool
+instance must only be used from one thread; async callers should own a pool
+on a dedicated worker thread rather than touch it from the event loop.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Constants
+CHATGPT_URL = "https://chat.openai.com/"
+SESSION_COOKIE_NAME = "__Secure-next-auth.session-token"
+SESSION_COOKIE_DOMAIN = "chat.openai.com"
+DEFAULT_MAX_CONTEXTS = 8  # Warm user sessions kept at once
+DEFAULT_MAX_IDLE_PAGES = 2  # Idle pages kept per session
+DEFAULT_IDLE_TIMEOUT = 300  # seconds before an unused session is closed
+DEFAULT_LAUNCH_OPTIONS = {
+    "headless": True,
+    "args": ["--no-sandbox", "--disable-setuid-sandbox"]
+}
+
+
+def _default_playwright_factory():
+    """Create the Playwright driver (imported lazily, it is an optional dependency)"""
+    from playwright.sync_api import sync_playwright
+    return sync_playwright()
+
+
+class _PooledContext:
+    """A warm browser context and its idle pages"""
+
+    def __init__(self, context: Any, session_token: Optional[str]):
+        self.context = context
+        self.session_token = session_token
+        self.idle_pages: List[Any] = []
+        self.leased = 0
+        self.last_used = time.monotonic()
+        self.retired = False  # Replaced or closed; closed once its last page is returned
+
+
+class BrowserPoolService:
+    """Keeps warm browser contexts per user session and leases pages"""
+
+    def __init__(self, max_contexts: int = DEFAULT_MAX_CONTEXTS,
+                 max_idle_pages: int = DEFAULT_MAX_IDLE_PAGES,
+                 idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+                 launch_options: Optional[Dict[str, Any]] = None,
+                 playwright_factory: Callable[[], Any] = _default_playwright_factory):
+        """Initialize the browser pool"""
+        self.max_contexts = max_contexts
+        self.max_idle_pages = max_idle_pages
+        self.idle_timeout = idle_timeout
+        self.launch_options = launch_options or DEFAULT_LAUNCH_OPTIONS
+        self.playwright_factory = playwright_factory
+
+        self._playwright = None
+        self._browser = None
+        self._contexts: "OrderedDict[str, _PooledContext]" = OrderedDict()
+        self._leases: Dict[Any, _PooledContext] = {}  # Leased page -> the context it came from
+        self._lock = threading.RLock()
+        self.stats = {"launches": 0, "contexts_created": 0, "pages_created": 0,
+                      "pages_reused": 0, "pages_discarded": 0}
+
+    def _ensure_browser(self) -> Any:
+        """Launch the browser if it is not running"""
+        if self._browser is not None and self._browser.is_connected():
+            return self._browser
+
+        # The browser died - its contexts are gone with it
+        for pooled in self._contexts.values():
+            pooled.retired = True
+        self._contexts.clear()
+        if self._playwright is None:
+            self._playwright = self.playwright_factory().start()
+        self._browser = self._playwright.chromium.launch(**self.launch_options)
+        self.stats["launches"] += 1
+        return self._browser
+
+    def _close_context(self, pooled: _PooledContext) -> None:
+        """Close a browser context, ignoring errors from a dead browser"""
+        try:
+            pooled.context.close()
+        except Exception:
+            pass
+
+    def _retire_context(self, session_id: str) -> None:
+        """Take a session's context out of the pool, closing it once no pages are leased"""
+        pooled = self._contexts.pop(session_id, None)
+        if pooled is None:
+            return
+        pooled.retired = True
+        if pooled.leased == 0:
+            self._close_context(pooled)
+
+    def _get_context(self, session_id: str, session_token: Optional[str]) -> _PooledContext:
+        """
+        Get the warm context for a session, creating it if needed
+
+        Contexts are keyed by the session token too: a different token gets a
+        fresh context, and the old one is closed once its pages are returned.
+        Without a token, the session's current context is used.
+        """
+        browser = self._ensure_browser()
+
+        pooled = self._contexts.get(session_id)
+        if pooled is not None and session_token and session_token != pooled.session_token:
+            self._retire_context(session_id)
+            pooled = None
+        if pooled is None:
+            context = browser.new_context()
+            if session_token:
+                context.add_cookies([{
+                    "name": SESSION_COOKIE_NAME,
+                    "value": session_token,
+                    "domain": SESSION_COOKIE_DOMAIN,
+                    "path": "/",
+                    "httpOnly": True,
+                    "secure": True
+                }])
+            pooled = _PooledContext(context, session_token)
+            self._contexts[session_id] = pooled
+            self.stats["contexts_created"] += 1
+            self._evict_lru()
+
+        self._contexts.move_to_end(session_id)
+        pooled.last_used = time.monotonic()
+        return pooled
+
+    def _evict_lru(self) -> None:
+        """Close least recently used sessions beyond the pool size"""
+        for session_id in list(self._contexts):
+            if len(self._contexts) <= self.max_contexts:
+                break
+            pooled = self._contexts[session_id]
+            if pooled.leased == 0:
+                del self._contexts[session_id]
+                self._close_context(pooled)
+
+    def is_page_healthy(self, page: Any) -> bool:
+        """Check that a page is still open and responsive"""
+        try:
+            return not page.is_closed() and page.evaluate("1") == 1
+        except Exception:
+            return False
+
+    def _discard_page(self, page: Any) -> None:
+        """Close a page that won't be reused"""
+        self.stats["pages_discarded"] += 1
+        try:
+            page.close()
+        except Exception:
+            pass
+
+    def acquire(self, session_id: str, session_token: Optional[str] = None) -> Any:
+        """Lease a healthy page for a user session"""
+        with self._lock:
+            pooled = self._get_context(session_id, session_token)
+
+            while pooled.idle_pages:
+                page = pooled.idle_pages.pop()
+                if self.is_page_healthy(page):
+                    self.stats["pages_reused"] += 1
+                    break
+                self._discard_page(page)
+            else:
+                page = pooled.context.new_page()
+                self.stats["pages_created"] += 1
+
+            pooled.leased += 1
+            self._leases[page] = pooled
+            return page
+
+    def release(self, session_id: str, page: Any, healthy: bool = True) -> None:
+        """Return a leased page to the context it was leased from"""
+        with self._lock:
+            pooled = self._leases.pop(page, None)
+            if pooled is None:
+                self._discard_page(page)
+                return
+
+            pooled.leased -= 1
+            pooled.last_used = time.monotonic()
+            if pooled.retired:
+                self._discard_page(page)
+                if pooled.leased == 0:
+                    self._close_context(pooled)
+            elif healthy and len(pooled.idle_pages) < self.max_idle_pages and self.is_page_healthy(page):
+                pooled.idle_pages.append(page)
+            else:
+                self._discard_page(page)
+
+    @contextmanager
+    def lease(self, session_id: str, session_token: Optional[str] = None) -> Iterator[Any]:
+        """
+        Lease a page for the duration of a with-block
+
+        Pages from a block that raised are discarded rather than reused.
+        """
+        page = self.acquire(session_id, session_token)
+        healthy = False
+        try:
+            yield page
+            healthy = True
+        finally:
+            self.release(session_id, page, healthy=healthy)
+
+    def evict_idle(self) -> int:
+        """Close sessions unused for longer than the idle timeout"""
+        cutoff = time.monotonic() - self.idle_timeout
+        evicted = 0
+        with self._lock:
+            for session_id in list(self._contexts):
+                pooled = self._contexts[session_id]
+                if pooled.leased == 0 and pooled.last_used < cutoff:
+                    del self._contexts[session_id]
+                    self._close_context(pooled)
+                    evicted += 1
+        return evicted
+
+    def close_session(self, session_id: str) -> None:
+        """Close the context of a user session (e.g. on logout)"""
+        with self._lock:
+            pooled = self._contexts.pop(session_id, None)
+            if pooled is not None:
+                pooled.retired = True
+                self._close_context(pooled)
+
+    def close(self) -> None:
+        """Shut down all contexts, the browser and Playwright"""
+        with self._lock:
+            for pooled in self._contexts.values():
+                pooled.retired = True
+                self._close_context(pooled)
+            self._contexts.clear()
+            if self._browser is not None:
+                try:
+                    self._browser.close()
+                except Exception:
+                    pass
+                self._browser = None
+            if self._playwright is not None:
+                self._playwright.stop()
+                self._playwright = None
+
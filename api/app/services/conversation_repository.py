@@ -0,0 +1,166 @@
+"""
+Conversation Repository - shared access to stored conversations
+
+This module provides the single conversation store used by the API endpoints.
+Raw records are kept in serialized form (as a database would return them) and
+parsed conversations are held in an LRU cache so repeated lookups don't pay
+the parsing cost again.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.utils import serialization
+
+# Constants
+DEFAULT_CACHE_SIZE = 1024  # Maximum number of parsed conversations kept in memory
+
+# Simulated conversation records - in production, these come from a real database
+SEED_CONVERSATIONS = [
+    {
+        "id": "conv1",
+        "title": "Discussion about AI ethics",
+        "create_time": "2025-04-20T10:30:00",
+        "update_time": "2025-04-20T11:45:00",
+        "messages": [
+            {"role": "user", "content": "What are the main ethical concerns with AI?"},
+            {"role": "assistant", "content": "The main ethical concerns with AI include bias, privacy, job displacement, security, and control issues..."}
+        ]
+    },
+    {
+        "id": "conv2",
+        "title": "Python programming tips",
+        "create_time": "2025-04-22T14:15:00",
+        "update_time": "2025-04-22T15:30:00",
+        "messages": [
+            {"role": "user", "content": "What are some best practices for Python?"},
+            {"role": "assistant", "content": "Some Python best practices include using virtual environments, following PEP 8 style guide..."}
+        ]
+    }
+]
+
+
+def is_visible_to(conversation: Dict[str, Any], owner: Optional[str]) -> bool:
+    """
+    Check whether a conversation may be returned to a user
+
+    Conversations without an owner are shared; the others are only visible
+    to their owner. An owner of None means no scoping.
+    """
+    return owner is None or conversation.get("owner") in (None, owner)
+
+
+class ConversationRepository:
+    """Stores conversations and caches their parsed form
+
+    Conversations returned by the repository are shared cache entries and
+    must be treated as read-only by callers. Lookups can be scoped to an
+    owner, which hides conversations saved for other users.
+    """
+
+    def __init__(self, conversations: Optional[Iterable[Dict[str, Any]]] = None,
+                 cache_size: int = DEFAULT_CACHE_SIZE):
+        """Initialize the repository"""
+        self.cache_size = cache_size
+        self._records: Dict[str, bytes] = {}
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        for conversation in conversations or []:
+            self.save(conversation)
+
+    def _fetch(self, conversation_ids: List[str]) -> Dict[str, bytes]:
+        """Fetch raw records for several IDs in a single round trip"""
+        return {
+            conv_id: self._records[conv_id]
+            for conv_id in conversation_ids
+            if conv_id in self._records
+        }
+
+    def _parse(self, raw: bytes) -> Dict[str, Any]:
+        """Parse a raw record into a conversation dict"""
+        conversation = serialization.loads(raw)
+        for field in ("create_time", "update_time"):
+            if isinstance(conversation.get(field), str):
+                conversation[field] = datetime.fromisoformat(conversation[field])
+        return conversation
+
+    def _cache_put(self, conv_id: str, conversation: Dict[str, Any]) -> None:
+        """Insert a parsed conversation, evicting the least recently used entries"""
+        self._cache[conv_id] = conversation
+        self._cache.move_to_end(conv_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def save(self, conversation: Dict[str, Any]) -> None:
+        """Store or replace a conversation"""
+        raw = serialization.dumps(conversation)
+        with self._lock:
+            self._records[conversation["id"]] = raw
+            self._cache.pop(conversation["id"], None)
+
+    def delete(self, conversation_id: str) -> bool:
+        """Remove a conversation, returning whether it existed"""
+        with self._lock:
+            self._cache.pop(conversation_id, None)
+            return self._records.pop(conversation_id, None) is not None
+
+    def exists(self, conversation_id: str) -> bool:
+        """Check whether a conversation is stored"""
+        return conversation_id in self._records
+
+    def get(self, conversation_id: str, owner: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Get a single conversation by ID"""
+        return self.get_many([conversation_id], owner).get(conversation_id)
+
+    def get_many(self, conversation_ids: Iterable[str],
+                 owner: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Get several conversations at once
+
+        Cache misses are fetched from the store in one batch. The result
+        preserves the order of the requested IDs and skips unknown IDs and
+        conversations not visible to `owner`.
+        """
+        conversation_ids = list(dict.fromkeys(conversation_ids))
+
+        with self._lock:
+            found = {}
+            missing = []
+            for conv_id in conversation_ids:
+                if conv_id in self._cache:
+                    self._cache.move_to_end(conv_id)
+                    found[conv_id] = self._cache[conv_id]
+                else:
+                    missing.append(conv_id)
+
+            if missing:
+                for conv_id, raw in self._fetch(missing).items():
+                    found[conv_id] = self._parse(raw)
+                    self._cache_put(conv_id, found[conv_id])
+
+            return {
+                conv_id: found[conv_id]
+                for conv_id in conversation_ids
+                if conv_id in found and is_visible_to(found[conv_id], owner)
+            }
+
+    def list_all(self, owner: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get every stored conversation visible to `owner`"""
+        return list(self.get_many(list(self._records), owner).values())
+
+    def clear_cache(self) -> None:
+        """Drop all parsed conversations from the cache"""
+        with self._lock:
+            self._cache.clear()
+
+
+# Shared repository instance used by all endpoints
+conversation_repository = ConversationRepository(SEED_CONVERSATIONS)
+
+
+def get_conversation_repository() -> ConversationRepository:
+    """Get the shared conversation repository"""
+    return conversation_repository
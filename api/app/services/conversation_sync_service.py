@@ -0,0 +1,295 @@
+"""
+Conversation Sync Service - incremental retrieval of ChatGPT history
+
+This module pages through the ChatGPT conversation list, fetches only the
+conversations whose update_time changed since the last sync checkpoint and
+stores them in a local on-disk cache. Each ChatGPT account gets its own cache
+directory and checkpoint.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+import requests
+from jose import JWTError, jwt
+
+from app.utils import serialization
+
+# Constants
+DEFAULT_BASE_URL = "https://chat.openai.com/backend-api"
+DEFAULT_CACHE_DIR = os.path.expanduser("~/.total_recall/cache/sync")
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_TIMEOUT = 30  # seconds
+
+# Conversation IDs become file names, so only plain ID characters are allowed
+CONVERSATION_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]+")
+
+
+def is_valid_conversation_id(conversation_id: Any) -> bool:
+    """Check that a conversation ID is safe to use as a file name"""
+    return isinstance(conversation_id, str) and CONVERSATION_ID_PATTERN.fullmatch(conversation_id) is not None
+
+
+def account_key(access_token: str) -> str:
+    """
+    Get a file-name-safe key for the account an access token belongs to
+
+    The key is a hash of the token's subject, so successive tokens of one
+    account share a cache. A token that can't be decoded is hashed whole.
+    """
+    try:
+        subject = jwt.get_unverified_claims(access_token).get("sub")
+    except JWTError:
+        subject = None
+    return hashlib.sha256((subject or access_token).encode()).hexdigest()[:32]
+
+
+def to_repository_record(conversation: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Convert a synced conversation to the conversation repository's record format
+
+    The backend reports times as epoch seconds, the repository stores ISO
+    strings. Returns None for a conversation without any timestamp.
+    """
+    create_time = conversation.get("create_time") or conversation.get("update_time")
+    update_time = conversation.get("update_time") or create_time
+    if create_time is None:
+        return None
+    return {
+        "id": conversation["id"],
+        "title": conversation.get("title") or "",
+        "create_time": datetime.fromtimestamp(create_time).isoformat(),
+        "update_time": datetime.fromtimestamp(update_time).isoformat(),
+        "messages": conversation.get("messages", [])
+    }
+
+
+class ConversationCache:
+    """On-disk cache of synced conversations and the sync checkpoint"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        """Initialize the cache"""
+        self.cache_dir = cache_dir
+        self.conversations_dir = os.path.join(cache_dir, "conversations")
+        self.checkpoint_file = os.path.join(cache_dir, "checkpoint.json")
+        os.makedirs(self.conversations_dir, exist_ok=True)
+
+    def _write_json(self, path: str, data: Any) -> None:
+        """Write a JSON file atomically"""
+        serialization.atomic_write(path, serialization.dumps(data))
+
+    def _conversation_path(self, conversation_id: str) -> str:
+        """
+        Get the cache file path for a conversation
+
+        Raises:
+            ValueError: If the ID could name a file outside the cache directory
+        """
+        if not is_valid_conversation_id(conversation_id):
+            raise ValueError(f"Invalid conversation ID: {conversation_id!r}")
+        return os.path.join(self.conversations_dir, f"{conversation_id}.json")
+
+    def load_checkpoint(self) -> Dict[str, Any]:
+        """Load the mapping of conversation ID to last synced update_time"""
+        if not os.path.exists(self.checkpoint_file):
+            return {}
+        with open(self.checkpoint_file, 'rb') as f:
+            return serialization.loads(f.read())
+
+    def save_checkpoint(self, checkpoint: Dict[str, Any]) -> None:
+        """Save the sync checkpoint"""
+        self._write_json(self.checkpoint_file, checkpoint)
+
+    def save_conversation(self, conversation: Dict[str, Any]) -> None:
+        """Store a conversation in the cache"""
+        self._write_json(self._conversation_path(conversation["id"]), conversation)
+
+    def load_conversation(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """Load a cached conversation"""
+        path = self._conversation_path(conversation_id)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            return serialization.loads(f.read())
+
+    def delete_conversation(self, conversation_id: str) -> None:
+        """Remove a conversation from the cache"""
+        path = self._conversation_path(conversation_id)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def iter_conversations(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over all cached conversations"""
+        for conversation_id in self.load_checkpoint():
+            conversation = self.load_conversation(conversation_id)
+            if conversation is not None:
+                yield conversation
+
+
+class ConversationSyncService:
+    """Incrementally syncs ChatGPT conversations into a local cache"""
+
+    def __init__(self, access_token: str, base_url: str = DEFAULT_BASE_URL,
+                 cache: Optional[ConversationCache] = None,
+                 page_size: int = DEFAULT_PAGE_SIZE,
+                 max_workers: int = DEFAULT_MAX_WORKERS,
+                 timeout: int = DEFAULT_TIMEOUT):
+        """Initialize the sync service"""
+        self.access_token = access_token
+        self.account = account_key(access_token)
+        self.base_url = base_url.rstrip("/")
+        self.cache = cache or ConversationCache(os.path.join(DEFAULT_CACHE_DIR, self.account))
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._local = threading.local()
+        self._sessions: List[requests.Session] = []
+        self._sessions_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _session(self) -> requests.Session:
+        """Get the HTTP session for the current worker thread"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update({
+                "Authorization": f"Bearer {self.access_token}",
+                "Content-Type": "application/json"
+            })
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+
+    def close(self) -> None:
+        """Close the HTTP sessions opened by the worker threads"""
+        with self._sessions_lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+        self._local = threading.local()
+
+    def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Make a GET request against the backend API"""
+        response = self._session().get(f"{self.base_url}{path}", params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def fetch_page(self, offset: int) -> Dict[str, Any]:
+        """Fetch one page of the conversation list"""
+        return self._get("/conversations", params={
+            "offset": offset,
+            "limit": self.page_size,
+            "order": "updated"
+        })
+
+    def list_conversations(self, executor: ThreadPoolExecutor) -> List[Dict[str, Any]]:
+        """
+        List metadata for every conversation
+
+        The first page reports the total, the remaining pages are then
+        fetched concurrently.
+        """
+        first_page = self.fetch_page(0)
+        items = list(first_page.get("items", []))
+        total = first_page.get("total", len(items))
+
+        offsets = range(self.page_size, total, self.page_size)
+        for page in executor.map(self.fetch_page, offsets):
+            items.extend(page.get("items", []))
+
+        # Pages can overlap if the list changes while we are paging
+        return list({item["id"]: item for item in items}.values())
+
+    def fetch_conversation(self, conversation_id: str) -> Dict[str, Any]:
+        """Fetch a conversation and flatten its message tree"""
+        data = self._get(f"/conversation/{conversation_id}")
+        mapping = data.get("mapping") or {}
+
+        # Walk from the current node back to the root to get the active thread
+        messages = []
+        node_id = data.get("current_node")
+        while node_id and node_id in mapping:
+            node = mapping[node_id]
+            message = node.get("message")
+            if message and message.get("content", {}).get("parts"):
+                messages.append({
+                    "role": message.get("author", {}).get("role"),
+                    "content": "\n".join(str(part) for part in message["content"]["parts"]),
+                    "create_time": message.get("create_time")
+                })
+            node_id = node.get("parent")
+        messages.reverse()
+
+        return {
+            "id": data.get("conversation_id", conversation_id),
+            "title": data.get("title"),
+            "create_time": data.get("create_time"),
+            "update_time": data.get("update_time"),
+            "messages": messages
+        }
+
+    def sync(self) -> Dict[str, Any]:
+        """
+        Sync the local cache with the backend
+
+        Returns:
+            Summary with counts of listed, fetched, unchanged, deleted and
+            failed conversations, plus the IDs of the fetched and deleted
+            conversations (fetched_ids, deleted_ids)
+        """
+        checkpoint = self.cache.load_checkpoint()
+        fetched_ids = []
+        failed = []
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                items = self.list_conversations(executor)
+                changed = [item for item in items if checkpoint.get(item["id"]) != item.get("update_time")]
+
+                futures = {}
+                for item in changed:
+                    if not is_valid_conversation_id(item["id"]):
+                        failed.append({"id": item["id"], "reason": "Invalid conversation ID"})
+                        continue
+                    futures[item["id"]] = (item, executor.submit(self.fetch_conversation, item["id"]))
+
+                for conversation_id, (item, future) in futures.items():
+                    try:
+                        self.cache.save_conversation(future.result())
+                        checkpoint[conversation_id] = item.get("update_time")
+                        fetched_ids.append(conversation_id)
+                    except Exception as e:
+                        failed.append({"id": conversation_id, "reason": str(e)})
+        finally:
+            self.close()
+
+        # Drop conversations that no longer exist upstream
+        listed_ids = {item["id"] for item in items}
+        deleted = [conversation_id for conversation_id in checkpoint if conversation_id not in listed_ids]
+        for conversation_id in deleted:
+            self.cache.delete_conversation(conversation_id)
+            del checkpoint[conversation_id]
+
+        self.cache.save_checkpoint(checkpoint)
+
+        return {
+            "listed": len(items),
+            "fetched": len(fetched_ids),
+            "unchanged": len(items) - len(changed),
+            "deleted": len(deleted),
+            "failed": failed,
+            "fetched_ids": fetched_ids,
+            "deleted_ids": deleted
+        }
@@ -0,0 +1,160 @@
+"""
+Export Formatting Service - build export files off the event loop
+
+Conversations are formatted in chunks on a dedicated executor. Each chunk is
+handed back to the event loop as a finished string fragment, so the loop only
+schedules work and reports progress between chunks while the CPU-bound
+formatting happens elsewhere. The fragments concatenate to exactly the same
+output as formatting everything in one go.
+"""
+
+import io
+import csv
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app import config
+from app.models.schemas import ExportFormat
+from app.utils import serialization
+
+# Constants
+SEPARATOR = "=" * 50
+
+ProgressCallback = Callable[[float], Optional[Awaitable[None]]]
+
+# Executor used for formatting, created on first use
+_executor: Optional[Executor] = None
+
+
+def get_executor() -> Executor:
+    """Get the shared formatting executor"""
+    global _executor
+    if _executor is None:
+        if config.EXPORT_EXECUTOR == "process":
+            _executor = ProcessPoolExecutor(max_workers=config.EXPORT_WORKERS)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=config.EXPORT_WORKERS, thread_name_prefix="export")
+    return _executor
+
+
+def shutdown_executor() -> None:
+    """Shut down the shared formatting executor"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+
+def _json_item(conv: Dict[str, Any], include_metadata: bool) -> Dict[str, Any]:
+    """Build the JSON export entry for a conversation"""
+    export_item = {
+        "id": conv["id"],
+        "title": conv["title"],
+        "messages": [
+            {
+                "role": msg["role"],
+                "content": msg["content"]
+            }
+            for msg in conv["messages"]
+        ]
+    }
+    if include_metadata:
+        export_item["create_time"] = conv["create_time"].isoformat()
+        export_item["update_time"] = conv["update_time"].isoformat()
+    return export_item
+
+
+def format_chunk(conversations: List[Dict[str, Any]], format: ExportFormat,
+                 include_metadata: bool, first: bool) -> str:
+    """
+    Format one chunk of conversations
+
+    Args:
+        conversations: Conversations in this chunk
+        format: Export format (JSON, CSV, TXT)
+        include_metadata: Whether to include metadata in export
+        first: Whether this is the first chunk of the export
+
+    Returns:
+        The chunk's fragment of the export file
+    """
+    if format == ExportFormat.JSON:
+        # Same output as json.dumps(all_items, indent=2), non-ASCII escaped, built item by item
+        items = [
+            "  " + serialization.dumps_str(_json_item(conv, include_metadata), indent=True,
+                                           ensure_ascii=True).replace("\n", "\n  ")
+            for conv in conversations
+        ]
+        body = ",\n".join(items)
+        return body if first else ",\n" + body
+
+    if format == ExportFormat.CSV:
+        output = io.StringIO()
+        writer = csv.writer(output)
+        if first:
+            header = ["Conversation ID", "Title", "Role", "Content"]
+            if include_metadata:
+                header.extend(["Create Time", "Update Time"])
+            writer.writerow(header)
+        for conv in conversations:
+            metadata = [conv["create_time"].isoformat(), conv["update_time"].isoformat()] if include_metadata else []
+            for msg in conv["messages"]:
+                writer.writerow([conv["id"], conv["title"], msg["role"], msg["content"]] + metadata)
+        return output.getvalue()
+
+    # TXT format
+    parts = []
+    for conv in conversations:
+        parts.append(f"Conversation: {conv['title']}\n")
+        if include_metadata:
+            parts.append(f"ID: {conv['id']}\n")
+            parts.append(f"Created: {conv['create_time'].isoformat()}\n")
+            parts.append(f"Updated: {conv['update_time'].isoformat()}\n")
+        parts.append(SEPARATOR + "\n\n")
+        for msg in conv["messages"]:
+            parts.append(f"{msg['role'].upper()}: {msg['content']}\n\n")
+        parts.append("\n" + SEPARATOR + "\n\n")
+    return "".join(parts)
+
+
+async def format_export(conversations: List[Dict[str, Any]], format: ExportFormat,
+                        include_metadata: bool, chunk_size: Optional[int] = None,
+                        executor: Optional[Executor] = None,
+                        on_progress: Optional[ProgressCallback] = None) -> str:
+    """
+    Format an export on the executor, one chunk of conversations at a time
+
+    Args:
+        conversations: Conversations to export
+        format: Export format (JSON, CSV, TXT)
+        include_metadata: Whether to include metadata in export
+        chunk_size: Conversations per chunk
+        executor: Executor to format on (defaults to the shared one)
+        on_progress: Called with the fraction of conversations formatted
+            after each chunk; may be a coroutine function
+
+    Returns:
+        The export file content
+    """
+    loop = asyncio.get_running_loop()
+    executor = executor or get_executor()
+    chunk_size = chunk_size or config.EXPORT_CHUNK_SIZE
+
+    fragments = []
+    total = len(conversations)
+    for start in range(0, total, chunk_size):
+        chunk = conversations[start:start + chunk_size]
+        fragments.append(await loop.run_in_executor(
+            executor, format_chunk, chunk, format, include_metadata, start == 0
+        ))
+        if on_progress is not None:
+            result = on_progress(min(start + chunk_size, total) / total)
+            if asyncio.iscoroutine(result):
+                await result
+
+    if format == ExportFormat.JSON:
+        fragments = ["[\n"] + fragments + ["\n]"] if fragments else ["[]"]
+
+    # Joining a large export is a big copy too, so it runs on the executor as well
+    return await loop.run_in_executor(executor, "".join, fragments)
@@ -0,0 +1,186 @@
+"""
+Profiler Service - sampling profiler and event-loop lag probe
+
+The sampling profiler runs in a background thread and periodically records
+the stack of every other thread via sys._current_frames(), aggregating them
+into collapsed stacks ("frame;frame;frame count"), the input format of
+flamegraph.pl, speedscope and similar tools. Sampling costs the profiled
+code nothing beyond GIL contention while a profile is running.
+
+The loop lag probe uses the loop monitor's lag measurement (a sleep that
+records how much later than requested it wakes up) at the profile's own
+interval, so it works whether or not the loop monitor is enabled.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from app.utils.loop_monitor import lag_samples
+
+# Constants
+DEFAULT_SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+DEFAULT_LAG_INTERVAL = 0.01  # seconds between loop lag probes
+MAX_STACK_DEPTH = 128
+
+
+def _frame_label(frame) -> str:
+    """Label a frame as file:function"""
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class SamplingProfiler:
+    """Samples the stacks of all threads from a background thread"""
+
+    def __init__(self, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        """Initialize the profiler"""
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        """Record the current stack of every thread except the sampler"""
+        own_id = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            labels = []
+            while frame is not None and len(labels) < MAX_STACK_DEPTH:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            labels.append(names.get(thread_id, f"thread-{thread_id}"))
+            labels.reverse()
+            self.stacks[";".join(labels)] += 1
+        self.samples += 1
+
+    def _run(self) -> None:
+        """Sample until stopped"""
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> None:
+        """Start sampling"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def collapsed(self) -> str:
+        """Get the samples as collapsed stacks, one "stack count" per line"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class LoopLagProbe:
+    """Measures how late the event loop runs scheduled callbacks"""
+
+    def __init__(self, interval: float = DEFAULT_LAG_INTERVAL):
+        """Initialize the probe"""
+        self.interval = interval
+        self.lags: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        """Record how late each wakeup is"""
+        async for lag in lag_samples(self.interval):
+            self.lags.append(lag)
+
+    def start(self) -> None:
+        """Start probing on the running loop"""
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop probing"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def summary(self) -> Dict[str, float]:
+        """Summarize the measured lag in milliseconds"""
+        if not self.lags:
+            return {"probes": 0, "mean_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        ordered = sorted(self.lags)
+        p99 = ordered[min(int(len(ordered) * 0.99), len(ordered) - 1)]
+        return {
+            "probes": len(ordered),
+            "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+            "p99_ms": round(p99 * 1000, 3),
+            "max_ms": round(ordered[-1] * 1000, 3)
+        }
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profile is requested while another is running"""
+
+
+class ProfilerService:
+    """Runs one profiling session at a time over the current process"""
+
+    def __init__(self):
+        """Initialize the profiler service"""
+        self._running = False
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    async def profile(self, duration: float, interval: float = DEFAULT_SAMPLE_INTERVAL,
+                      lag_interval: float = DEFAULT_LAG_INTERVAL) -> Dict[str, Any]:
+        """
+        Profile the process for a number of seconds
+
+        Args:
+            duration: Seconds to profile for
+            interval: Seconds between stack samples
+            lag_interval: Seconds between loop lag probes
+
+        Returns:
+            Dictionary with the sample count, collapsed stacks and loop lag
+
+        Raises:
+            ProfilerBusyError: If a profile is already running
+        """
+        if self._running:
+            raise ProfilerBusyError("A profile is already running")
+        self._running = True
+
+        profiler = SamplingProfiler(interval)
+        probe = LoopLagProbe(lag_interval)
+        started = time.perf_counter()
+        try:
+            profiler.start()
+            probe.start()
+            await asyncio.sleep(duration)
+        finally:
+            await probe.stop()
+            profiler.stop()
+            self._running = False
+
+        return {
+            "duration": round(time.perf_counter() - started, 3),
+            "samples": profiler.samples,
+            "interval": interval,
+            "collapsed": profiler.collapsed(),
+            "loop_lag": probe.summary()
+        }
+
+
+# Shared profiler service
+profiler_service = ProfilerService()
@@ -0,0 +1,247 @@
+"""
+Progress Tracking Service - push task progress to WebSocket clients
+
+Background tasks publish their state to the progress hub. Clients subscribe
+to the tasks they care about over the WebSocket and receive only the fields
+that changed since the last update. Updates for a task are coalesced so that
+at most one message per task is sent every `min_interval` seconds; terminal
+states (completed/failed) are always sent immediately.
+
+When a backplane is attached, published states travel through it first so
+that every API worker's hub sees them, not just the one running the task.
+
+Tasks registered with an owner carry it in their state. Clients subscribed
+on behalf of a user only receive the tasks that user owns; only unrestricted
+(admin) subscriptions may use ALL_TASKS. Once a task reaches a terminal
+state its final state is kept for `finished_ttl` seconds (at most
+`max_finished` tasks) for late subscribers, and its other entries are dropped.
+"""
+
+import time
+import asyncio
+from collections import OrderedDict
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+
+# Constants
+DEFAULT_MIN_INTERVAL = 0.05  # seconds between updates for one task
+DEFAULT_FINISHED_TTL = 300  # seconds a finished task's final state is kept
+DEFAULT_MAX_FINISHED = 1024  # finished tasks kept at most
+PROGRESS_EVENT = "progress_update"
+ALL_TASKS = "*"
+TERMINAL_STATUSES = {"completed", "failed"}
+
+Sender = Callable[[Iterable[str], str, Dict[str, Any]], Awaitable[None]]
+Backplane = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+def _plain(value: Any) -> Any:
+    """Convert enum values to their JSON-friendly form"""
+    return value.value if isinstance(value, Enum) else value
+
+
+class ProgressHub:
+    """Pub/sub hub for background task progress"""
+
+    def __init__(self, min_interval: float = DEFAULT_MIN_INTERVAL, sender: Optional[Sender] = None,
+                 finished_ttl: float = DEFAULT_FINISHED_TTL, max_finished: int = DEFAULT_MAX_FINISHED):
+        """Initialize the progress hub"""
+        self.min_interval = min_interval
+        self.sender = sender
+        self.finished_ttl = finished_ttl
+        self.max_finished = max_finished
+        self.backplane: Optional[Backplane] = None
+        self._subscriptions: Dict[str, Set[str]] = {}
+        self._client_users: Dict[str, Optional[str]] = {}  # None means unrestricted
+        self._owners: Dict[str, str] = {}  # Owners of tasks published from this worker
+        self._latest: Dict[str, Dict[str, Any]] = {}
+        self._finished: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._sent: Dict[str, Dict[str, Any]] = {}
+        self._last_flush: Dict[str, float] = {}
+        self._scheduled: Dict[str, asyncio.TimerHandle] = {}
+        self._deliveries: Set[asyncio.Task] = set()
+
+    def set_sender(self, sender: Sender) -> None:
+        """Set the coroutine used to deliver one message to a set of clients"""
+        self.sender = sender
+
+    def set_backplane(self, backplane: Optional[Backplane]) -> None:
+        """Set the coroutine that shares published states with all workers"""
+        self.backplane = backplane
+
+    def register(self, task_id: str, owner: str) -> None:
+        """Record the user a task belongs to; its published states carry the owner"""
+        self._owners[task_id] = owner
+
+    def _state(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Get the latest state of a running or recently finished task"""
+        if task_id in self._latest:
+            return self._latest[task_id]
+        self._prune_finished()
+        entry = self._finished.get(task_id)
+        return entry[1] if entry else None
+
+    def _allowed(self, user: Optional[str], state: Optional[Dict[str, Any]]) -> bool:
+        """Check whether a user may see a task state (None means unrestricted)"""
+        return user is None or (state is not None and state.get("owner") == user)
+
+    def subscribe(self, client_id: str, task_id: str = ALL_TASKS,
+                  user: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Subscribe a client to a task's progress
+
+        Args:
+            client_id: Client ID
+            task_id: Task ID, or ALL_TASKS
+            user: User the client acts for; only tasks they own are delivered.
+                None subscribes without restriction (admins)
+
+        Returns:
+            The task's current state, so the client starts from a full snapshot
+
+        Raises:
+            PermissionError: If a user subscribes to all tasks or to a task owned by someone else
+        """
+        state = self._state(task_id)
+        if user is not None:
+            if task_id == ALL_TASKS:
+                raise PermissionError("Only admins can subscribe to all tasks")
+            if state is not None and not self._allowed(user, state):
+                raise PermissionError("Task belongs to another user")
+
+        self._subscriptions.setdefault(client_id, set()).add(task_id)
+        self._client_users[client_id] = user
+        return self.snapshot(task_id)
+
+    def snapshot(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Get the full current state of a task, as sent to a client starting from scratch"""
+        state = self._state(task_id)
+        return dict(state, task_id=task_id) if state else None
+
+    def unsubscribe(self, client_id: str, task_id: Optional[str] = None) -> None:
+        """Unsubscribe a client from one task, or from everything"""
+        if task_id is None:
+            self._subscriptions.pop(client_id, None)
+            self._client_users.pop(client_id, None)
+            return
+        tasks = self._subscriptions.get(client_id)
+        if tasks is not None:
+            tasks.discard(task_id)
+            if not tasks:
+                del self._subscriptions[client_id]
+                self._client_users.pop(client_id, None)
+
+    def subscribers(self, task_id: str) -> Set[str]:
+        """Get the clients subscribed to a task and allowed to see it"""
+        state = self._state(task_id)
+        return {
+            client_id for client_id, tasks in self._subscriptions.items()
+            if (task_id in tasks or ALL_TASKS in tasks)
+            and self._allowed(self._client_users.get(client_id), state)
+        }
+
+    def publish(self, task_id: str, state: Dict[str, Any], task_type: Optional[str] = None) -> None:
+        """
+        Publish the current state of a task
+
+        Safe to call as often as a task likes; delivery is coalesced.
+
+        Args:
+            task_id: Task ID
+            state: Current task state
+            task_type: Kind of task (processing, injection, export)
+        """
+        latest = {key: _plain(value) for key, value in state.items()}
+        if task_type is not None:
+            latest["task_type"] = task_type
+        if task_id in self._owners:
+            latest["owner"] = self._owners[task_id]
+            if latest.get("status") in TERMINAL_STATUSES:
+                del self._owners[task_id]
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is not None and self.backplane is not None:
+            forward = loop.create_task(self.backplane(task_id, latest))
+            self._deliveries.add(forward)
+            forward.add_done_callback(self._deliveries.discard)
+        else:
+            self.apply(task_id, latest)
+
+    def apply(self, task_id: str, latest: Dict[str, Any]) -> None:
+        """Record a task state and schedule delivery to local subscribers"""
+        self._finished.pop(task_id, None)
+        self._latest[task_id] = latest
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No loop (e.g. called from sync code) - clients get the state on subscribe
+            if latest.get("status") in TERMINAL_STATUSES:
+                self._finish(task_id)
+            return
+
+        if self._latest[task_id].get("status") in TERMINAL_STATUSES:
+            handle = self._scheduled.pop(task_id, None)
+            if handle is not None:
+                handle.cancel()
+            self._flush(task_id)
+            return
+
+        if task_id in self._scheduled:
+            return
+
+        delay = self._last_flush.get(task_id, 0.0) + self.min_interval - loop.time()
+        if delay <= 0:
+            self._flush(task_id)
+        else:
+            self._scheduled[task_id] = loop.call_later(delay, self._flush, task_id)
+
+    def _flush(self, task_id: str) -> None:
+        """Send the changes since the last update to subscribed clients"""
+        self._scheduled.pop(task_id, None)
+        loop = asyncio.get_running_loop()
+        self._last_flush[task_id] = loop.time()
+
+        latest = self._latest.get(task_id, {})
+        sent = self._sent.get(task_id, {})
+        delta = {key: value for key, value in latest.items() if sent.get(key) != value}
+        self._sent[task_id] = dict(latest)
+
+        client_ids = self.subscribers(task_id) if delta and self.sender is not None else set()
+        if latest.get("status") in TERMINAL_STATUSES:
+            self._finish(task_id)
+
+        if not client_ids:
+            return
+
+        delta["task_id"] = task_id
+        delivery = loop.create_task(self.sender(client_ids, PROGRESS_EVENT, delta))
+        self._deliveries.add(delivery)
+        delivery.add_done_callback(self._deliveries.discard)
+
+    def _finish(self, task_id: str) -> None:
+        """Drop a finished task's delivery state, keeping its final state for late subscribers"""
+        latest = self._latest.pop(task_id, None)
+        self._sent.pop(task_id, None)
+        self._last_flush.pop(task_id, None)
+        if latest is not None:
+            self._finished[task_id] = (time.monotonic() + self.finished_ttl, latest)
+            self._finished.move_to_end(task_id)
+        self._prune_finished()
+
+    def _prune_finished(self) -> None:
+        """Forget finished tasks past their TTL or beyond max_finished"""
+        now = time.monotonic()
+        while self._finished:
+            task_id, (expires, _) = next(iter(self._finished.items()))
+            if expires > now and len(self._finished) <= self.max_finished:
+                break
+            del self._finished[task_id]
+
+
+# Shared hub used by the background tasks and the WebSocket endpoint
+progress_hub = ProgressHub()
@@ -0,0 +1,166 @@
+"""
+Pub/Sub Service - event backplane shared by API workers
+
+Events published by any worker are delivered to the handler registered by
+every worker, so WebSocket clients receive events regardless of which worker
+they are connected to. Two brokers are available:
+
+- InProcessBroker: delivers within the current process (single worker)
+- SQLiteBroker: appends events to a shared SQLite database that every
+  worker polls, for running several workers on one host
+"""
+
+import asyncio
+import os
+import sqlite3
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app import config
+from app.utils import serialization
+
+Handler = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+class Broker:
+    """Base class for pub/sub brokers"""
+
+    def __init__(self):
+        self.handler: Optional[Handler] = None
+
+    async def start(self, handler: Handler) -> None:
+        """Start receiving events, passing each one to the handler"""
+        self.handler = handler
+
+    async def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        """Publish an event to every worker"""
+        raise NotImplementedError
+
+    async def stop(self) -> None:
+        """Stop receiving events"""
+        self.handler = None
+
+
+class InProcessBroker(Broker):
+    """Delivers events directly to the local handler"""
+
+    async def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        """Publish an event to this process"""
+        if self.handler is not None:
+            await self.handler(channel, message)
+
+
+class SQLiteBroker(Broker):
+    """
+    Shares events between processes through a SQLite database
+
+    Each worker polls for rows newer than the last one it has seen. Old rows
+    are removed after the retention period.
+    """
+
+    def __init__(self, path: str, poll_interval: float = config.BROKER_POLL_INTERVAL,
+                 retention: float = config.BROKER_RETENTION):
+        super().__init__()
+        self.path = path
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._last_id = 0
+        self._poller: Optional[asyncio.Task] = None
+        self._connection: Optional[sqlite3.Connection] = None
+        self._publish_lock = asyncio.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the shared database, creating the events table if needed"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "channel TEXT NOT NULL, "
+            "payload TEXT NOT NULL, "
+            "created REAL NOT NULL)"
+        )
+        return connection
+
+    async def start(self, handler: Handler) -> None:
+        """Start polling for events published after this point"""
+        await super().start(handler)
+        self._connection = self._connect()
+        row = self._connection.execute("SELECT MAX(id) FROM events").fetchone()
+        self._last_id = row[0] or 0
+        self._poller = asyncio.create_task(self._poll_loop())
+
+    def _insert(self, channel: str, payload: str) -> None:
+        """Append an event and expire old ones"""
+        now = time.time()
+        self._connection.execute(
+            "INSERT INTO events (channel, payload, created) VALUES (?, ?, ?)",
+            (channel, payload, now)
+        )
+        self._connection.execute("DELETE FROM events WHERE created < ?", (now - self.retention,))
+
+    async def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        """Publish an event to all workers"""
+        # Inserts run in a thread; the lock keeps them in publish order
+        async with self._publish_lock:
+            await asyncio.to_thread(self._insert, channel, serialization.dumps_str(message))
+
+    def _fetch_new(self):
+        """Fetch events newer than the last one seen"""
+        return self._connection.execute(
+            "SELECT id, channel, payload FROM events WHERE id > ? ORDER BY id",
+            (self._last_id,)
+        ).fetchall()
+
+    async def _poll_loop(self) -> None:
+        """Deliver new events to the handler until stopped"""
+        while True:
+            try:
+                rows = await asyncio.to_thread(self._fetch_new)
+                for row_id, channel, payload in rows:
+                    self._last_id = row_id
+                    if self.handler is not None:
+                        await self.handler(channel, serialization.loads(payload))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # A locked or briefly unavailable database - try again next poll
+                pass
+            await asyncio.sleep(self.poll_interval)
+
+    async def stop(self) -> None:
+        """Stop polling and close the database"""
+        if self._poller is not None:
+            self._poller.cancel()
+            try:
+                await self._poller
+            except asyncio.CancelledError:
+                pass
+            self._poller = None
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        await super().stop()
+
+
+def create_broker(url: str = config.BROKER_URL) -> Broker:
+    """
+    Create a broker from a URL
+
+    Args:
+        url: "memory://" or "sqlite:///path/to/events.db"
+
+    Returns:
+        Broker instance
+
+    Raises:
+        ValueError: If the URL scheme is not supported
+    """
+    if url == "memory://":
+        return InProcessBroker()
+    if url.startswith("sqlite:///"):
+        return SQLiteBroker(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported broker URL: {url}")
@@ -0,0 +1,174 @@
+"""
+Logger - non-blocking structured logging for the API
+
+Records are put on an in-memory queue by a QueueHandler and written by a
+QueueListener thread, so message formatting, JSON encoding and stream I/O
+never run on the event loop. Until the listener is started (and after it
+is stopped) records are written directly, so nothing piles up on the queue
+if the application never starts it. Access log records can be sampled per route so
+high-frequency polling endpoints don't flood the logs.
+"""
+
+import sys
+import json
+import queue
+import random
+import logging
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+# Constants
+ACCESS_LOGGER_NAME = "total_recall.access"
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Attributes every LogRecord has; anything else was passed via `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+# Set by configure_logging(): the output handler, and the queue handler and listener in front of it
+_output: Optional[logging.Handler] = None
+_queue_handler: Optional[QueueHandler] = None
+_listener: Optional[QueueListener] = None
+_started = False
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including `extra` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread
+
+    The stock QueueHandler formats the message before enqueueing it, which
+    would keep the formatting cost on the caller. Only exception info is
+    rendered here, since traceback frames can't safely be read later.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+class RouteSampler(logging.Filter):
+    """
+    Keep a fraction of access log records per route template
+
+    Records without a `route` attribute, and responses with a 5xx status,
+    are always kept.
+    """
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None, default_rate: float = 1.0):
+        super().__init__()
+        self.rates = rates or {}
+        self.default_rate = default_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        route = getattr(record, "route", None)
+        if route is None or getattr(record, "status", 0) >= 500:
+            return True
+        rate = self.rates.get(route, self.default_rate)
+        return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """
+    Parse per-route sample rates
+
+    Args:
+        spec: Comma-separated route=rate pairs, e.g. "/health=0,/api/processing/process/{task_id}=0.1"
+
+    Returns:
+        Mapping of route template to the fraction of records kept
+    """
+    rates = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        route, _, rate = item.rpartition("=")
+        if not route:
+            raise ValueError(f"Invalid log sample rate: {item!r}")
+        rates[route.strip()] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+def configure_logging(level: str = "INFO", fmt: str = "json",
+                      sample_rates: Optional[Dict[str, float]] = None,
+                      stream=None) -> QueueListener:
+    """
+    Set up logging, writing records directly until start_logging() is called
+
+    Args:
+        level: Root log level
+        fmt: "json" for structured output, "text" for the plain format
+        sample_rates: Per-route sample rates for the access log
+        stream: Output stream (defaults to stderr)
+
+    Returns:
+        The queue listener that writes the records once started
+    """
+    global _output, _queue_handler, _listener
+    stop_logging()
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(output)
+    root.setLevel(level)
+
+    access_logger = logging.getLogger(ACCESS_LOGGER_NAME)
+    for existing in list(access_logger.filters):
+        if isinstance(existing, RouteSampler):
+            access_logger.removeFilter(existing)
+    access_logger.addFilter(RouteSampler(sample_rates))
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    _output = output
+    _queue_handler = DeferredQueueHandler(log_queue)
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    return _listener
+
+
+def start_logging() -> None:
+    """Start writing records from a background thread"""
+    global _started
+    if _listener is None or _started:
+        return
+    _listener.start()
+    root = logging.getLogger()
+    root.addHandler(_queue_handler)
+    root.removeHandler(_output)
+    _started = True
+
+
+def stop_logging() -> None:
+    """Write any queued records, stop the background writer and write directly again"""
+    global _started
+    if not _started:
+        return
+    root = logging.getLogger()
+    root.addHandler(_output)
+    root.removeHandler(_queue_handler)
+    _listener.stop()
+    _started = False
@@ -0,0 +1,151 @@
+"""
+Loop Monitor - event loop lag watchdog and slow callback detector
+
+A heartbeat coroutine wakes up every `interval` seconds and records how late
+it ran in a histogram. A watchdog thread checks the heartbeat; when it stops
+beating for longer than `threshold` the loop is blocked by a callback, and
+the watchdog captures the loop thread's stack at that moment, which points
+at the code holding the loop. Once the loop recovers, the total time it was
+blocked is recorded alongside the stack.
+
+Unlike asyncio debug mode, this is cheap enough to leave on in production.
+"""
+
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+from app import config
+from app.utils import metrics
+
+# Constants
+DEFAULT_INTERVAL = 0.05  # seconds between heartbeats
+DEFAULT_THRESHOLD = 0.1  # seconds the loop may be blocked before a stack is captured
+DEFAULT_HISTORY = 100  # slow callbacks kept for inspection
+STACK_LIMIT = 30  # innermost frames kept per captured stack
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+LOOP_LAG = metrics.registry.histogram(
+    "total_recall_event_loop_lag_seconds",
+    "How late the event loop ran a scheduled heartbeat", buckets=LAG_BUCKETS)
+SLOW_CALLBACK_DURATION = metrics.registry.histogram(
+    "total_recall_slow_callback_duration_seconds",
+    "How long slow callbacks blocked the event loop", buckets=LAG_BUCKETS)
+SLOW_CALLBACKS = metrics.registry.counter(
+    "total_recall_slow_callbacks", "Callbacks that blocked the event loop beyond the threshold")
+
+logger = logging.getLogger("total_recall.loop_monitor")
+
+
+async def lag_samples(interval: float) -> AsyncIterator[float]:
+    """Sleep for interval over and over, yielding how late each wakeup was"""
+    loop = asyncio.get_running_loop()
+    while True:
+        scheduled = loop.time() + interval
+        await asyncio.sleep(interval)
+        yield max(loop.time() - scheduled, 0.0)
+
+
+class LoopMonitor:
+    """Watches the running event loop for lag and slow callbacks"""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, threshold: float = DEFAULT_THRESHOLD,
+                 history: int = DEFAULT_HISTORY):
+        """Initialize the loop monitor"""
+        self.interval = interval
+        self.threshold = threshold
+        self.slow_callbacks: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._pending: Optional[Dict[str, Any]] = None
+        self._last_beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._heartbeat_task is not None
+
+    async def _heartbeat(self) -> None:
+        """Beat every interval and record how late each beat was"""
+        self._last_beat = time.monotonic()
+        async for lag in lag_samples(self.interval):
+            LOOP_LAG.observe(lag)
+
+            if lag >= self.threshold:
+                SLOW_CALLBACK_DURATION.observe(lag)
+                with self._lock:
+                    pending, self._pending = self._pending, None
+                if pending is not None:
+                    pending["duration"] = round(lag, 4)
+                    logger.warning(
+                        "Event loop blocked for %.3fs\n%s", lag, pending["stack"],
+                        extra={"blocked_seconds": round(lag, 4)}
+                    )
+            self._last_beat = time.monotonic()
+
+    def _capture(self, blocked_for: float) -> None:
+        """Record the stack of the blocked loop thread"""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame, limit=STACK_LIMIT)) if frame is not None else ""
+        record = {
+            "detected_at": time.time(),
+            "blocked_for_at_capture": round(blocked_for, 4),
+            "duration": None,
+            "stack": stack
+        }
+        with self._lock:
+            self._pending = record
+            self.slow_callbacks.append(record)
+        SLOW_CALLBACKS.inc()
+
+    def _watch(self) -> None:
+        """Capture one stack per stall of the heartbeat"""
+        captured_beat = None
+        check_interval = min(self.interval, self.threshold) / 2
+        while not self._stop.wait(check_interval):
+            beat = self._last_beat
+            blocked_for = time.monotonic() - beat - self.interval
+            if blocked_for >= self.threshold and beat != captured_beat:
+                captured_beat = beat
+                self._capture(blocked_for)
+
+    def start(self) -> None:
+        """Start monitoring the running event loop"""
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._heartbeat_task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._stop.clear()
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        """Stop monitoring"""
+        self._stop.set()
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat_task = None
+
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Get the most recent slow callbacks, newest first"""
+        with self._lock:
+            return list(self.slow_callbacks)[::-1][:limit]
+
+
+# Shared monitor for the API event loop, started in the app lifespan
+loop_monitor = LoopMonitor(interval=config.LOOP_MONITOR_INTERVAL, threshold=config.SLOW_CALLBACK_THRESHOLD)
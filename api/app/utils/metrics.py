@@ -0,0 +1,267 @@
+"""
+Metrics - lightweight request and task metrics with Prometheus exposition
+
+Counters, gauges and histograms keep their values in plain dicts keyed by
+label tuples, so recording a sample costs a dict lookup and an addition.
+Everything runs on the event loop thread; no locking is needed.
+"""
+
+import time
+import logging
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Constants
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the exposition format"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Format a label set as {name="value",...}"""
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value"""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base class for metrics"""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        """Yield (suffix, formatted labels, value) for every sample"""
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        """Render the metric in the Prometheus text format"""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}"
+        ]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    """Monotonically increasing counter"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, labels: LabelValues = (), amount: float = 1) -> None:
+        """Increase the counter"""
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self):
+        for labels, value in self.values.items():
+            yield "_total", _format_labels(self.labelnames, labels), value
+
+
+class Gauge(Metric):
+    """Value that can go up and down, or is read from a callback"""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 callback: Optional[Callable[[], Dict[LabelValues, float]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self.values: Dict[LabelValues, float] = {}
+        self.callback = callback
+
+    def set(self, value: float, labels: LabelValues = ()) -> None:
+        """Set the gauge"""
+        self.values[labels] = value
+
+    def inc(self, labels: LabelValues = (), amount: float = 1) -> None:
+        """Increase the gauge"""
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def dec(self, labels: LabelValues = (), amount: float = 1) -> None:
+        """Decrease the gauge"""
+        self.values[labels] = self.values.get(labels, 0) - amount
+
+    def samples(self):
+        values = self.callback() if self.callback is not None else self.values
+        for labels, value in values.items():
+            yield "", _format_labels(self.labelnames, labels), value
+
+
+class Histogram(Metric):
+    """Distribution of observed values in fixed buckets"""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (last one is +Inf), sum, count]
+        self.values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, labels: LabelValues = ()) -> None:
+        """Record an observation"""
+        entry = self.values.get(labels)
+        if entry is None:
+            entry = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def snapshot(self, labels: LabelValues = ()) -> Dict[str, object]:
+        """Get cumulative bucket counts, sum and count for one label set"""
+        counts, total, count = self.values.get(labels, [[0] * (len(self.buckets) + 1), 0.0, 0])
+        cumulative = []
+        running = 0
+        for upper, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            running += bucket_count
+            cumulative.append((upper, running))
+        return {"buckets": cumulative, "sum": total, "count": count}
+
+    def samples(self):
+        for labels in list(self.values):
+            snapshot = self.snapshot(labels)
+            for upper, running in snapshot["buckets"]:
+                bucket_labels = _format_labels(self.labelnames + ("le",), labels + (_format_value(upper),))
+                yield "_bucket", bucket_labels, running
+            formatted = _format_labels(self.labelnames, labels)
+            yield "_sum", formatted, snapshot["sum"]
+            yield "_count", formatted, snapshot["count"]
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together at /metrics"""
+
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """Register a metric, returning the existing one if the name is taken"""
+        return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+              callback: Optional[Callable[[], Dict[LabelValues, float]]] = None) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, callback))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text format"""
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Shared registry and the HTTP metrics recorded by the middleware
+registry = MetricsRegistry()
+
+REQUESTS = registry.counter(
+    "total_recall_http_requests", "HTTP requests handled", ("method", "route", "status"))
+REQUEST_LATENCY = registry.histogram(
+    "total_recall_http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+REQUESTS_IN_FLIGHT = registry.gauge(
+    "total_recall_http_requests_in_flight", "HTTP requests currently being handled")
+RESPONSE_BYTES = registry.counter(
+    "total_recall_http_response_bytes", "HTTP response body bytes sent", ("method", "route"))
+
+
+def route_template(scope) -> str:
+    """
+    Get the path template of the matched route, e.g. /api/inject/{task_id}
+
+    Routers included with a prefix may report a template relative to that
+    prefix, so the prefix is recovered from the concrete request path.
+    """
+    template = getattr(scope.get("route"), "path", None)
+    if template is None:
+        return "unmatched"
+
+    path = scope["path"]
+    try:
+        rendered = template.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return template
+    if rendered != path and path.endswith(rendered):
+        return path[:len(path) - len(rendered)] + template
+    return template
+
+
+class RequestMetricsMiddleware:
+    """
+    ASGI middleware recording per-route request metrics
+
+    Routes are labelled by their path template (e.g. /api/inject/{task_id})
+    so label cardinality stays bounded. The per-request log line is optional
+    and only formatted if the logger actually emits it.
+    """
+
+    def __init__(self, app, logger: Optional[logging.Logger] = None, log_requests: bool = True):
+        self.app = app
+        self.logger = logger
+        self.log_requests = log_requests and logger is not None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status = [500]
+        sent_bytes = [0]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            elif message["type"] == "http.response.body":
+                sent_bytes[0] += len(message.get("body", b""))
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            process_time = time.perf_counter() - start_time
+            route_path = route_template(scope)
+            method = scope["method"]
+
+            REQUESTS.inc((method, route_path, str(status[0])))
+            REQUEST_LATENCY.observe(process_time, (method, route_path))
+            RESPONSE_BYTES.inc((method, route_path), sent_bytes[0])
+
+            if self.log_requests and self.logger.isEnabledFor(logging.INFO):
+                self.logger.info(
+                    "Request: %s %s - Status: %s - Time: %.4fs",
+                    method, scope["path"], status[0], process_time,
+                    extra={"method": method, "path": scope["path"], "route": route_path,
+                           "status": status[0], "duration_ms": round(process_time * 1000, 3)}
+                )
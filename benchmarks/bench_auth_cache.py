@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Auth Cache Benchmark
+
+Measures the per-request cost of get_current_user under status-polling load,
+with and without the verified token cache.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api"))
+
+from app.api.endpoints import auth
+
+
+async def poll(tokens, requests_per_token, use_cache):
+    """Simulate clients polling with their tokens"""
+    start = time.perf_counter()
+    for _ in range(requests_per_token):
+        for token in tokens:
+            if not use_cache:
+                auth.token_cache.clear()
+            await auth.get_current_user(token)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JWT validation in get_current_user")
+    parser.add_argument('--clients', type=int, default=50, help='Number of polling clients (default: 50)')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per client (default: 200)')
+    args = parser.parse_args()
+
+    tokens = []
+    for i in range(args.clients):
+        username = f"user_{i}"
+        auth.fake_users_db[username] = auth.User(username=username)
+        tokens.append(auth.create_access_token({"sub": username}))
+
+    total_requests = args.clients * args.requests
+    uncached = asyncio.run(poll(tokens, args.requests, use_cache=False))
+    auth.token_cache.clear()
+    cached = asyncio.run(poll(tokens, args.requests, use_cache=True))
+
+    print(f"Requests: {total_requests}")
+    print(f"Without cache: {uncached / total_requests * 1e6:.1f} us/request")
+    print(f"With cache:    {cached / total_requests * 1e6:.1f} us/request")
+    print(f"Speedup:       {uncached / cached:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
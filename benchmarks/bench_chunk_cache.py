@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Chunk Cache Benchmark
+
+Processes an export with a cold cache, then re-processes it after changing a
+small fraction of its conversations, and compares both with an uncached run.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from cli.chunk_cache import ChunkCache
+from cli.chunker_engine import ChunkerEngine
+
+
+def make_conversations(count, seed=0):
+    """Build synthetic conversations of varying length"""
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"conv_{i}",
+            "title": f"Topic {i % 40} discussion",
+            "messages": [
+                {"role": "user" if j % 2 == 0 else "assistant", "content": "word " * rng.randint(20, 1500)}
+                for j in range(rng.randint(2, 16))
+            ]
+        }
+        for i in range(count)
+    ]
+
+
+def timed(func):
+    """Wall time of one call"""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the per-conversation chunk cache")
+    parser.add_argument('--conversations', type=int, default=5000, help='Number of conversations (default: 5000)')
+    parser.add_argument('--changed', type=float, default=0.01, help='Fraction of conversations changed (default: 0.01)')
+    parser.add_argument('--strategies', default='size,role', help='Strategies to run (default: size,role)')
+    parser.add_argument('--max-tokens', type=int, default=1500, help='Maximum tokens per chunk (default: 1500)')
+    args = parser.parse_args()
+
+    strategies = args.strategies.split(",")
+    conversations = make_conversations(args.conversations)
+    updated = [dict(conv) for conv in conversations]
+    for index in random.Random(1).sample(range(len(updated)), int(len(updated) * args.changed)):
+        updated[index]["messages"] = updated[index]["messages"] + [{"role": "user", "content": "follow-up"}]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "export.json")
+        cache = ChunkCache(os.path.join(tmp, "cache.db"))
+        uncached = ChunkerEngine(os.path.join(tmp, "uncached"))
+        cached = ChunkerEngine(os.path.join(tmp, "cached"), cache)
+
+        def chunk(engine, data):
+            tokenized = engine.tokenize(data)
+            for strategy in strategies:
+                getattr(engine, f"chunk_by_{strategy}")(data, args.max_tokens, tokenized)
+
+        def process(engine, data):
+            with open(source, 'w') as f:
+                json.dump(data, f)
+            return lambda: engine.process_file_strategies(source, strategies, args.max_tokens)
+
+        # Each column runs cold then warm, so the warm run only misses on changed conversations
+        chunk_times = [timed(lambda: chunk(uncached, updated))]
+        cache.clear()
+        chunk_times += [timed(lambda: chunk(cached, conversations)), timed(lambda: chunk(cached, updated))]
+        process_times = [timed(process(uncached, updated))]
+        cache.clear()
+        process_times += [timed(process(cached, conversations)), timed(process(cached, updated))]
+
+        print(f"{args.conversations} conversations, {args.changed:.0%} changed, strategies: {args.strategies}")
+        print(f"{'case':<28} {'chunking':>10} {'process':>10}")
+        for label, chunk_time, process_time in zip(
+                ["no cache", "cold cache", "warm cache, after change"], chunk_times, process_times):
+            print(f"{label:<28} {chunk_time * 1000:>8.0f}ms {process_time * 1000:>8.0f}ms")
+
+        print(f"cache: {len(cache)} entries, {cache.size() / 1024:.0f} KiB")
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Export Offload Benchmark
+
+Measures event loop lag while a large export is formatted, with formatting
+inline on the loop versus chunked on the export executor.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api"))
+
+from app.models.schemas import ExportFormat
+from app.services import export_formatting_service
+from app.services.profiler_service import LoopLagProbe
+
+
+def make_conversations(count, messages, message_size):
+    """Build synthetic conversations"""
+    now = datetime.now()
+    content = "x" * message_size
+    return [
+        {
+            "id": f"conv_{i}",
+            "title": f"Conversation {i}",
+            "create_time": now,
+            "update_time": now,
+            "messages": [
+                {"role": "user" if j % 2 == 0 else "assistant", "content": content}
+                for j in range(messages)
+            ]
+        }
+        for i in range(count)
+    ]
+
+
+async def measure(conversations, format, offload):
+    """Format an export while probing loop lag"""
+    probe = LoopLagProbe(interval=0.005)
+    probe.start()
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    if offload:
+        content = await export_formatting_service.format_export(conversations, format, True)
+    else:
+        content = export_formatting_service.format_chunk(conversations, format, True, True)
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(0.05)
+    await probe.stop()
+    return elapsed, len(content), probe.summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark event loop lag during export formatting")
+    parser.add_argument('--conversations', type=int, default=2000, help='Number of conversations (default: 2000)')
+    parser.add_argument('--messages', type=int, default=50, help='Messages per conversation (default: 50)')
+    parser.add_argument('--message-size', type=int, default=500, help='Characters per message (default: 500)')
+    args = parser.parse_args()
+
+    conversations = make_conversations(args.conversations, args.messages, args.message_size)
+    for format in (ExportFormat.JSON, ExportFormat.CSV, ExportFormat.TXT):
+        for offload in (False, True):
+            elapsed, size, lag = asyncio.run(measure(conversations, format, offload))
+            mode = "executor" if offload else "inline  "
+            print(f"{format.value:4} {mode} {size / 1e6:7.1f} MB in {elapsed:6.2f}s - "
+                  f"loop lag p99 {lag['p99_ms']:8.1f} ms, max {lag['max_ms']:8.1f} ms")
+    export_formatting_service.shutdown_executor()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Serialization Benchmark
+
+Compares the stdlib json calls previously used for API responses and chunk
+files with the serialization layer (orjson when installed).
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api"))
+
+from app.utils import serialization
+
+
+def make_conversations(count, messages, message_size):
+    """Build synthetic conversations"""
+    content = "x" * message_size
+    return [
+        {
+            "id": f"conv_{i}",
+            "title": f"Conversation {i}",
+            "create_time": datetime(2025, 4, 20, 10, 30).isoformat(),
+            "messages": [
+                {"role": "user" if j % 2 == 0 else "assistant", "content": content}
+                for j in range(messages)
+            ]
+        }
+        for i in range(count)
+    ]
+
+
+def best_of(runs, func):
+    """Best wall time of several runs"""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON serialization backends")
+    parser.add_argument('--conversations', type=int, default=1000, help='Number of conversations (default: 1000)')
+    parser.add_argument('--messages', type=int, default=40, help='Messages per conversation (default: 40)')
+    parser.add_argument('--message-size', type=int, default=400, help='Characters per message (default: 400)')
+    parser.add_argument('--runs', type=int, default=5, help='Runs per case (default: 5)')
+    args = parser.parse_args()
+
+    data = {"chunks": [{"conversations": make_conversations(args.conversations, args.messages, args.message_size)}]}
+    print(f"Backend: {serialization.BACKEND}")
+
+    cases = [
+        ("stdlib json, indent=2", lambda: json.dumps(data, indent=2).encode()),
+        ("stdlib json, compact", lambda: json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()),
+        ("serialization, compact", lambda: serialization.dumps(data)),
+    ]
+    baseline = None
+    for name, func in cases:
+        elapsed, encoded = best_of(args.runs, func)
+        baseline = baseline or elapsed
+        print(f"dumps {name:24} {elapsed * 1000:8.1f} ms  {len(encoded) / 1e6:6.1f} MB  {baseline / elapsed:5.1f}x")
+
+    encoded = json.dumps(data, indent=2)
+    stdlib, _ = best_of(args.runs, lambda: json.loads(encoded))
+    fast, _ = best_of(args.runs, lambda: serialization.loads(encoded))
+    print(f"loads stdlib json               {stdlib * 1000:8.1f} ms")
+    print(f"loads serialization             {fast * 1000:8.1f} ms  {stdlib / fast:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
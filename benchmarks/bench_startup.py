@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+CLI Startup Benchmark
+
+Times `total-recall <command> --help` for every command in fresh
+interpreters, next to a bare interpreter start, so import-time regressions
+in any tool show up per command. With --daemon, the same commands are also
+timed when served by a running daemon.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+
+from cli.daemon_client import SOCKET_ENV
+from cli.total_recall import COMMANDS
+
+DISPATCHER = os.path.join(SRC_DIR, "cli", "total_recall.py")
+LOCAL_COMMANDS = [command for command, (module, _) in COMMANDS.items() if module != "daemon"]
+
+
+def startup_time(argv, repeat, socket_path=""):
+    """Median wall time of running a command in a fresh interpreter"""
+    env = dict(os.environ, **{SOCKET_ENV: socket_path})
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                       env=env, check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def daemon_times(repeat):
+    """Time every command when served by a daemon on a temporary socket"""
+    with tempfile.TemporaryDirectory() as tmp:
+        socket_path = os.path.join(tmp, "daemon.sock")
+        daemon = subprocess.Popen([sys.executable, DISPATCHER, "--socket", socket_path, "daemon"],
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            while not os.path.exists(socket_path):
+                time.sleep(0.05)
+            return {command: startup_time([DISPATCHER, command, "--help"], repeat, socket_path)
+                    for command in LOCAL_COMMANDS}
+        finally:
+            daemon.terminate()
+            daemon.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CLI cold-start time per command")
+    parser.add_argument('--repeat', type=int, default=10, help='Runs per command (default: 10)')
+    parser.add_argument('--daemon', action='store_true', help='Also time commands served by a daemon')
+    parser.add_argument('--output', help='Also write the results as JSON to this file')
+    args = parser.parse_args()
+
+    results = {"python": startup_time(["-c", "pass"], args.repeat),
+               "total-recall": startup_time([DISPATCHER, "--help"], args.repeat)}
+    for command in LOCAL_COMMANDS:
+        results[command] = startup_time([DISPATCHER, command, "--help"], args.repeat)
+    served = daemon_times(args.repeat) if args.daemon else {}
+
+    print(f"median of {args.repeat} runs")
+    print(f"{'command':<18} {'time':>8} {'over python':>12}" + (f" {'daemon':>8}" if served else ""))
+    for command, seconds in results.items():
+        line = f"{command:<18} {seconds * 1000:>6.0f}ms {(seconds - results['python']) * 1000:>10.0f}ms"
+        if command in served:
+            line += f" {served[command] * 1000:>6.0f}ms"
+        print(line)
+
+    if args.output:
+        report = {command: round(seconds * 1000, 1) for command, seconds in results.items()}
+        report.update({f"{command} (daemon)": round(seconds * 1000, 1) for command, seconds in served.items()})
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tokenizer Benchmark
+
+Counts tokens in a mix of English prose, code, non-English text and JSON
+messages with each backend, and reports throughput and how far each backend
+is from the reference counts (tiktoken when it is installed, otherwise the
+BPE backend).
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from cli.tokenizer import BPE, DEFAULT_VOCAB_PATH, BPETokenizer, Tokenizer
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+PROSE = ("The quick brown fox jumps over the lazy dog while the committee reviews "
+         "its quarterly budget and argues about the font on the cover page.").split()
+CODE = ["def process(items):\n", "    for i, item in enumerate(items):\n", "        if item is None:\n",
+        "            continue\n", "        result[i] = transform(item, scale=0.5)\n", "    return result\n",
+        "const x = await fetch(`/api/v1/users/${id}`);\n", "}\n"]
+FOREIGN = ["日本語のテキストはトークンが多くなります。", "Привет, как дела сегодня?", "Ünïcödé straße café",
+           "中文文本的分词方式不同。", "مرحبا بالعالم", "🙂🚀✨"]
+
+
+def make_texts(count, seed=0):
+    """Build a corpus of mixed texts"""
+    rng = random.Random(seed)
+    texts = []
+    for i in range(count):
+        kind = i % 4
+        if kind == 0:
+            text = " ".join(rng.choice(PROSE) for _ in range(rng.randint(20, 300)))
+        elif kind == 1:
+            text = "".join(rng.choice(CODE) for _ in range(rng.randint(5, 60)))
+        elif kind == 2:
+            text = " ".join(rng.choice(FOREIGN) for _ in range(rng.randint(5, 60)))
+        else:
+            text = json.dumps({"role": "user", "content": " ".join(rng.choice(PROSE + FOREIGN) for _ in range(50))})
+        texts.append(text)
+    return texts
+
+
+def timed(func):
+    """Wall time and result of one call"""
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def error_stats(counts, reference):
+    """Mean absolute relative error, and the share of texts counted low"""
+    errors = [abs(count - ref) / max(1, ref) for count, ref in zip(counts, reference)]
+    under = sum(count < ref for count, ref in zip(counts, reference))
+    return sum(errors) / len(errors), under / len(counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the tokenizer backends")
+    parser.add_argument('--texts', type=int, default=4000, help='Number of texts (default: 4000)')
+    parser.add_argument('--vocab', default=DEFAULT_VOCAB_PATH,
+                        help=f'BPE vocabulary file (default: {DEFAULT_VOCAB_PATH})')
+    parser.add_argument('--encoding', default='cl100k_base',
+                        help='tiktoken encoding used as the reference, if installed (default: cl100k_base)')
+    args = parser.parse_args()
+
+    texts = make_texts(args.texts)
+    megabytes = sum(len(text.encode("utf-8")) for text in texts) / 1e6
+
+    backends = {"heuristic": Tokenizer()}
+    if os.path.exists(args.vocab):
+        load_time, backends[BPE] = timed(lambda: BPETokenizer.from_file(args.vocab))
+        print(f"Loaded {args.vocab} in {load_time * 1000:.0f}ms")
+    else:
+        print(f"No vocabulary at {args.vocab}; skipping the bpe backend")
+
+    reference = None
+    if tiktoken is not None:
+        encoding = tiktoken.get_encoding(args.encoding)
+        backends["tiktoken"] = encoding
+        reference = [len(encoding.encode_ordinary(text)) for text in texts]
+    elif BPE in backends:
+        reference = backends[BPE].count_batch(texts)
+
+    print(f"{len(texts)} texts, {megabytes:.1f} MB")
+    print(f"{'backend':<12} {'cold':>10} {'warm':>10} {'MB/s':>8} {'error':>8} {'low':>6}")
+    for name, backend in backends.items():
+        if name == "tiktoken":
+            count_batch = lambda batch: [len(tokens) for tokens in backend.encode_ordinary_batch(batch)]
+        else:
+            count_batch = backend.count_batch
+        cold, counts = timed(lambda: count_batch(texts))
+        warm, _ = timed(lambda: count_batch(texts))
+        line = f"{name:<12} {cold * 1000:>8.0f}ms {warm * 1000:>8.0f}ms {megabytes / warm:>8.1f}"
+        if reference is not None:
+            error, under = error_stats(counts, reference)
+            line += f" {error:>8.1%} {under:>6.0%}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
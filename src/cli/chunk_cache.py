@@ -0,0 +1,168 @@
+"""
+Chunk Cache - content-addressed cache of per-conversation chunking results
+
+Chunking a conversation is a pure function of its content, the strategy,
+the token limit and the tokenizer, so the result (token counts and where the
+conversation is split) is cached under a hash of all four. Re-processing an export where
+only a few conversations changed recomputes just those conversations.
+
+Entries live in a SQLite database under ~/.total_recall, shared by parallel
+workers. When the cache grows past its size limit, the least recently used
+entries are evicted.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+from typing import Any, Dict, List, Optional
+
+try:
+    from . import serialization
+except ImportError:
+    # When running as a standalone script
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from cli import serialization
+
+# Constants
+DEFAULT_CACHE_PATH = os.path.expanduser("~/.total_recall/cache/chunks.db")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+CACHE_VERSION = 3  # Bump when the cached result layout or chunking rules change
+EVICT_TO = 0.9  # Evict down to this fraction of the limit, so every insert doesn't evict
+BATCH_SIZE = 500  # Keys per query, below SQLite's bound parameter limit
+HASH_SIZE = 16  # Bytes kept of each SHA-256 digest
+
+
+def content_hash(conversation: Dict[str, Any]) -> bytes:
+    """Hash a conversation's content"""
+    # SHA-256 has hardware support on current CPUs, which makes it faster than BLAKE2 here
+    try:
+        data = serialization.dumps(conversation)
+    except TypeError:
+        # Text orjson can't encode, such as lone surrogates from the stdlib parser
+        data = json.dumps(conversation).encode()
+    return hashlib.sha256(data).digest()[:HASH_SIZE]
+
+
+def entry_key(conversation_hash: bytes, strategy: str, max_tokens: int, tokenizer: str = "heuristic") -> bytes:
+    """Build the cache key of one conversation chunked with one strategy, limit and tokenizer"""
+    suffix = f"\0{strategy}\0{max_tokens}\0{tokenizer}\0{CACHE_VERSION}".encode()
+    return hashlib.sha256(conversation_hash + suffix).digest()[:HASH_SIZE]
+
+
+class ChunkCache:
+    """Size-bounded LRU cache of per-conversation chunking results"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        """Configure the cache; the database is created on first use"""
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use"""
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key BLOB PRIMARY KEY, "
+                "value BLOB NOT NULL, "
+                "size INTEGER NOT NULL, "
+                "last_used REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+            self._connection = connection
+        return self._connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self) -> None:
+        """Close the database"""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, Any]:
+        """
+        Look up several entries, marking the ones found as recently used
+
+        Returns:
+            Cached results by key; missing keys are left out
+        """
+        connection = self._connect()
+        found = {}
+        for start in range(0, len(keys), BATCH_SIZE):
+            batch = keys[start:start + BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            rows = connection.execute(
+                f"SELECT key, value FROM entries WHERE key IN ({placeholders})", batch
+            ).fetchall()
+            found.update((bytes(key), serialization.loads(value)) for key, value in rows)
+
+        if found:
+            now = time.time()
+            with connection:
+                connection.executemany("UPDATE entries SET last_used = ? WHERE key = ?",
+                                       ((now, key) for key in found))
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, entries: Dict[bytes, Any]) -> None:
+        """Store several entries, evicting old ones if the cache is over its limit"""
+        if not entries:
+            return
+        connection = self._connect()
+        now = time.time()
+        rows = []
+        for key, value in entries.items():
+            data = serialization.dumps(value)
+            rows.append((key, data, len(key) + len(data), now))
+        with connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO entries (key, value, size, last_used) VALUES (?, ?, ?, ?)", rows
+            )
+        self._evict()
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits its limit"""
+        connection = self._connect()
+        total = self.size()
+        if total <= self.max_bytes:
+            return
+
+        excess = total - int(self.max_bytes * EVICT_TO)
+        victims = []
+        for key, size in connection.execute("SELECT key, size FROM entries ORDER BY last_used"):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        with connection:
+            connection.executemany("DELETE FROM entries WHERE key = ?", victims)
+
+    def size(self) -> int:
+        """Total size of the cached entries in bytes"""
+        row = self._connect().execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return row[0]
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        connection = self._connect()
+        with connection:
+            connection.execute("DELETE FROM entries")
@@ -0,0 +1,210 @@
+"""
+Chunk Store - binary container for processed memory chunks
+
+A chunk store file holds the chunks produced by the chunker engine as
+length-prefixed JSON records, followed by the file metadata and a fixed-width
+offset index. The file is read through mmap, so opening it, reading its stats
+and fetching chunk N only touch the header, one index entry and that chunk's
+bytes - the rest of the file is never parsed.
+
+Layout (little-endian):
+    header    magic, version, chunk count, index offset,
+              metadata offset, metadata length
+    records   for each chunk: u32 length + JSON bytes
+    metadata  JSON object (strategy, source file, totals, ...)
+    index     for each chunk: u64 record offset, u32 record length,
+              u32 token count, u32 conversation count
+"""
+
+import os
+import mmap
+import struct
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+try:
+    from . import serialization
+except ImportError:
+    # When running as a standalone script
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from cli import serialization
+
+# Constants
+MAGIC = b"TRCHUNKS"
+VERSION = 1
+FILE_EXTENSION = ".chunks"
+HEADER = struct.Struct("<8sHHIQQI")  # magic, version, flags, count, index offset, metadata offset, metadata length
+INDEX_ENTRY = struct.Struct("<QIII")  # record offset, record length, token count, conversation count
+RECORD_LENGTH = struct.Struct("<I")
+
+
+class ChunkStoreError(Exception):
+    """Raised when a file is not a valid chunk store"""
+
+
+def is_chunk_store(path: str) -> bool:
+    """Check whether a file starts with the chunk store magic"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def write_chunk_store(path: str, chunks: Iterable[Dict[str, Any]], metadata: Dict[str, Any]) -> None:
+    """
+    Write chunks and metadata to a chunk store file
+
+    The file is written to a temporary path and moved into place, so readers
+    never see a partially written store.
+
+    Args:
+        path: Output file path
+        chunks: Chunks as produced by the chunker engine (any iterable; read once)
+        metadata: File-level metadata (strategy, totals, ...)
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                    prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        index = []
+        with os.fdopen(fd, 'wb') as f:
+            f.write(b"\0" * HEADER.size)
+
+            for chunk in chunks:
+                record = serialization.dumps(chunk)
+                offset = f.tell()
+                f.write(RECORD_LENGTH.pack(len(record)))
+                f.write(record)
+                index.append(INDEX_ENTRY.pack(
+                    offset, len(record),
+                    int(chunk.get("token_count", 0)),
+                    len(chunk.get("conversations", []))
+                ))
+
+            metadata_bytes = serialization.dumps(metadata)
+            metadata_offset = f.tell()
+            f.write(metadata_bytes)
+
+            index_offset = f.tell()
+            f.write(b"".join(index))
+
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, VERSION, 0, len(index), index_offset,
+                                metadata_offset, len(metadata_bytes)))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class ChunkStore:
+    """Random access reader for a chunk store file"""
+
+    def __init__(self, path: str):
+        """Open a chunk store and read its header"""
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ChunkStoreError(f"Not a chunk store: {path}")
+
+        if len(self._mmap) < HEADER.size:
+            self.close()
+            raise ChunkStoreError(f"Not a chunk store: {path}")
+        magic, version, _, count, index_offset, metadata_offset, metadata_length = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ChunkStoreError(f"Not a chunk store: {path}")
+        if version > VERSION:
+            self.close()
+            raise ChunkStoreError(f"Unsupported chunk store version {version}: {path}")
+
+        self._count = count
+        self._index_offset = index_offset
+        self._metadata_offset = metadata_offset
+        self._metadata_length = metadata_length
+        self._metadata: Optional[Dict[str, Any]] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self) -> None:
+        """Unmap and close the file"""
+        if getattr(self, "_mmap", None) is not None and not self._mmap.closed:
+            self._mmap.close()
+        self._file.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _entry(self, index: int):
+        """Read one index entry"""
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(f"Chunk index out of range: {index}")
+        return INDEX_ENTRY.unpack_from(self._mmap, self._index_offset + index * INDEX_ENTRY.size)
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """File-level metadata"""
+        if self._metadata is None:
+            start = self._metadata_offset
+            self._metadata = serialization.loads(self._mmap[start:start + self._metadata_length])
+        return self._metadata
+
+    def chunk_stats(self, index: int) -> Dict[str, int]:
+        """Get the token and conversation counts of a chunk without reading it"""
+        _, _, token_count, conversation_count = self._entry(index)
+        return {"token_count": token_count, "conversation_count": conversation_count}
+
+    def get_chunk(self, index: int) -> Dict[str, Any]:
+        """Read and parse a single chunk"""
+        offset, length, _, _ = self._entry(index)
+        start = offset + RECORD_LENGTH.size
+        return serialization.loads(self._mmap[start:start + length])
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        return self.get_chunk(index)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for index in range(self._count):
+            yield self.get_chunk(index)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Load the whole store in the layout of a JSON memory file"""
+        return dict(self.metadata, chunks=list(self))
+
+
+def load_summary(path: str) -> Dict[str, Any]:
+    """
+    Get the metadata and per-chunk stats of a memory file
+
+    Chunk stores answer from the header and index alone; JSON memory files
+    have to be parsed in full.
+
+    Returns:
+        Metadata with a "chunk_stats" list of token and conversation counts
+    """
+    if is_chunk_store(path):
+        with ChunkStore(path) as store:
+            stats = [store.chunk_stats(i) for i in range(len(store))]
+            return dict(store.metadata, chunk_stats=stats)
+
+    data = serialization.load_file(path)
+    stats = [
+        {"token_count": chunk.get("token_count", 0), "conversation_count": len(chunk.get("conversations", []))}
+        for chunk in data.get("chunks", [])
+    ]
+    summary = {key: value for key, value in data.items() if key != "chunks"}
+    summary["chunk_stats"] = stats
+    return summary
@@ -7,25 +7,106 @@ for memory injection, with various chunking strategies and token counting.
 """
 
 import os
+import io
+import sys
 import json
+import glob
 import argparse
 import re
-from pathlib import Path
-from typing import Dict, Any, List, Optional
-import numpy as np
-from tqdm import tqdm
+import contextlib
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    from . import serialization
+    from .chunk_cache import DEFAULT_CACHE_PATH, DEFAULT_MAX_BYTES, ChunkCache, entry_key
+    from .chunk_store import FILE_EXTENSION, write_chunk_store
+    from .columnar import ColumnarConversations, ConversationSlice
+    from .text_splitter import split_text
+    from .tokenizer import BACKENDS, DEFAULT_BACKEND, DEFAULT_VOCAB_PATH, Tokenizer, load_tokenizer
+    from .memory_summary import build_summary, hash_bytes, read_summary, write_summary
+except ImportError:
+    # When running as a standalone script
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from cli import serialization
+    from cli.chunk_cache import DEFAULT_CACHE_PATH, DEFAULT_MAX_BYTES, ChunkCache, entry_key
+    from cli.chunk_store import FILE_EXTENSION, write_chunk_store
+    from cli.columnar import ColumnarConversations, ConversationSlice
+    from cli.text_splitter import split_text
+    from cli.tokenizer import BACKENDS, DEFAULT_BACKEND, DEFAULT_VOCAB_PATH, Tokenizer, load_tokenizer
+    from cli.memory_summary import build_summary, hash_bytes, read_summary, write_summary
 
 # Constants
 DEFAULT_OUTPUT_DIR = os.path.expanduser("~/.total_recall/memory/processed")
 CONFIG_DIR = os.path.dirname(DEFAULT_OUTPUT_DIR)
 MAX_TOKENS_PER_CHUNK = 1500  # Default max tokens per chunk
+DEFAULT_INPUT_PATTERN = "*.json"  # Files picked up when process-dir is given a directory
+STRATEGIES = ["size", "topic", "role"]
+
+# Worker pool kept by a long-running process (the daemon), so workers start once
+_worker_pool = None
+_worker_pool_size: Optional[int] = None
+
+
+def _start_worker_pool(workers: Optional[int]):
+    """Start a pool whose workers are started from a fork server"""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("forkserver"))
+
+
+def keep_worker_pool(workers: Optional[int] = None) -> None:
+    """
+    Start a worker pool that process_files reuses instead of starting its own
+    
+    Each worker loads its tokenizer once, so word caches also stay warm
+    across calls. Workers are started from a fork server, since forking a
+    process that runs threads (like the daemon) can deadlock. The pool is
+    shut down when the process exits, and replaced if a worker dies.
+    """
+    global _worker_pool, _worker_pool_size
+    if _worker_pool is None:
+        _worker_pool_size = workers
+        _worker_pool = _start_worker_pool(workers)
+
+
+def _kept_worker_pool():
+    """Get the kept worker pool, if any, replacing it first if a dead worker broke it"""
+    global _worker_pool
+    if _worker_pool is not None and _worker_pool._broken:
+        _worker_pool.shutdown(wait=False)
+        _worker_pool = _start_worker_pool(_worker_pool_size)
+    return _worker_pool
+
+
+def parse_strategies(value: str) -> List[str]:
+    """Parse a comma-separated list of chunking strategies"""
+    strategies = []
+    for strategy in value.split(","):
+        strategy = strategy.strip()
+        if strategy not in STRATEGIES:
+            raise argparse.ArgumentTypeError(
+                f"invalid strategy: {strategy!r} (choose from {', '.join(STRATEGIES)})")
+        if strategy not in strategies:
+            strategies.append(strategy)
+    return strategies
+
 
 class ChunkerEngine:
     """Processes conversations into optimal chunks for memory injection"""
     
-    def __init__(self, output_dir: str = DEFAULT_OUTPUT_DIR):
-        """Initialize the chunker engine"""
+    def __init__(self, output_dir: str = DEFAULT_OUTPUT_DIR, cache: Optional[ChunkCache] = None,
+                 tokenizer: Optional[Tokenizer] = None):
+        """
+        Initialize the chunker engine
+        
+        Args:
+            output_dir: Directory for processed memory files
+            cache: Cache of per-conversation chunking results (default: no caching)
+            tokenizer: Token counter (default: the heuristic one)
+        """
         self.output_dir = output_dir
+        self.cache = cache
+        self.tokenizer = tokenizer or load_tokenizer()
         self._ensure_output_dir()
         
     def _ensure_output_dir(self):
@@ -33,28 +114,198 @@ class ChunkerEngine:
         os.makedirs(self.output_dir, exist_ok=True)
     
     def count_tokens(self, text: str) -> int:
+        """Count the number of tokens in a text with the engine's tokenizer"""
+        return self.tokenizer.count(text)
+    
+    def tokenize(self, conversations: List[Dict[str, Any]], release: bool = False) -> ColumnarConversations:
+        """
+        Convert conversations to the columnar form shared by all strategies
+        
+        Token counts are computed on first use and kept, so each conversation
+        and message is counted at most once however many strategies run, and
+        not at all when its chunking results come from the cache.
+        
+        Args:
+            conversations: Parsed conversation dicts
+            release: Free each conversation dict once it is converted
+        """
+        return ColumnarConversations.from_conversations(
+            conversations, self.count_tokens, with_hashes=self.cache is not None, release=release,
+            count_batch=self.tokenizer.count_batch)
+    
+    def _split_messages(self, columns: ColumnarConversations, index: int, start: int, end: int,
+                        max_tokens: int, marker: str) -> List[List[int]]:
+        """
+        Split a run of messages into pieces that fit max_tokens
+        
+        Each piece is emitted as a conversation of its own (the conversation's
+        fields, `marker` and a messages list), so messages only get the budget
+        that envelope leaves. Messages are packed greedily in order, and each
+        piece is then measured as it will be emitted; messages are moved to the
+        next piece if list separators pushed it over. A message that doesn't
+        fit a piece on its own is cut into parts at paragraph, sentence, code
+        block or token boundaries, one part per piece.
+        
+        Returns:
+            [start, end, token count] message ranges, or [row, row + 1,
+            token count, text start, text end] for part of one message
+        """
+        envelope = self._piece_tokens(columns, index, start, start, marker)
+        budget = max_tokens - envelope
+        message_tokens = columns.message_tokens(index)
+        pieces = []
+        
+        row = start
+        while row < end:
+            piece_end = row
+            tokens = 0
+            while piece_end < end and tokens + message_tokens[piece_end] <= budget:
+                tokens += message_tokens[piece_end]
+                piece_end += 1
+            while piece_end > row:
+                tokens = self._piece_tokens(columns, index, row, piece_end, marker)
+                if tokens <= max_tokens:
+                    break
+                piece_end -= 1
+            
+            if piece_end == row:
+                # Too big for any piece - cut this message up
+                pieces.extend(self._split_message(columns, index, row, max_tokens, marker))
+                row += 1
+            else:
+                pieces.append([row, piece_end, tokens])
+                row = piece_end
+        
+        return pieces
+    
+    def _piece_tokens(self, columns: ColumnarConversations, index: int, start: int, end: int,
+                      marker: str) -> int:
+        """Count the tokens of a run of messages as the conversation piece that will carry them"""
+        return self.count_tokens(json.dumps(columns.materialize(ConversationSlice(index, start, end, marker))))
+    
+    def _split_message(self, columns: ColumnarConversations, index: int, row: int,
+                       max_tokens: int, marker: str) -> List[List[int]]:
+        """Cut one oversized message into parts that fit max_tokens"""
+        piece = columns.materialize(ConversationSlice(index, row, row + 1, marker))
+        msg = piece["messages"][0]
+        content = msg.get("content") if isinstance(msg, dict) else None
+        if not isinstance(content, str):
+            # Nothing to cut - the message goes out whole
+            return [[row, row + 1, self.count_tokens(json.dumps(piece))]]
+        
+        # Each part is counted as the conversation piece that will carry it
+        count_part = lambda part: self.count_tokens(json.dumps(dict(piece, messages=[dict(msg, content=part)])))
+        return [[row, row + 1, tokens, text_start, text_end]
+                for text_start, text_end, tokens in split_text(content, count_part, max_tokens)]
+    
+    def _plan_size(self, columns: ColumnarConversations, index: int, max_tokens: int) -> Dict[str, Any]:
+        """Work out the token count of a conversation, and its split if it is too large"""
+        plan = {"tokens": columns.conversation_tokens(index)}
+        if plan["tokens"] > max_tokens:
+            plan["splits"] = self._split_messages(columns, index, 0, columns.message_count(index), max_tokens,
+                                                  "_chunked")
+        return plan
+    
+    def _plan_topic(self, columns: ColumnarConversations, index: int, max_tokens: int) -> Dict[str, Any]:
+        """Work out the token count of a conversation"""
+        return {"tokens": columns.conversation_tokens(index)}
+    
+    def _plan_role(self, columns: ColumnarConversations, index: int, max_tokens: int) -> Dict[str, Any]:
+        """Work out the role groups of a conversation, their token counts and splits"""
+        # Group by consecutive same-role messages
+        roles = columns.roles(index)
+        groups = []
+        start = 0
+        for position in range(1, len(roles) + 1):
+            if position == len(roles) or roles[position] != roles[start]:
+                groups.append((start, position))
+                start = position
+        
+        planned = []
+        for start, end in groups:
+            group_conv = columns.materialize(ConversationSlice(index, start, end, "_chunked_by_role"))
+            group_tokens = self.count_tokens(json.dumps(group_conv))
+            
+            # If this group alone exceeds max tokens, it needs further splitting
+            if group_tokens > max_tokens:
+                planned.append([start, end, group_tokens,
+                                self._split_messages(columns, index, start, end, max_tokens, "_chunked_by_role")])
+            else:
+                planned.append([start, end, group_tokens])
+        return {"groups": planned}
+    
+    def _plans(self, strategy: str, columns: ColumnarConversations, max_tokens: int) -> List[Dict[str, Any]]:
         """
-        Count the approximate number of tokens in a text
+        Get the per-conversation chunking results of a strategy
         
-        This is a simple approximation. For production use,
-        consider using tiktoken or a similar library.
+        Results depend only on the conversation, the strategy and max_tokens,
+        so with a cache only new or changed conversations are worked out.
         """
-        # Simple approximation: 1 token ≈ 4 characters
-        return len(text) // 4
+        plan = getattr(self, f"_plan_{strategy}")
+        if self.cache is None:
+            return [plan(columns, index, max_tokens) for index in range(len(columns))]
+        
+        keys = [entry_key(conversation_hash, strategy, max_tokens, self.tokenizer.name)
+                for conversation_hash in columns.content_hashes()]
+        cached = self.cache.get_many(keys)
+        plans = []
+        computed = {}
+        for index, key in enumerate(keys):
+            result = cached.get(key)
+            if result is None:
+                result = computed[key] = plan(columns, index, max_tokens)
+            plans.append(result)
+        self.cache.put_many(computed)
+        return plans
+    
+    def chunk(self, strategy: str, columns: ColumnarConversations,
+              max_tokens: int = MAX_TOKENS_PER_CHUNK) -> List[Dict[str, Any]]:
+        """
+        Chunk columnar conversations with a strategy
+        
+        Returns:
+            Chunks whose "conversations" are ConversationSlice references;
+            use columns.materialize_chunk to turn them into dicts
+        """
+        return getattr(self, f"_chunk_by_{strategy}")(columns, max_tokens)
     
     def chunk_by_size(self, conversations: List[Dict[str, Any]], 
-                     max_tokens: int = MAX_TOKENS_PER_CHUNK) -> List[Dict[str, Any]]:
+                     max_tokens: int = MAX_TOKENS_PER_CHUNK,
+                     tokenized: Optional[ColumnarConversations] = None) -> List[Dict[str, Any]]:
         """Chunk conversations based on token size"""
+        columns = tokenized or self.tokenize(conversations)
+        return list(columns.materialize_chunks(self._chunk_by_size(columns, max_tokens)))
+    
+    def chunk_by_topic(self, conversations: List[Dict[str, Any]], 
+                      max_tokens: int = MAX_TOKENS_PER_CHUNK,
+                      tokenized: Optional[ColumnarConversations] = None) -> List[Dict[str, Any]]:
+        """
+        Chunk conversations based on topic similarity
+        
+        This is a simplified implementation. For production use,
+        consider using embeddings or more sophisticated NLP.
+        """
+        columns = tokenized or self.tokenize(conversations)
+        return list(columns.materialize_chunks(self._chunk_by_topic(columns, max_tokens)))
+    
+    def chunk_by_role(self, conversations: List[Dict[str, Any]], 
+                     max_tokens: int = MAX_TOKENS_PER_CHUNK,
+                     tokenized: Optional[ColumnarConversations] = None) -> List[Dict[str, Any]]:
+        """Chunk conversations based on user/assistant role patterns"""
+        columns = tokenized or self.tokenize(conversations)
+        return list(columns.materialize_chunks(self._chunk_by_role(columns, max_tokens)))
+    
+    def _chunk_by_size(self, columns: ColumnarConversations, max_tokens: int) -> List[Dict[str, Any]]:
+        """Chunk columnar conversations based on token size"""
+        plans = self._plans("size", columns, max_tokens)
         chunks = []
         current_chunk = []
         current_tokens = 0
         
-        for conv in conversations:
-            # Estimate tokens in this conversation
-            conv_text = json.dumps(conv)
-            conv_tokens = self.count_tokens(conv_text)
+        for index, plan in enumerate(plans):
+            conv_tokens = plan["tokens"]
             
-            # If this conversation alone exceeds max tokens, it needs to be split
+            # If this conversation alone exceeds max tokens, it is split
             if conv_tokens > max_tokens:
                 # If we have content in the current chunk, finalize it
                 if current_chunk:
@@ -66,49 +317,16 @@ class ChunkerEngine:
                     current_chunk = []
                     current_tokens = 0
                 
-                # Split this large conversation (simplified approach)
-                # In a real implementation, this would be more sophisticated
-                # to ensure semantic coherence
-                messages = conv.get("messages", [])
-                temp_messages = []
-                temp_tokens = 0
-                
-                for msg in messages:
-                    msg_text = json.dumps(msg)
-                    msg_tokens = self.count_tokens(msg_text)
-                    
-                    if temp_tokens + msg_tokens > max_tokens:
-                        # This message would exceed the limit, finalize current temp chunk
-                        if temp_messages:
-                            new_conv = conv.copy()
-                            new_conv["messages"] = temp_messages
-                            new_conv["_chunked"] = True
-                            chunks.append({
-                                "conversations": [new_conv],
-                                "token_count": temp_tokens,
-                                "chunk_strategy": "size"
-                            })
-                            temp_messages = [msg]
-                            temp_tokens = msg_tokens
-                    else:
-                        # Add this message to the temp chunk
-                        temp_messages.append(msg)
-                        temp_tokens += msg_tokens
-                
-                # Don't forget the last temp chunk
-                if temp_messages:
-                    new_conv = conv.copy()
-                    new_conv["messages"] = temp_messages
-                    new_conv["_chunked"] = True
+                for piece in plan["splits"]:
                     chunks.append({
-                        "conversations": [new_conv],
-                        "token_count": temp_tokens,
+                        "conversations": [ConversationSlice.piece(index, piece, "_chunked")],
+                        "token_count": piece[2],
                         "chunk_strategy": "size"
                     })
             
             # Normal case: conversation fits in a chunk
             elif current_tokens + conv_tokens <= max_tokens:
-                current_chunk.append(conv)
+                current_chunk.append(ConversationSlice(index))
                 current_tokens += conv_tokens
             else:
                 # Finalize current chunk and start a new one
@@ -117,7 +335,7 @@ class ChunkerEngine:
                     "token_count": current_tokens,
                     "chunk_strategy": "size"
                 })
-                current_chunk = [conv]
+                current_chunk = [ConversationSlice(index)]
                 current_tokens = conv_tokens
         
         # Don't forget the last chunk
@@ -130,53 +348,51 @@ class ChunkerEngine:
         
         return chunks
     
-    def chunk_by_topic(self, conversations: List[Dict[str, Any]], 
-                      max_tokens: int = MAX_TOKENS_PER_CHUNK) -> List[Dict[str, Any]]:
-        """
-        Chunk conversations based on topic similarity
+    def _chunk_by_topic(self, columns: ColumnarConversations, max_tokens: int) -> List[Dict[str, Any]]:
+        """Chunk columnar conversations based on topic similarity"""
+        plans = self._plans("topic", columns, max_tokens)
         
-        This is a simplified implementation. For production use,
-        consider using embeddings or more sophisticated NLP.
-        """
         # Extract titles or first messages as topic indicators
         topics = []
-        for conv in conversations:
-            title = conv.get("title", "")
+        for index in range(len(columns)):
+            title = columns.title(index)
             if title:
                 topics.append(title)
-            elif conv.get("messages") and len(conv["messages"]) > 0:
+            elif columns.message_count(index) > 0:
                 # Use first message as fallback
-                topics.append(conv["messages"][0].get("content", ""))
+                topics.append(columns.content(index, 0))
             else:
                 topics.append("")
         
+        # Split each topic into words once, not once per comparison
+        topic_words = [set(re.findall(r'\w+', topic.lower())) for topic in topics]
+        
         # Simple topic clustering (in production, use embeddings or proper NLP)
         # This is just a placeholder implementation
         clusters = []
-        assigned = [False] * len(conversations)
+        assigned = [False] * len(columns)
         
-        for i in range(len(conversations)):
+        for i in range(len(columns)):
             if assigned[i]:
                 continue
                 
             cluster = [i]
             assigned[i] = True
-            cluster_tokens = self.count_tokens(json.dumps(conversations[i]))
+            cluster_tokens = plans[i]["tokens"]
             
             # Find similar topics
-            for j in range(i + 1, len(conversations)):
+            for j in range(i + 1, len(columns)):
                 if assigned[j]:
                     continue
                     
                 # Simple similarity check (in production, use proper similarity metrics)
                 # Just checking for common words as a placeholder
-                common_words = set(re.findall(r'\w+', topics[i].lower())) & \
-                              set(re.findall(r'\w+', topics[j].lower()))
+                common_words = topic_words[i] & topic_words[j]
                 
-                similarity = len(common_words) / max(1, len(set(re.findall(r'\w+', topics[i].lower()))))
+                similarity = len(common_words) / max(1, len(topic_words[i]))
                 
                 if similarity > 0.3:  # Arbitrary threshold
-                    conv_tokens = self.count_tokens(json.dumps(conversations[j]))
+                    conv_tokens = plans[j]["tokens"]
                     if cluster_tokens + conv_tokens <= max_tokens:
                         cluster.append(j)
                         assigned[j] = True
@@ -190,95 +406,40 @@ class ChunkerEngine:
         # Convert clusters to chunks
         chunks = []
         for cluster in clusters:
-            chunk_convs = [conversations[i] for i in cluster["indices"]]
             chunks.append({
-                "conversations": chunk_convs,
+                "conversations": [ConversationSlice(i) for i in cluster["indices"]],
                 "token_count": cluster["token_count"],
                 "chunk_strategy": "topic"
             })
         
         return chunks
     
-    def chunk_by_role(self, conversations: List[Dict[str, Any]], 
-                     max_tokens: int = MAX_TOKENS_PER_CHUNK) -> List[Dict[str, Any]]:
-        """Chunk conversations based on user/assistant role patterns"""
+    def _chunk_by_role(self, columns: ColumnarConversations, max_tokens: int) -> List[Dict[str, Any]]:
+        """Chunk columnar conversations based on user/assistant role patterns"""
+        plans = self._plans("role", columns, max_tokens)
         chunks = []
         current_chunk = []
         current_tokens = 0
         
-        for conv in conversations:
-            messages = conv.get("messages", [])
-            
-            # Group by consecutive same-role messages
-            role_groups = []
-            current_role = None
-            current_group = []
-            
-            for msg in messages:
-                role = msg.get("role")
-                if role != current_role and current_group:
-                    role_groups.append(current_group)
-                    current_group = [msg]
-                    current_role = role
-                else:
-                    current_group.append(msg)
-                    current_role = role
-            
-            # Don't forget the last group
-            if current_group:
-                role_groups.append(current_group)
-            
+        for index, plan in enumerate(plans):
             # Process each role group
-            for group in role_groups:
-                group_conv = conv.copy()
-                group_conv["messages"] = group
-                group_conv["_chunked_by_role"] = True
+            for group in plan["groups"]:
+                start, end, group_tokens = group[:3]
                 
-                group_text = json.dumps(group_conv)
-                group_tokens = self.count_tokens(group_text)
-                
-                # If this group alone exceeds max tokens, it needs further splitting
+                # If this group alone exceeds max tokens, it is split further
                 if group_tokens > max_tokens:
-                    # Simplified approach: just split into smaller pieces
-                    # In production, this would be more sophisticated
-                    temp_messages = []
-                    temp_tokens = 0
-                    
-                    for msg in group:
-                        msg_text = json.dumps(msg)
-                        msg_tokens = self.count_tokens(msg_text)
-                        
-                        if temp_tokens + msg_tokens > max_tokens:
-                            # Finalize current temp chunk
-                            if temp_messages:
-                                temp_conv = conv.copy()
-                                temp_conv["messages"] = temp_messages
-                                temp_conv["_chunked_by_role"] = True
-                                chunks.append({
-                                    "conversations": [temp_conv],
-                                    "token_count": temp_tokens,
-                                    "chunk_strategy": "role"
-                                })
-                                temp_messages = [msg]
-                                temp_tokens = msg_tokens
-                        else:
-                            # Add this message to the temp chunk
-                            temp_messages.append(msg)
-                            temp_tokens += msg_tokens
-                    
-                    # Don't forget the last temp chunk
-                    if temp_messages:
-                        temp_conv = conv.copy()
-                        temp_conv["messages"] = temp_messages
-                        temp_conv["_chunked_by_role"] = True
+                    for piece in group[3]:
                         chunks.append({
-                            "conversations": [temp_conv],
-                            "token_count": temp_tokens,
+                            "conversations": [ConversationSlice.piece(index, piece, "_chunked_by_role")],
+                            "token_count": piece[2],
                             "chunk_strategy": "role"
                         })
+                    continue
+                
+                group_conv = ConversationSlice(index, start, end, "_chunked_by_role")
                 
                 # Normal case: group fits in a chunk
-                elif current_tokens + group_tokens <= max_tokens:
+                if current_tokens + group_tokens <= max_tokens:
                     current_chunk.append(group_conv)
                     current_tokens += group_tokens
                 else:
@@ -303,13 +464,42 @@ class ChunkerEngine:
         return chunks
     
     def process_file(self, file_path: str, strategy: str = "size", 
-                    max_tokens: int = MAX_TOKENS_PER_CHUNK) -> str:
-        """Process a conversation file using the specified chunking strategy"""
+                    max_tokens: int = MAX_TOKENS_PER_CHUNK, pretty: bool = False,
+                    output_format: str = "json") -> str:
+        """
+        Process a conversation file using the specified chunking strategy
+        
+        Chunks are written to a single JSON document (compact unless `pretty`
+        is set) by default, or to a binary chunk store with output_format="store".
+        A summary sidecar is written next to the output file.
+        """
+        output_files = self.process_file_strategies(file_path, [strategy], max_tokens, pretty, output_format)
+        return output_files[0] if output_files else None
+    
+    def process_file_strategies(self, file_path: str, strategies: List[str],
+                                max_tokens: int = MAX_TOKENS_PER_CHUNK, pretty: bool = False,
+                                output_format: str = "json") -> Optional[List[str]]:
+        """
+        Process a conversation file with several chunking strategies in one pass
+        
+        The file is loaded and tokenized once; every strategy chunks the same
+        tokenized conversations and gets its own output file and sidecar.
+        
+        Returns:
+            Output files in strategy order, or None if the file could not be
+            loaded or a strategy is unknown
+        """
+        unknown = [strategy for strategy in strategies if strategy not in STRATEGIES]
+        if unknown:
+            print(f"Unknown chunking strategy: {', '.join(unknown)}")
+            return None
+        
         # Load conversations
         try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-                
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+            data = serialization.loads(raw)
+            
             if isinstance(data, dict) and "conversations" in data:
                 conversations = data["conversations"]
             elif isinstance(data, list):
@@ -320,67 +510,264 @@ class ChunkerEngine:
             print(f"Error loading conversations: {e}")
             return None
         
-        # Apply chunking strategy
-        if strategy == "size":
-            chunks = self.chunk_by_size(conversations, max_tokens)
-        elif strategy == "topic":
-            chunks = self.chunk_by_topic(conversations, max_tokens)
-        elif strategy == "role":
-            chunks = self.chunk_by_role(conversations, max_tokens)
-        else:
-            print(f"Unknown chunking strategy: {strategy}")
-            return None
+        # Keep only the columnar form; the parsed dicts are freed as they are converted
+        source_hash = hash_bytes(raw)
+        del raw, data
+        columns = self.tokenize(conversations, release=True)
+        del conversations
+        
+        output_files = []
+        for strategy in strategies:
+            # Apply chunking strategy
+            chunks = self.chunk(strategy, columns, max_tokens)
+            output_files.append(self._write_output(file_path, strategy, max_tokens, chunks, columns,
+                                                   source_hash, pretty, output_format))
+        
+        return output_files
+    
+    def _write_output(self, file_path: str, strategy: str, max_tokens: int,
+                      chunks: List[Dict[str, Any]], columns: ColumnarConversations,
+                      source_hash: str, pretty: bool, output_format: str) -> str:
+        """
+        Write the chunks of one strategy and their summary sidecar
         
+        Chunks are turned into dicts one at a time as they are written to a
+        chunk store; a JSON document needs them all at once.
+        """
         # Generate output filename
         base_name = os.path.basename(file_path)
         name_parts = os.path.splitext(base_name)
+        extension = FILE_EXTENSION if output_format == "store" else name_parts[1]
         output_file = os.path.join(self.output_dir, 
-                                  f"{name_parts[0]}_chunked_{strategy}{name_parts[1]}")
+                                  f"{name_parts[0]}_chunked_{strategy}{extension}")
         
         # Save chunked conversations
-        with open(output_file, 'w') as f:
-            json.dump({
-                "chunks": chunks,
-                "original_file": file_path,
-                "chunking_strategy": strategy,
-                "max_tokens_per_chunk": max_tokens,
-                "total_chunks": len(chunks),
-                "total_conversations": sum(len(chunk["conversations"]) for chunk in chunks)
-            }, f, indent=2)
-            
+        metadata = {
+            "original_file": file_path,
+            "chunking_strategy": strategy,
+            "max_tokens_per_chunk": max_tokens,
+            "total_chunks": len(chunks),
+            "total_conversations": sum(len(chunk["conversations"]) for chunk in chunks)
+        }
+        if output_format == "store":
+            write_chunk_store(output_file, columns.materialize_chunks(chunks), metadata)
+        else:
+            serialization.dump_file(dict(metadata, chunks=list(columns.materialize_chunks(chunks))),
+                                    output_file, indent=pretty)
+        
+        # Write the summary sidecar so listings never have to open the output
+        chunk_stats = [
+            {"token_count": chunk["token_count"], "conversation_count": len(chunk["conversations"])}
+            for chunk in chunks
+        ]
+        write_summary(output_file, build_summary(metadata, chunk_stats, source_hash))
+        
         return output_file
+    
+    def process_files(self, file_paths: List[str], strategies: Optional[List[str]] = None,
+                      max_tokens: int = MAX_TOKENS_PER_CHUNK, pretty: bool = False,
+                      output_format: str = "json", workers: Optional[int] = None,
+                      progress: bool = True) -> List[Tuple[str, Optional[List[str]], Optional[str]]]:
+        """
+        Process several conversation files in parallel across a process pool
+        
+        Each file is processed independently, so a file that fails to load
+        or chunk is reported and skipped while the others carry on. Workers
+        share this engine's cache database, if it has one.
+        
+        A worker that dies (e.g. killed or out of memory) breaks the whole
+        pool, failing every file still queued on it. The files without a
+        result are then resubmitted to a new pool, for as long as each new
+        pool finishes at least one file before it breaks too. A kept pool
+        is replaced in the same way.
+        
+        Args:
+            file_paths: Conversation files to process
+            strategies: Chunking strategies to run on each file (default: size)
+            workers: Number of worker processes (default: CPU count; ignored
+                when a pool is kept with keep_worker_pool)
+            progress: Show an aggregate progress bar
+            
+        Returns:
+            (file path, output files, error) for every input, in input order;
+            exactly one of output files and error is set
+        """
+        # Only process-dir needs these, so they aren't loaded at startup
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        from concurrent.futures.process import BrokenProcessPool
+        from tqdm import tqdm
+        
+        strategies = strategies or ["size"]
+        cache_config = (self.cache.path, self.cache.max_bytes) if self.cache is not None else None
+        tokenizer_config = (self.tokenizer.backend, self.tokenizer.vocab_path)
+        results = {}
+        pending = list(file_paths)
+        retry = False
+        with tqdm(total=len(file_paths), unit="file", disable=not progress) as bar:
+            while pending:
+                kept_pool = _kept_worker_pool()
+                if kept_pool is not None:
+                    pool = contextlib.nullcontext(kept_pool)
+                else:
+                    pool = ProcessPoolExecutor(max_workers=workers)
+                broken = None
+                finished = 0
+                with pool as executor:
+                    futures = {
+                        executor.submit(_process_file_worker, self.output_dir, cache_config, tokenizer_config,
+                                        file_path, strategies, max_tokens, pretty, output_format): file_path
+                        for file_path in pending
+                    }
+                    for future in as_completed(futures):
+                        file_path = futures[future]
+                        try:
+                            results[file_path] = future.result()
+                        except BrokenProcessPool as e:
+                            # A worker died; this file may not be the one that killed it
+                            broken = e
+                            continue
+                        except Exception as e:
+                            results[file_path] = (None, str(e) or type(e).__name__)
+                        finished += 1
+                        bar.update(1)
+                
+                pending = [file_path for file_path in pending if file_path not in results]
+                if not pending:
+                    break
+                if retry and not finished:
+                    # Give up on files that keep taking new pools down with them
+                    for file_path in pending:
+                        results[file_path] = (None, str(broken) or type(broken).__name__)
+                    bar.update(len(pending))
+                    break
+                retry = True
+        
+        return [(file_path,) + results[file_path] for file_path in file_paths]
+
+
+def _process_file_worker(output_dir: str, cache_config: Optional[Tuple[str, int]],
+                         tokenizer_config: Tuple[str, Optional[str]], file_path: str,
+                         strategies: List[str], max_tokens: int, pretty: bool,
+                         output_format: str) -> Tuple[Optional[List[str]], Optional[str]]:
+    """
+    Process one file in a pool worker
+    
+    Messages that process_file prints are captured and returned as the
+    error, so they don't interleave with the progress bar. The tokenizer is
+    loaded once per worker process and reused for every file it handles.
+    """
+    messages = io.StringIO()
+    cache = ChunkCache(*cache_config) if cache_config is not None else None
+    try:
+        chunker = ChunkerEngine(output_dir, cache, load_tokenizer(*tokenizer_config))
+        with contextlib.redirect_stdout(messages):
+            output_files = chunker.process_file_strategies(file_path, strategies, max_tokens, pretty, output_format)
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+    finally:
+        if cache is not None:
+            cache.close()
+    
+    if output_files is None:
+        return None, messages.getvalue().strip() or "Processing failed"
+    return output_files, None
+
+
+def expand_inputs(input_path: str, pattern: str = DEFAULT_INPUT_PATTERN) -> List[str]:
+    """
+    Expand a directory or glob into a sorted list of files
+    
+    A directory matches `pattern` inside it; anything else is treated as a
+    glob (with `**` matching subdirectories).
+    """
+    if os.path.isdir(input_path):
+        input_path = os.path.join(input_path, pattern)
+    return sorted(path for path in glob.glob(os.path.expanduser(input_path), recursive=True)
+                  if os.path.isfile(path))
+
+
+def open_cache(args) -> Optional[ChunkCache]:
+    """Open the chunk cache selected on the command line"""
+    if args.no_cache:
+        return None
+    return ChunkCache(args.cache_path, args.cache_size * 1024 * 1024)
+
+
+def open_tokenizer(args) -> Tokenizer:
+    """Load the tokenizer selected on the command line"""
+    try:
+        return load_tokenizer(args.tokenizer, args.vocab)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"Error loading tokenizer: {e}")
 
 
 def process_command(args):
     """Process a conversation file"""
-    chunker = ChunkerEngine(args.output_dir)
-    output_file = chunker.process_file(args.file, args.strategy, args.max_tokens)
+    chunker = ChunkerEngine(args.output_dir, open_cache(args), open_tokenizer(args))
+    output_files = chunker.process_file_strategies(args.file, args.strategy, args.max_tokens,
+                                                   args.pretty, args.format)
     
-    if output_file:
+    for output_file in output_files or []:
         print(f"Processed file saved to: {output_file}")
         
-        # Display summary
-        with open(output_file, 'r') as f:
-            result = json.load(f)
-            
+        # Display summary (read from the sidecar, not the output file)
+        result = read_summary(output_file)
+        
         print("\n=== Processing Summary ===")
         print(f"Chunking Strategy: {result['chunking_strategy']}")
         print(f"Max Tokens Per Chunk: {result['max_tokens_per_chunk']}")
         print(f"Total Chunks: {result['total_chunks']}")
         print(f"Total Conversations: {result['total_conversations']}")
+        print(f"Total Tokens: {result['total_tokens']}")
         
         # Display chunk details
         print("\n=== Chunk Details ===")
-        for i, chunk in enumerate(result['chunks']):
-            print(f"Chunk {i+1}: {len(chunk['conversations'])} conversations, "
-                 f"{chunk['token_count']} tokens")
+        for i, (token_count, conversation_count) in enumerate(result['chunk_stats']):
+            print(f"Chunk {i+1}: {conversation_count} conversations, "
+                 f"{token_count} tokens")
+        print()
+
+
+def process_dir_command(args):
+    """Process every conversation file in a directory or glob"""
+    file_paths = expand_inputs(args.input, args.pattern)
+    if not file_paths:
+        print(f"No files found: {args.input}")
+        return
+    
+    chunker = ChunkerEngine(args.output_dir, open_cache(args), open_tokenizer(args))
+    # No progress bar when output isn't a terminal (cron jobs, the daemon)
+    results = chunker.process_files(file_paths, args.strategy, args.max_tokens, args.pretty,
+                                    args.format, args.workers, progress=sys.stderr.isatty())
+    failed = [(file_path, error) for file_path, _, error in results if error]
+    
+    print("\n=== Processing Summary ===")
+    print(f"Processed: {len(results) - len(failed)} files")
+    print(f"Strategies: {', '.join(args.strategy)}")
+    print(f"Failed: {len(failed)} files")
+    print(f"Output Directory: {chunker.output_dir}")
+    
+    if failed:
+        print("\n=== Failed Files ===")
+        for file_path, error in failed:
+            print(f"{file_path}: {error}")
 
 
-def main():
+def main(argv: Optional[List[str]] = None):
     """Main entry point for the chunker engine CLI"""
     parser = argparse.ArgumentParser(description="Conversation Chunker Engine")
     parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR, 
                         help=f"Output directory (default: {DEFAULT_OUTPUT_DIR})")
+    parser.add_argument('--cache-path', default=DEFAULT_CACHE_PATH,
+                        help=f"Chunk cache database (default: {DEFAULT_CACHE_PATH})")
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help=f"Chunk cache size limit in MB (default: {DEFAULT_MAX_BYTES // (1024 * 1024)})")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Don't read or write the chunk cache")
+    parser.add_argument('--tokenizer', default=DEFAULT_BACKEND, choices=BACKENDS,
+                        help=f"Token counting backend (default: {DEFAULT_BACKEND})")
+    parser.add_argument('--vocab', default=DEFAULT_VOCAB_PATH,
+                        help=f"BPE vocabulary file for --tokenizer bpe (default: {DEFAULT_VOCAB_PATH})")
     
     subparsers = parser.add_subparsers(dest='command', help='Command to execute')
     
@@ -388,20 +775,44 @@ def main():
     process_parser = subparsers.add_parser('process', help='Process a conversation file')
     process_parser.add_argument('--file', required=True, 
                               help='Path to conversation file (JSON)')
-    process_parser.add_argument('--strategy', default='size', 
-                              choices=['size', 'topic', 'role'],
-                              help='Chunking strategy (default: size)')
+    process_parser.add_argument('--strategy', default=['size'], type=parse_strategies,
+                              help='Chunking strategy, or a comma-separated list such as '
+                                   'size,topic,role to build several in one pass (default: size)')
     process_parser.add_argument('--max-tokens', type=int, default=MAX_TOKENS_PER_CHUNK,
                               help=f'Maximum tokens per chunk (default: {MAX_TOKENS_PER_CHUNK})')
+    process_parser.add_argument('--format', default='json', choices=['json', 'store'],
+                              help='Output format: a JSON document or a binary chunk store (default: json)')
+    process_parser.add_argument('--pretty', action='store_true',
+                              help='Write indented JSON instead of compact output (json format only)')
     process_parser.set_defaults(func=process_command)
     
-    args = parser.parse_args()
+    # process-dir command
+    process_dir_parser = subparsers.add_parser('process-dir',
+                                             help='Process all conversation files in a directory or glob')
+    process_dir_parser.add_argument('--input', required=True,
+                                  help='Directory or glob of conversation files (JSON)')
+    process_dir_parser.add_argument('--pattern', default=DEFAULT_INPUT_PATTERN,
+                                  help=f'File pattern when --input is a directory (default: {DEFAULT_INPUT_PATTERN})')
+    process_dir_parser.add_argument('--workers', type=int, default=None,
+                                  help='Number of worker processes (default: CPU count)')
+    process_dir_parser.add_argument('--strategy', default=['size'], type=parse_strategies,
+                                  help='Chunking strategy, or a comma-separated list such as '
+                                       'size,topic,role (default: size)')
+    process_dir_parser.add_argument('--max-tokens', type=int, default=MAX_TOKENS_PER_CHUNK,
+                                  help=f'Maximum tokens per chunk (default: {MAX_TOKENS_PER_CHUNK})')
+    process_dir_parser.add_argument('--format', default='json', choices=['json', 'store'],
+                                  help='Output format: a JSON document or a binary chunk store (default: json)')
+    process_dir_parser.add_argument('--pretty', action='store_true',
+                                  help='Write indented JSON instead of compact output (json format only)')
+    process_dir_parser.set_defaults(func=process_dir_command)
+    
+    args = parser.parse_args(argv)
     
     if args.command is None:
         parser.print_help()
         return
     
-    args.func(args)
+    return args.func(args)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,259 @@
+"""
+Columnar - compact in-memory representation of conversations for chunking
+
+Parsed exports are nested dicts: every message is a dict plus separate role
+and content strings, several hundred bytes before counting the text itself.
+ColumnarConversations keeps the message texts in one UTF-8 buffer with
+offset and length arrays, roles as codes into a small table, and token
+counts in arrays. Each conversation keeps only a template of its other
+fields.
+
+Chunking works on index ranges over these columns. Conversations and chunks
+are turned back into dicts only when they are written out, one at a time, so
+they compare and serialize exactly like the originals.
+"""
+
+import json
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+try:
+    from .chunk_cache import HASH_SIZE, content_hash
+except ImportError:
+    # When running as a standalone script
+    import os
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from cli.chunk_cache import HASH_SIZE, content_hash
+
+# Constants
+ROLE_CONTENT = 0  # {"role": ..., "content": ...}
+CONTENT_ROLE = 1  # {"content": ..., "role": ...}
+IRREGULAR = 2  # Any other message shape, kept as the original dict
+UNCOUNTED = -1
+LAYOUTS = {("role", "content"): ROLE_CONTENT, ("content", "role"): CONTENT_ROLE}
+
+
+class ConversationSlice(NamedTuple):
+    """A conversation, or a range of its messages, as placed in a chunk"""
+    index: int
+    start: int = 0
+    end: int = 0
+    marker: Optional[str] = None  # Key set to True on a split piece; None for the whole conversation
+    text_start: Optional[int] = None  # Part of the content of a single message, when set
+    text_end: Optional[int] = None
+
+    @classmethod
+    def piece(cls, index: int, piece: List[int], marker: str) -> "ConversationSlice":
+        """Build a slice from a [start, end, tokens] or [row, row + 1, tokens, text start, text end] piece"""
+        return cls(index, piece[0], piece[1], marker, *piece[3:])
+
+
+class ColumnarConversations:
+    """Conversations stored as columns, with token counts and content hashes"""
+
+    def __init__(self, count_tokens: Callable[[str], int],
+                 count_batch: Optional[Callable[[Iterable[str]], List[int]]] = None):
+        """Create an empty store; use from_conversations to fill it"""
+        self._count_tokens = count_tokens
+        self._count_batch = count_batch or (lambda texts: [count_tokens(text) for text in texts])
+        self._templates: List[Dict[str, Any]] = []
+        self._originals: Dict[int, Dict[str, Any]] = {}  # Conversations whose messages aren't a list
+        self._message_starts = array('Q', [0])
+        self._text = bytearray()
+        self._text_offsets = array('Q')
+        self._text_lengths = array('I')
+        self._role_codes = array('H')
+        self._role_table: List[Any] = []
+        self._role_lookup: Dict[Any, int] = {}
+        self._layouts = array('B')
+        self._irregular: Dict[int, Any] = {}
+        self._conversation_tokens = array('q')
+        self._message_tokens = array('q')
+        self._hashes = bytearray()
+
+    @classmethod
+    def from_conversations(cls, conversations: List[Dict[str, Any]], count_tokens: Callable[[str], int],
+                           with_hashes: bool = False, release: bool = False,
+                           count_batch: Optional[Callable[[Iterable[str]], List[int]]] = None
+                           ) -> "ColumnarConversations":
+        """
+        Convert parsed conversations to columns
+
+        Args:
+            conversations: Parsed conversation dicts
+            count_tokens: Token counter used for conversations and messages
+            count_batch: Counter for several texts at once, used for the
+                messages of a conversation (default: count_tokens on each)
+            with_hashes: Hash each conversation's content (for the chunk cache)
+            release: Replace each conversation in the list with None once it
+                is converted, so the dicts can be freed as conversion goes
+        """
+        columns = cls(count_tokens, count_batch)
+        for index, conv in enumerate(conversations):
+            if with_hashes:
+                columns._hashes += content_hash(conv)
+            columns._add(conv)
+            if release:
+                conversations[index] = None
+        return columns
+
+    def _role_code(self, role: Any) -> int:
+        """Get the code of a role, adding it to the table if new"""
+        code = self._role_lookup.get(role)
+        if code is None:
+            code = self._role_lookup[role] = len(self._role_table)
+            self._role_table.append(role)
+        return code
+
+    def _add(self, conv: Dict[str, Any]) -> None:
+        """Append one conversation"""
+        index = len(self._templates)
+        messages = conv.get("messages", [])
+        if isinstance(messages, list):
+            # The template keeps the key order; "messages" is filled in on output
+            template = dict(conv)
+            if "messages" in template:
+                template["messages"] = None
+        else:
+            template = {key: value for key, value in conv.items() if key != "messages"}
+            self._originals[index] = conv
+            messages = []
+        self._templates.append(template)
+
+        # Build this conversation's columns in lists and extend the arrays once
+        row = len(self._role_codes)
+        text = self._text
+        role_lookup = self._role_lookup
+        offsets, lengths, codes, layouts = [], [], [], []
+        for msg in messages:
+            layout = LAYOUTS.get(tuple(msg), IRREGULAR) if isinstance(msg, dict) else IRREGULAR
+            if layout != IRREGULAR and isinstance(msg["content"], str):
+                encoded = msg["content"].encode("utf-8", "surrogatepass")
+            else:
+                layout = IRREGULAR
+                encoded = b""
+                self._irregular[row + len(codes)] = msg
+
+            role = msg.get("role") if isinstance(msg, dict) else None
+            code = role_lookup.get(role)
+            if code is None:
+                code = self._role_code(role)
+
+            offsets.append(len(text))
+            lengths.append(len(encoded))
+            text += encoded
+            codes.append(code)
+            layouts.append(layout)
+
+        self._text_offsets.extend(offsets)
+        self._text_lengths.extend(lengths)
+        self._role_codes.extend(codes)
+        self._layouts.extend(layouts)
+        self._message_tokens.extend([UNCOUNTED] * len(codes))
+        self._message_starts.append(len(self._role_codes))
+        self._conversation_tokens.append(UNCOUNTED)
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def message_count(self, index: int) -> int:
+        """Number of messages in conversation `index`"""
+        return self._message_starts[index + 1] - self._message_starts[index]
+
+    def title(self, index: int) -> Any:
+        """Get the title field of conversation `index`"""
+        return self._templates[index].get("title", "")
+
+    def roles(self, index: int) -> array:
+        """Get the role codes of the messages of conversation `index`"""
+        return self._role_codes[self._message_starts[index]:self._message_starts[index + 1]]
+
+    def content(self, index: int, position: int) -> str:
+        """Get the text of one message"""
+        row = self._message_starts[index] + position
+        if self._layouts[row] == IRREGULAR:
+            msg = self._irregular[row]
+            return msg.get("content", "") if isinstance(msg, dict) else ""
+        return self._message(row)["content"]
+
+    def _message(self, row: int) -> Any:
+        """Rebuild one message dict"""
+        return self._rows(row, row + 1)[0]
+
+    def _rows(self, first: int, last: int) -> List[Any]:
+        """Rebuild the message dicts of a range of rows"""
+        text = memoryview(self._text)
+        offsets, lengths, layouts = self._text_offsets, self._text_lengths, self._layouts
+        codes, role_table = self._role_codes, self._role_table
+        messages = []
+        for row in range(first, last):
+            layout = layouts[row]
+            if layout == IRREGULAR:
+                messages.append(self._irregular[row])
+                continue
+            offset = offsets[row]
+            content = str(text[offset:offset + lengths[row]], "utf-8", "surrogatepass")
+            role = role_table[codes[row]]
+            if layout == ROLE_CONTENT:
+                messages.append({"role": role, "content": content})
+            else:
+                messages.append({"content": content, "role": role})
+        return messages
+
+    def messages(self, index: int, start: int = 0, end: Optional[int] = None) -> List[Any]:
+        """Rebuild a range of the messages of conversation `index`"""
+        first = self._message_starts[index]
+        end = self.message_count(index) if end is None else end
+        return self._rows(first + start, first + end)
+
+    def conversation(self, index: int) -> Dict[str, Any]:
+        """Rebuild conversation `index`"""
+        if index in self._originals:
+            return self._originals[index]
+        conv = dict(self._templates[index])
+        if "messages" in conv:
+            conv["messages"] = self.messages(index)
+        return conv
+
+    def materialize(self, piece: ConversationSlice) -> Dict[str, Any]:
+        """Rebuild a conversation or split piece as placed in a chunk"""
+        if piece.marker is None:
+            return self.conversation(piece.index)
+        conv = dict(self._originals.get(piece.index, self._templates[piece.index]))
+        conv["messages"] = self.messages(piece.index, piece.start, piece.end)
+        if piece.text_start is not None:
+            msg = conv["messages"][0]
+            conv["messages"][0] = dict(msg, content=msg["content"][piece.text_start:piece.text_end])
+        conv[piece.marker] = True
+        return conv
+
+    def materialize_chunk(self, chunk: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn a chunk of slices into a chunk of conversation dicts"""
+        return dict(chunk, conversations=[self.materialize(piece) for piece in chunk["conversations"]])
+
+    def materialize_chunks(self, chunks: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Turn chunks of slices into chunks of conversation dicts, one at a time"""
+        for chunk in chunks:
+            yield self.materialize_chunk(chunk)
+
+    def conversation_tokens(self, index: int) -> int:
+        """Get the token count of conversation `index` (counted on first use)"""
+        tokens = self._conversation_tokens[index]
+        if tokens == UNCOUNTED:
+            tokens = self._conversation_tokens[index] = self._count_tokens(json.dumps(self.conversation(index)))
+        return tokens
+
+    def message_tokens(self, index: int) -> array:
+        """Get the token counts of the messages of conversation `index` (counted on first use)"""
+        first, last = self._message_starts[index], self._message_starts[index + 1]
+        if UNCOUNTED in self._message_tokens[first:last]:
+            counts = self._count_batch([json.dumps(msg) for msg in self._rows(first, last)])
+            self._message_tokens[first:last] = array('q', counts)
+        return self._message_tokens[first:last]
+
+    def content_hashes(self) -> List[bytes]:
+        """Get the content hash of every conversation"""
+        if len(self._hashes) != HASH_SIZE * len(self):
+            self._hashes = bytearray(b"".join(content_hash(self.conversation(index)) for index in range(len(self))))
+        return [bytes(self._hashes[offset:offset + HASH_SIZE]) for offset in range(0, len(self._hashes), HASH_SIZE)]
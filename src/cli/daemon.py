@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Daemon - long-running server for the total-recall CLI
+
+Every CLI call pays for interpreter startup, imports, PBKDF2 key derivation
+and loading memory indexes. The daemon pays them once. It imports every
+tool, derives the token encryption key, keeps a chunker worker pool, and
+keeps recall indexes loaded between questions. It then serves command lines
+sent by `total-recall` over a Unix domain socket (see daemon_client).
+
+Commands run one at a time in the daemon's working directory set to the
+client's, with their output captured and sent back with the exit code.
+"""
+
+import io
+import os
+import sys
+import json
+import signal
+import argparse
+import threading
+import traceback
+import contextlib
+import socketserver
+from typing import Any, Dict, List, Optional
+
+try:
+    from . import total_recall
+    from .daemon_client import DEFAULT_SOCKET_PATH, connect, send, socket_path
+except ImportError:
+    # When running as a standalone script
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from cli import total_recall
+    from cli.daemon_client import DEFAULT_SOCKET_PATH, connect, send, socket_path
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handles one request line"""
+
+    def handle(self):
+        try:
+            message = json.loads(self.rfile.readline())
+        except ValueError:
+            return
+
+        if message.get("op") == "stop":
+            response = {"code": 0, "stdout": "Daemon stopped\n", "stderr": ""}
+            # shutdown() waits for serve_forever, so it can't run on a request thread's own call chain
+            threading.Thread(target=self.server.shutdown).start()
+        else:
+            response = self.server.execute(message.get("argv", []), message.get("cwd") or os.getcwd())
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serves CLI command lines over a Unix socket"""
+
+    daemon_threads = True
+
+    def __init__(self, path: str):
+        """Listen on path; the socket is only accessible to the current user"""
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        umask = os.umask(0o177)
+        try:
+            super().__init__(path, _RequestHandler)
+        finally:
+            os.umask(umask)
+
+    def execute(self, argv: List[str], cwd: str) -> Dict[str, Any]:
+        """Run one command line with its output captured"""
+        stdout, stderr = io.StringIO(), io.StringIO()
+        # Output redirection and the working directory are process-wide, so commands run one at a time
+        with self._lock:
+            previous_cwd = os.getcwd()
+            try:
+                os.chdir(cwd)
+                with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                    code = _exit_code(argv)
+            except OSError as e:
+                stderr.write(f"total-recall daemon: {e}\n")
+                code = 1
+            finally:
+                os.chdir(previous_cwd)
+        return {"code": code, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+    def server_close(self):
+        super().server_close()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)
+
+
+def _exit_code(argv: List[str]) -> int:
+    """Run a command line in this process and get its exit code, as the process would exit with it"""
+    try:
+        return total_recall.run(argv)
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code, file=sys.stderr)
+        return 1
+    except Exception:
+        traceback.print_exc()
+        return 1
+
+
+def warm_up(workers: Optional[int] = None):
+    """
+    Import every tool and build the state commands would otherwise build on each call
+
+    Returns:
+        A started TokenService keeping the token fresh, or None if there is no refreshable token
+    """
+    for module in sorted({module for module, _ in total_recall.COMMANDS.values()} - {"daemon"}):
+        total_recall.load_tool(module)
+
+    chunker_engine = total_recall.load_tool("chunker_engine")
+    chunker_engine.keep_worker_pool(workers)
+
+    # Derives and caches the token encryption key
+    token_debugger = total_recall.load_tool("token_debugger")
+    try:
+        manager = token_debugger.TokenManager()
+    except Exception as e:
+        print(f"Token key not derived: {e}", file=sys.stderr)
+        return None
+
+    # Refreshes the token ahead of expiry, so served commands find a valid one on disk
+    snapshot = manager.snapshot()
+    if not snapshot or not snapshot.data.get('refresh_token'):
+        return None
+    token_service = total_recall.load_tool("token_service").TokenService(manager)
+    token_service.start()
+    return token_service
+
+
+def start_server(path: str) -> DaemonServer:
+    """
+    Bind the daemon socket
+
+    Raises:
+        RuntimeError: If another daemon is already listening at path
+    """
+    sock = connect(path)
+    if sock is not None:
+        sock.close()
+        raise RuntimeError(f"A daemon is already running at {path}")
+    with contextlib.suppress(FileNotFoundError):
+        # Left behind by a daemon that didn't shut down cleanly
+        os.unlink(path)
+    return DaemonServer(path)
+
+
+def daemon_command(args):
+    """Run the daemon in the foreground until stopped"""
+    try:
+        server = start_server(args.socket)
+    except RuntimeError as e:
+        print(e)
+        return 1
+
+    token_service = warm_up(args.workers)
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+    print(f"Daemon listening on {args.socket}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if token_service is not None:
+            token_service.stop()
+    return 0
+
+
+def daemon_stop_command(args):
+    """Stop the running daemon"""
+    sock = connect(args.socket)
+    if sock is None:
+        print(f"No daemon running at {args.socket}")
+        return 1
+    print(send(sock, {"op": "stop"})["stdout"], end="")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main entry point for the daemon CLI"""
+    default_socket = socket_path() or DEFAULT_SOCKET_PATH
+    parser = argparse.ArgumentParser(description="Total Recall Daemon")
+    parser.add_argument('--socket', default=default_socket,
+                        help=f"Unix socket path (default: {default_socket})")
+
+    subparsers = parser.add_subparsers(dest='command', help='Command to execute')
+
+    # daemon command
+    daemon_parser = subparsers.add_parser('daemon', help='Run the daemon in the foreground')
+    daemon_parser.add_argument('--workers', type=int, default=None,
+                               help='Number of chunker worker processes (default: CPU count)')
+    daemon_parser.set_defaults(func=daemon_command)
+
+    # daemon-stop command
+    stop_parser = subparsers.add_parser('daemon-stop', help='Stop the running daemon')
+    stop_parser.set_defaults(func=daemon_stop_command)
+
+    args = parser.parse_args(argv)
+
+    if args.command is None:
+        parser.print_help()
+        return
+
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
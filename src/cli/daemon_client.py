@@ -0,0 +1,75 @@
+"""
+Daemon Client - runs CLI commands in the total-recall daemon when one is running
+
+The client sends the command line and working directory over the daemon's
+Unix socket and gets back the command's output and exit code. It is kept
+free of any tool imports so that a call served by the daemon costs little
+more than interpreter startup.
+
+Protocol: one JSON request line per connection, answered with one JSON line
+({"code": ..., "stdout": ..., "stderr": ...}).
+"""
+
+import os
+import json
+import socket
+from typing import Any, Dict, List, Optional
+
+# Constants
+DEFAULT_SOCKET_PATH = os.path.expanduser("~/.total_recall/daemon.sock")
+SOCKET_ENV = "TOTAL_RECALL_SOCKET"  # Overrides the socket path; set it empty to never use the daemon
+CONNECT_TIMEOUT = 1.0  # Seconds
+
+
+def socket_path() -> Optional[str]:
+    """Get the daemon socket path, or None if the daemon is disabled"""
+    path = os.environ.get(SOCKET_ENV)
+    if path is None:
+        return DEFAULT_SOCKET_PATH
+    return os.path.expanduser(path) or None
+
+
+def connect(path: Optional[str]) -> Optional[socket.socket]:
+    """Connect to the daemon, or return None if none is listening at path"""
+    if not path or not os.path.exists(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(path)
+    except OSError:
+        # A stale socket file left by a daemon that didn't shut down cleanly
+        sock.close()
+        return None
+    sock.settimeout(None)
+    return sock
+
+
+def send(sock: socket.socket, message: Dict[str, Any]) -> Dict[str, Any]:
+    """Send one request on a connected socket and wait for the response"""
+    with sock:
+        sock.sendall(json.dumps(message).encode() + b"\n")
+        sock.shutdown(socket.SHUT_WR)
+        data = b"".join(iter(lambda: sock.recv(65536), b""))
+    try:
+        return json.loads(data)
+    except ValueError:
+        return {"code": 1, "stdout": "", "stderr": "total-recall daemon closed the connection\n"}
+
+
+def run_in_daemon(argv: List[str], path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Run a command line in the daemon
+
+    Args:
+        argv: Command line, as given to total-recall
+        path: Socket path (default: socket_path())
+
+    Returns:
+        The command's exit code and output, or None if no daemon is running
+        (the command should then run in-process)
+    """
+    sock = connect(path if path is not None else socket_path())
+    if sock is None:
+        return None
+    return send(sock, {"argv": argv, "cwd": os.getcwd()})
@@ -10,18 +10,18 @@ import os
 import json
 import time
 import argparse
-import requests
 from typing import Dict, Any, List, Optional
-from pathlib import Path
 
 # Import the TokenManager from token_debugger
 try:
     from .token_debugger import TokenManager
+    from .token_service import TokenService, TokenUnavailable
 except ImportError:
     # When running as a standalone script
     import sys
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     from cli.token_debugger import TokenManager
+    from cli.token_service import TokenService, TokenUnavailable
 
 # Constants
 TOKEN_FILE = os.path.expanduser("~/.total_recall/auth/token.json")
@@ -59,6 +59,7 @@ class EndpointTester:
         self.token_file = token_file
         self.endpoints_file = endpoints_file
         self.token_manager = TokenManager(token_file)
+        self.token_service = TokenService(self.token_manager)
         self._ensure_config_dir()
         self.endpoints = self._load_endpoints()
         
@@ -159,6 +160,7 @@ class EndpointTester:
         }
         
         # Make the request
+        import requests
         start_time = time.time()
         try:
             method = endpoint["method"].upper()
@@ -203,37 +205,29 @@ class EndpointTester:
         return result
     
     def test_all_endpoints(self) -> List[Dict[str, Any]]:
-        """Test all configured endpoints"""
-        # Load token data
-        token_data = self.token_manager.load_token()
-        if not token_data:
-            print("No token found. Please authenticate first.")
-            return []
-            
-        # Check if token is expired
-        if self.token_manager.is_token_expired(token_data):
-            print("Token is expired. Please re-authenticate.")
-            return []
-            
+        """Test all configured endpoints, refreshing the token as needed"""
         results = []
-        for endpoint in self.endpoints:
-            print(f"Testing endpoint: {endpoint['name']}...")
-            result = self.test_endpoint(endpoint, token_data)
-            results.append(result)
+        # The token is refreshed in the background, so a long run never hits an expired token
+        with self.token_service:
+            for endpoint in self.endpoints:
+                try:
+                    token_data = self.token_service.get_token()
+                except TokenUnavailable as e:
+                    print(e)
+                    return results
+                print(f"Testing endpoint: {endpoint['name']}...")
+                result = self.test_endpoint(endpoint, token_data)
+                results.append(result)
             
         return results
     
     def test_specific_endpoint(self, name: str) -> Optional[Dict[str, Any]]:
         """Test a specific endpoint by name"""
-        # Load token data
-        token_data = self.token_manager.load_token()
-        if not token_data:
-            print("No token found. Please authenticate first.")
-            return None
-            
-        # Check if token is expired
-        if self.token_manager.is_token_expired(token_data):
-            print("Token is expired. Please re-authenticate.")
+        # Load token data, refreshing it if it has expired
+        try:
+            token_data = self.token_service.get_token()
+        except TokenUnavailable as e:
+            print(e)
             return None
             
         # Find the endpoint
@@ -313,7 +307,7 @@ def list_endpoints(args):
     tester.list_endpoints()
 
 
-def main():
+def main(argv: Optional[List[str]] = None):
     """Main entry point for the endpoint tester CLI"""
     parser = argparse.ArgumentParser(description="OpenAI Endpoint Tester")
     parser.add_argument('--token-file', default=TOKEN_FILE, 
@@ -356,13 +350,13 @@ def main():
                                       help='List all configured endpoints')
     list_parser.set_defaults(func=list_endpoints)
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     if args.command is None:
         parser.print_help()
         return
     
-    args.func(args)
+    return args.func(args)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,118 @@
+"""
+Memory Summary - sidecar metadata for processed memory files
+
+Every processed memory file gets a small `<file>.summary` JSON sidecar,
+written while processing, with the chunk count, token totals, chunking
+strategy, a hash of the source file and a histogram of chunk sizes. Listing
+and summary commands read only the sidecar, never the memory file itself.
+
+A sidecar records the size and mtime of the memory file it describes. If the
+file has changed since (or was processed before sidecars existed), the
+summary is rebuilt from the file and the sidecar rewritten.
+"""
+
+import os
+import hashlib
+from typing import Any, Dict, List, Optional
+
+try:
+    from . import serialization
+    from .chunk_store import load_summary
+except ImportError:
+    # When running as a standalone script
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from cli import serialization
+    from cli.chunk_store import load_summary
+
+# Constants
+SUMMARY_EXTENSION = ".summary"
+SUMMARY_VERSION = 1
+HISTOGRAM_BUCKETS = 10  # Equal-width buckets up to max_tokens_per_chunk, plus one for larger chunks
+
+
+def summary_path(memory_path: str) -> str:
+    """Get the sidecar path for a memory file"""
+    return memory_path + SUMMARY_EXTENSION
+
+
+def hash_bytes(data: bytes) -> str:
+    """Hash source file contents"""
+    return "sha256:" + hashlib.sha256(data).hexdigest()
+
+
+def token_histogram(token_counts: List[int], max_tokens: int) -> Dict[str, Any]:
+    """
+    Count chunks per token-size bucket
+
+    Returns:
+        Bucket width and counts; the last bucket holds chunks above max_tokens
+    """
+    width = max(1, -(-max_tokens // HISTOGRAM_BUCKETS))
+    counts = [0] * (HISTOGRAM_BUCKETS + 1)
+    for tokens in token_counts:
+        bucket = min(tokens // width, HISTOGRAM_BUCKETS - 1) if tokens <= max_tokens else HISTOGRAM_BUCKETS
+        counts[bucket] += 1
+    return {"bucket_width": width, "counts": counts}
+
+
+def build_summary(metadata: Dict[str, Any], chunk_stats: List[Dict[str, int]],
+                  source_hash: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Build the summary of a memory file
+
+    Args:
+        metadata: File-level metadata (strategy, max tokens, source file, ...)
+        chunk_stats: Token and conversation counts per chunk
+        source_hash: Hash of the source conversation file, if known
+
+    Returns:
+        Summary dictionary
+    """
+    token_counts = [stats["token_count"] for stats in chunk_stats]
+    max_tokens = metadata.get("max_tokens_per_chunk") or max(token_counts, default=1)
+    summary = {key: value for key, value in metadata.items() if key != "chunk_stats"}
+    summary.update({
+        "version": SUMMARY_VERSION,
+        "source_hash": source_hash,
+        "total_chunks": len(chunk_stats),
+        "total_conversations": sum(stats["conversation_count"] for stats in chunk_stats),
+        "total_tokens": sum(token_counts),
+        "token_histogram": token_histogram(token_counts, max_tokens),
+        "chunk_stats": [[stats["token_count"], stats["conversation_count"]] for stats in chunk_stats]
+    })
+    return summary
+
+
+def write_summary(memory_path: str, summary: Dict[str, Any]) -> None:
+    """Write the sidecar for a memory file, stamped with the file's size and mtime"""
+    stat = os.stat(memory_path)
+    summary = dict(summary, memory_size=stat.st_size, memory_mtime_ns=stat.st_mtime_ns)
+    serialization.dump_file(summary, summary_path(memory_path))
+
+
+def read_summary(memory_path: str) -> Dict[str, Any]:
+    """
+    Get the summary of a memory file
+
+    Reads the sidecar if it matches the file; otherwise rebuilds it from
+    the memory file and writes a fresh sidecar.
+    """
+    stat = os.stat(memory_path)
+    try:
+        summary = serialization.load_file(summary_path(memory_path))
+        if (summary.get("version") == SUMMARY_VERSION
+                and summary.get("memory_size") == stat.st_size
+                and summary.get("memory_mtime_ns") == stat.st_mtime_ns):
+            return summary
+    except (OSError, ValueError):
+        pass
+
+    loaded = load_summary(memory_path)
+    summary = build_summary(loaded, loaded["chunk_stats"])
+    try:
+        write_summary(memory_path, summary)
+    except OSError:
+        # Read-only memory directory - the summary still works, just uncached
+        pass
+    return dict(summary, memory_size=stat.st_size, memory_mtime_ns=stat.st_mtime_ns)
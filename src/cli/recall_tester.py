@@ -10,13 +10,34 @@ import os
 import json
 import argparse
 import re
-from pathlib import Path
-from typing import Dict, Any, List, Optional
-import numpy as np
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+try:
+    from .chunk_store import ChunkStore, FILE_EXTENSION, is_chunk_store
+    from .memory_summary import read_summary
+except ImportError:
+    # When running as a standalone script
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from cli.chunk_store import ChunkStore, FILE_EXTENSION, is_chunk_store
+    from cli.memory_summary import read_summary
 
 # Constants
 DEFAULT_MEMORY_DIR = os.path.expanduser("~/.total_recall/memory/processed")
 CONFIG_DIR = os.path.dirname(DEFAULT_MEMORY_DIR)
+MAX_CACHED_INDEXES = 8  # Memory files whose search index is kept in a long-running process
+
+# Loaded memory files and their chunk word sets, by path; each entry
+# remembers the file's mtime and size so a rewritten file is reloaded
+_indexes: Dict[str, Tuple[Tuple[int, int], Dict[str, Any], List[Set[str]]]] = {}
+
+
+def _close_memory(memory_data: Dict[str, Any]) -> None:
+    """Close the chunk store behind loaded memory data, if any"""
+    chunks = memory_data.get("chunks")
+    if isinstance(chunks, ChunkStore):
+        chunks.close()
+
 
 class RecallTester:
     """Tests memory recall functionality against processed chunks"""
@@ -36,16 +57,24 @@ class RecallTester:
             return []
             
         return [f for f in os.listdir(self.memory_dir) 
-                if f.endswith('.json') and os.path.isfile(os.path.join(self.memory_dir, f))]
+                if f.endswith(('.json', FILE_EXTENSION)) and os.path.isfile(os.path.join(self.memory_dir, f))]
     
     def load_memory_file(self, file_name: str) -> Dict[str, Any]:
-        """Load a memory file"""
+        """
+        Load a memory file
+        
+        For chunk stores, "chunks" is the memory-mapped store itself, so
+        chunks are only read and parsed when they are accessed.
+        """
         file_path = os.path.join(self.memory_dir, file_name)
         if not os.path.exists(file_path):
             print(f"Memory file not found: {file_path}")
             return None
             
         try:
+            if is_chunk_store(file_path):
+                store = ChunkStore(file_path)
+                return dict(store.metadata, chunks=store)
             with open(file_path, 'r') as f:
                 return json.load(f)
         except Exception as e:
@@ -69,23 +98,34 @@ class RecallTester:
         
         return intersection / max(1, union)
     
+    def chunk_words(self, chunk: Dict[str, Any]) -> Set[str]:
+        """Get the set of lowercase words in all message text of a chunk"""
+        # Concatenate all text in the chunk for comparison
+        chunk_text = ""
+        for conv in chunk.get("conversations", []):
+            for msg in conv.get("messages", []):
+                chunk_text += msg.get("content", "") + " "
+        return set(re.findall(r'\w+', chunk_text.lower()))
+    
     def find_relevant_chunks(self, query: str, memory_data: Dict[str, Any], 
-                           top_k: int = 3) -> List[Dict[str, Any]]:
-        """Find chunks relevant to the query"""
+                           top_k: int = 3, chunk_words: Optional[List[Set[str]]] = None) -> List[Dict[str, Any]]:
+        """
+        Find chunks relevant to the query
+        
+        Args:
+            chunk_words: Word sets of the chunks, if already computed (see load_index)
+        """
         chunks = memory_data.get("chunks", [])
         if not chunks:
             return []
+        if chunk_words is None:
+            chunk_words = [self.chunk_words(chunk) for chunk in chunks]
             
-        # Calculate similarity scores
+        # Calculate similarity scores (Jaccard similarity, as in simple_similarity)
+        query_words = set(re.findall(r'\w+', query.lower()))
         scores = []
-        for i, chunk in enumerate(chunks):
-            # Concatenate all text in the chunk for comparison
-            chunk_text = ""
-            for conv in chunk.get("conversations", []):
-                for msg in conv.get("messages", []):
-                    chunk_text += msg.get("content", "") + " "
-            
-            score = self.simple_similarity(query, chunk_text)
+        for i, words in enumerate(chunk_words):
+            score = len(query_words & words) / max(1, len(query_words | words))
             scores.append((i, score))
         
         # Sort by score and get top_k
@@ -94,13 +134,58 @@ class RecallTester:
         
         return [chunks[idx] for idx in top_indices]
     
+    def load_index(self, file_name: str) -> Optional[Tuple[Dict[str, Any], List[Set[str]]]]:
+        """
+        Load a memory file together with the word sets of its chunks
+        
+        Both are kept for the life of the process and reused while the file's
+        mtime and size are unchanged, so repeat questions in a long-running
+        process (such as the daemon) skip loading and indexing.
+        
+        Returns:
+            (memory data, chunk word sets), or None if the file can't be loaded
+        """
+        file_path = os.path.abspath(os.path.join(self.memory_dir, file_name))
+        try:
+            stat = os.stat(file_path)
+            version = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            version = None
+        
+        cached = _indexes.get(file_path)
+        if cached is not None and cached[0] == version:
+            return cached[1], cached[2]
+        
+        memory_data = self.load_memory_file(file_name)
+        if not memory_data:
+            return None
+        chunk_words = [self.chunk_words(chunk) for chunk in memory_data.get("chunks", [])]
+        
+        if version is None:
+            # Not cached, so nothing would close a chunk store - read it all now
+            chunks = memory_data.get("chunks")
+            if isinstance(chunks, ChunkStore):
+                with chunks:
+                    memory_data = dict(memory_data, chunks=list(chunks))
+            return memory_data, chunk_words
+        
+        if cached is not None:
+            # The file was rewritten
+            _close_memory(_indexes.pop(file_path)[1])
+        elif len(_indexes) >= MAX_CACHED_INDEXES:
+            # Drop the oldest entry
+            _close_memory(_indexes.pop(next(iter(_indexes)))[1])
+        _indexes[file_path] = (version, memory_data, chunk_words)
+        return memory_data, chunk_words
+    
     def ask_question(self, query: str, memory_file: str, top_k: int = 3) -> List[Dict[str, Any]]:
         """Ask a question against a memory file"""
-        memory_data = self.load_memory_file(memory_file)
-        if not memory_data:
+        index = self.load_index(memory_file)
+        if index is None:
             return []
-            
-        return self.find_relevant_chunks(query, memory_data, top_k)
+        
+        memory_data, chunk_words = index
+        return self.find_relevant_chunks(query, memory_data, top_k, chunk_words)
 
 
 def list_memories_command(args):
@@ -114,7 +199,14 @@ def list_memories_command(args):
     
     print("\n=== Available Memory Files ===")
     for i, file_name in enumerate(memory_files, 1):
-        print(f"{i}. {file_name}")
+        try:
+            summary = read_summary(os.path.join(tester.memory_dir, file_name))
+        except Exception:
+            print(f"{i}. {file_name} (unreadable)")
+            continue
+        print(f"{i}. {file_name} - {summary.get('chunking_strategy', 'unknown')}, "
+              f"{summary['total_chunks']} chunks, {summary['total_conversations']} conversations, "
+              f"{summary['total_tokens']} tokens")
 
 
 def ask_question_command(args):
@@ -152,7 +244,7 @@ def ask_question_command(args):
                 print("\n... (more conversations)")
 
 
-def main():
+def main(argv: Optional[List[str]] = None):
     """Main entry point for the recall tester CLI"""
     parser = argparse.ArgumentParser(description="Memory Recall Tester")
     parser.add_argument('--memory-dir', default=DEFAULT_MEMORY_DIR, 
@@ -178,13 +270,13 @@ def main():
                           help='Show detailed chunk content')
     ask_parser.set_defaults(func=ask_question_command)
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     if args.command is None:
         parser.print_help()
         return
     
-    args.func(args)
+    return args.func(args)
 
 
 if __name__ == "__main__":
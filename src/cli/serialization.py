@@ -0,0 +1,131 @@
+"""
+Serialization - fast JSON reading and writing
+
+Uses orjson when it is installed and falls back to the standard library
+otherwise. Output is compact (no whitespace) unless `indent=True` is given,
+and UTF-8 is written as-is rather than escaped (dumps_str can escape it
+like json.dumps does by default). Datetimes, enums and
+pydantic models are encoded the same way by both backends.
+
+The API carries the same encoder in app.utils.serialization (its image
+doesn't ship the CLI tools); keep the two in step (the serialization tests
+check that they agree).
+"""
+
+import os
+import re
+import json
+import tempfile
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+# Constants
+BACKEND = "orjson" if orjson is not None else "json"
+
+# Raised for invalid input by both backends (orjson's error subclasses it)
+JSONDecodeError = json.JSONDecodeError
+
+_NON_ASCII = re.compile(r"[^\x00-\x7f]")
+
+
+def _default(value: Any) -> Any:
+    """Encode types the JSON backends don't handle natively"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    if hasattr(value, "dict"):
+        return value.dict()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+    _INDENT_OPTIONS = _OPTIONS | orjson.OPT_INDENT_2
+
+    def dumps(obj: Any, indent: bool = False) -> bytes:
+        """Serialize an object to UTF-8 encoded JSON"""
+        return orjson.dumps(obj, default=_default, option=_INDENT_OPTIONS if indent else _OPTIONS)
+
+    def loads(data: Union[bytes, str]) -> Any:
+        """Deserialize JSON from bytes or str"""
+        return orjson.loads(data)
+else:
+    _encoder = json.JSONEncoder(default=_default, ensure_ascii=False, separators=(",", ":"))
+    _indent_encoder = json.JSONEncoder(default=_default, ensure_ascii=False, indent=2)
+
+    def dumps(obj: Any, indent: bool = False) -> bytes:
+        """Serialize an object to UTF-8 encoded JSON"""
+        return (_indent_encoder if indent else _encoder).encode(obj).encode("utf-8")
+
+    def loads(data: Union[bytes, str]) -> Any:
+        """Deserialize JSON from bytes or str"""
+        return json.loads(data)
+
+
+def _escape_non_ascii(match: "re.Match[str]") -> str:
+    """Escape a character as \\uXXXX, using a surrogate pair outside the BMP"""
+    code = ord(match.group())
+    if code > 0xFFFF:
+        code -= 0x10000
+        return "\\u%04x\\u%04x" % (0xD800 | (code >> 10), 0xDC00 | (code & 0x3FF))
+    return "\\u%04x" % code
+
+
+def dumps_str(obj: Any, indent: bool = False, ensure_ascii: bool = False) -> str:
+    """
+    Serialize an object to a JSON string
+
+    Args:
+        obj: Object to serialize
+        indent: Indent with two spaces instead of compact output
+        ensure_ascii: Escape non-ASCII characters, matching json.dumps' default output
+    """
+    text = dumps(obj, indent).decode("utf-8")
+    if ensure_ascii and not text.isascii():
+        # Non-ASCII characters can only occur inside JSON strings, so escaping them in place is safe
+        text = _NON_ASCII.sub(_escape_non_ascii, text)
+    return text
+
+
+def load_file(path: str) -> Any:
+    """Read a JSON file"""
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+def atomic_write(path: str, data: bytes) -> None:
+    """
+    Write a file atomically
+
+    Data goes to a uniquely named temporary file in the same directory,
+    which is then renamed over the target, so readers see either the old
+    or the new file and concurrent writers never share a temporary file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                    prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def dump_file(obj: Any, path: str, indent: bool = False) -> None:
+    """Write an object to a JSON file atomically"""
+    atomic_write(path, dumps(obj, indent))
@@ -0,0 +1,119 @@
+"""
+Text Splitter - cuts oversized message text into pieces within a token budget
+
+A message bigger than the chunk budget is cut at the most natural boundary
+that keeps each piece within budget, in order of preference: paragraph
+breaks, sentence ends, line breaks inside fenced code blocks, whitespace
+between tokens, and only as a last resort an arbitrary character.
+
+Boundaries are found in one regex pass over the text. Each piece is sized
+from a running characters-per-token estimate and checked once with the real
+token counter, so the whole split is linear in the text length.
+"""
+
+import re
+from bisect import bisect_right
+from typing import Callable, Dict, List, Tuple
+
+# Constants
+PARAGRAPH = 4  # Blank lines, and the edges of fenced code blocks
+SENTENCE = 3
+CODE_LINE = 2  # Line breaks (inside code blocks, the only structure there is)
+TOKEN = 1  # Whitespace
+LEVELS = (PARAGRAPH, SENTENCE, CODE_LINE, TOKEN)
+MIN_FILL = 0.5  # A boundary is only used if the piece before it fills at least this much of the budget
+SAFETY = 0.98  # Aim a little under the estimated budget so most pieces pass the first check
+
+_BOUNDARY = re.compile(
+    r"(?P<fence>^[ \t]*(?:```|~~~)[^\n]*(?:\n|$))"
+    r"|(?P<paragraph>[ \t]*\n[ \t]*\n\s*)"
+    r"|(?P<sentence>[.!?]+[\"')\]]*\s+)"
+    r"|(?P<line>[ \t]*\n)"
+    r"|(?P<token>\s+)",
+    re.MULTILINE
+)
+
+
+def find_boundaries(text: str) -> Dict[int, List[int]]:
+    """
+    Find the positions text can be cut at, by level
+
+    Positions are offsets just after the delimiter, so whitespace stays with
+    the piece before the cut. Inside fenced code blocks, sentence ends don't
+    count and blank lines are treated as plain line breaks.
+    """
+    boundaries = {level: [] for level in LEVELS}
+    in_code = False
+    for match in _BOUNDARY.finditer(text):
+        kind = match.lastgroup
+        if kind == "fence":
+            # Cut before an opening fence and after a closing one
+            boundaries[PARAGRAPH].append(match.end() if in_code else match.start())
+            in_code = not in_code
+        elif in_code:
+            if "\n" in match.group():
+                boundaries[CODE_LINE].append(match.end())
+            else:
+                boundaries[TOKEN].append(match.end())
+        elif kind == "paragraph" or (kind == "sentence" and match.group().count("\n") > 1):
+            boundaries[PARAGRAPH].append(match.end())
+        elif kind == "sentence":
+            boundaries[SENTENCE].append(match.end())
+        elif kind == "line":
+            boundaries[CODE_LINE].append(match.end())
+        else:
+            boundaries[TOKEN].append(match.end())
+    return boundaries
+
+
+def _choose_cut(boundaries: Dict[int, List[int]], start: int, limit: int) -> int:
+    """Pick the best boundary in (start, limit], or limit itself if none is good enough"""
+    floor = start + int((limit - start) * MIN_FILL)
+    for level in LEVELS:
+        positions = boundaries[level]
+        index = bisect_right(positions, limit) - 1
+        if index >= 0 and positions[index] > floor:
+            return positions[index]
+    return limit
+
+
+def split_text(text: str, count_tokens: Callable[[str], int], max_tokens: int) -> List[Tuple[int, int, int]]:
+    """
+    Split text into pieces that each fit max_tokens
+
+    Args:
+        text: Text to split
+        count_tokens: Token count of a piece as it will be emitted (for
+            message content, the whole conversation piece carrying it)
+        max_tokens: Token budget per piece
+
+    Returns:
+        (start, end, token count) for each piece, covering the text in order.
+        What count_tokens("") adds around the text (such as the conversation
+        envelope) is taken off the budget of every piece. If even an empty
+        piece is over budget, the text is returned whole.
+    """
+    total = count_tokens(text)
+    overhead = count_tokens("")
+    if total <= max_tokens or overhead >= max_tokens:
+        return [(0, len(text), total)]
+
+    boundaries = find_boundaries(text)
+    budget = max_tokens - overhead
+    average_ratio = len(text) / max(1, total - overhead)  # Characters per token
+    ratio = average_ratio
+    pieces = []
+    start = 0
+    while start < len(text):
+        limit = min(len(text), start + max(1, int(budget * ratio * SAFETY)))
+        cut = limit if limit == len(text) else _choose_cut(boundaries, start, limit)
+        tokens = count_tokens(text[start:cut])
+        if tokens > max_tokens and cut - start > 1:
+            # Denser text than estimated (e.g. escaped characters) - shrink the estimate and retry
+            ratio *= budget / max(1, tokens - overhead) * SAFETY
+            continue
+        pieces.append((start, cut, tokens))
+        start = cut
+        # Drift back towards the average so one dense stretch doesn't shrink every later piece
+        ratio = min(average_ratio, ratio * 1.25)
+    return pieces
@@ -12,19 +12,117 @@ import time
 import base64
 import argparse
 import datetime
-from pathlib import Path
-from typing import Dict, Any, Optional
-import jwt  # For JWT token decoding
-import requests
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from functools import cached_property, lru_cache
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    from .serialization import atomic_write
+except ImportError:
+    # When running as a standalone script
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from cli.serialization import atomic_write
 
 # Constants
 TOKEN_FILE = os.path.expanduser("~/.total_recall/auth/token.json")
 CONFIG_DIR = os.path.dirname(TOKEN_FILE)
 SALT_FILE = os.path.join(CONFIG_DIR, ".salt")
 DEFAULT_EXPIRY_WARNING = 300  # 5 minutes
+KDF_ITERATIONS = 100000
+
+
+@lru_cache(maxsize=8)
+def derive_key(salt: bytes, password: bytes) -> bytes:
+    """
+    Derive the token encryption key from the salt and machine password
+    
+    PBKDF2 is deliberately slow, so a long-running process (such as the
+    daemon) derives each key once and reuses it.
+    """
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+    
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=KDF_ITERATIONS,
+    )
+    return base64.urlsafe_b64encode(kdf.derive(password))
+
+
+def decode_claims(token: str) -> Dict[str, Any]:
+    """
+    Decode the claims of a JWT without verifying it
+    
+    Without the signing key there is nothing to verify, so this is the
+    payload segment base64-decoded, without importing jwt or printing.
+    """
+    try:
+        if token.count('.') != 2:
+            raise ValueError("Not a valid JWT token format")
+        payload_part = token.split('.')[1]
+        # Add padding if needed
+        payload_part += '=' * (-len(payload_part) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload_part))
+        if not isinstance(claims, dict):
+            raise ValueError("Token payload is not an object")
+        return claims
+    except Exception:
+        return {"error": "Could not decode token"}
+
+
+def _file_version(path: str) -> Optional[Tuple[int, int, int]]:
+    """Get the mtime, size and inode of a file, or None if it is missing"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class TokenSnapshot:
+    """
+    A decrypted token file, as it was on disk at one version
+    
+    Expiry is parsed once and the JWT claims are decoded on first use, so
+    status queries don't decrypt or decode again. TokenManager.snapshot()
+    hands out the same snapshot until the file changes.
+    """
+    
+    def __init__(self, data: Dict[str, Any], version: Optional[Tuple[int, int, int]] = None):
+        self.data = data
+        self.version = version
+        self.expires_at = (datetime.datetime.fromisoformat(data['expires_at'])
+                           if 'expires_at' in data else None)
+    
+    @cached_property
+    def claims(self) -> Dict[str, Any]:
+        """Decoded claims of the access token ({} if there is none)"""
+        access_token = self.data.get('access_token')
+        return decode_claims(access_token) if access_token else {}
+    
+    @property
+    def expiry_seconds(self) -> Optional[int]:
+        """Seconds until the token expires (0 once expired), or None if it has no expiry"""
+        if self.expires_at is None:
+            return None
+        return max(0, int((self.expires_at - datetime.datetime.now()).total_seconds()))
+    
+    @property
+    def expired(self) -> bool:
+        """Whether the token has expired; one without expiry info is assumed expired"""
+        return self.expires_at is None or datetime.datetime.now() >= self.expires_at
+    
+    def expiring_soon(self, warning_seconds: int = DEFAULT_EXPIRY_WARNING) -> bool:
+        """Whether the token expires within warning_seconds"""
+        if self.expires_at is None:
+            return True
+        return datetime.datetime.now() + datetime.timedelta(seconds=warning_seconds) >= self.expires_at
+
+
+# Snapshots by token file and key, with the file version they were read at
+_snapshots: Dict[Tuple[str, bytes], Tuple[Any, Optional[TokenSnapshot]]] = {}
 
 
 class TokenManager:
@@ -54,14 +152,7 @@ class TokenManager:
         machine_id = self._get_machine_id()
         password = machine_id.encode()
         
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(password))
-        return key
+        return derive_key(salt, password)
     
     def _get_machine_id(self) -> str:
         """Get a unique machine identifier"""
@@ -77,19 +168,27 @@ class TokenManager:
                 import uuid
                 return str(uuid.getnode())
     
-    def save_token(self, token_data: Dict[str, Any]) -> None:
-        """Save token data to the token file"""
+    def save_token(self, token_data: Dict[str, Any], verbose: bool = True) -> None:
+        """
+        Save token data to the token file
+        
+        The file is replaced atomically, so other processes reading the token
+        never see a partly written file.
+        """
         # Add timestamp for tracking
         token_data['stored_at'] = datetime.datetime.now().isoformat()
         
         # Encrypt the token data
+        from cryptography.fernet import Fernet
         fernet = Fernet(self.encryption_key)
         encrypted_data = fernet.encrypt(json.dumps(token_data).encode())
         
-        with open(self.token_file, 'wb') as f:
-            f.write(encrypted_data)
-            
-        print(f"Token saved to {self.token_file}")
+        atomic_write(self.token_file, encrypted_data)
+        version = _file_version(self.token_file)
+        _snapshots[self._snapshot_key()] = (version, TokenSnapshot(dict(token_data), version))
+        
+        if verbose:
+            print(f"Token saved to {self.token_file}")
     
     def load_token(self) -> Optional[Dict[str, Any]]:
         """Load token data from the token file"""
@@ -101,6 +200,7 @@ class TokenManager:
             with open(self.token_file, 'rb') as f:
                 encrypted_data = f.read()
                 
+            from cryptography.fernet import Fernet
             fernet = Fernet(self.encryption_key)
             decrypted_data = fernet.decrypt(encrypted_data)
             token_data = json.loads(decrypted_data.decode())
@@ -109,77 +209,40 @@ class TokenManager:
             print(f"Error loading token: {e}")
             return None
     
-    def is_token_expired(self, token_data: Dict[str, Any]) -> bool:
-        """Check if the token is expired"""
-        if 'expires_at' not in token_data:
-            # If no expiry info, assume expired to be safe
-            return True
-            
-        expires_at = datetime.datetime.fromisoformat(token_data['expires_at'])
-        now = datetime.datetime.now()
-        return now >= expires_at
-    
-    def is_token_expiring_soon(self, token_data: Dict[str, Any], 
-                              warning_seconds: int = DEFAULT_EXPIRY_WARNING) -> bool:
-        """Check if the token is expiring soon"""
-        if 'expires_at' not in token_data:
-            # If no expiry info, assume expiring soon to be safe
-            return True
-            
-        expires_at = datetime.datetime.fromisoformat(token_data['expires_at'])
-        warning_time = datetime.datetime.now() + datetime.timedelta(seconds=warning_seconds)
-        return warning_time >= expires_at
+    def _snapshot_key(self) -> Tuple[str, bytes]:
+        return os.path.abspath(self.token_file), self.encryption_key
     
-    def get_token_expiry_seconds(self, token_data: Dict[str, Any]) -> Optional[int]:
-        """Get the number of seconds until the token expires"""
-        if 'expires_at' not in token_data:
-            return None
-            
-        expires_at = datetime.datetime.fromisoformat(token_data['expires_at'])
-        now = datetime.datetime.now()
-        if now >= expires_at:
-            return 0
+    def snapshot(self) -> Optional[TokenSnapshot]:
+        """
+        Get the current token as a snapshot, or None if there is no readable token
         
-        delta = expires_at - now
-        return int(delta.total_seconds())
-    
-    def decode_token(self, token: str) -> Dict[str, Any]:
-        """Decode a JWT token"""
-        try:
-            # JWT tokens have three parts separated by dots
-            if token.count('.') != 2:
-                raise ValueError("Not a valid JWT token format")
-                
-            # Decode without verification (we don't have the secret)
-            decoded = jwt.decode(token, options={"verify_signature": False})
-            return decoded
-        except Exception as e:
-            print(f"Error decoding token: {e}")
-            # Fallback: manual decoding of the payload part
-            try:
-                payload_part = token.split('.')[1]
-                # Add padding if needed
-                payload_part += '=' * (4 - len(payload_part) % 4)
-                decoded_bytes = base64.urlsafe_b64decode(payload_part)
-                return json.loads(decoded_bytes)
-            except Exception as e2:
-                print(f"Fallback decoding also failed: {e2}")
-                return {"error": "Could not decode token"}
+        The file is only decrypted again when its mtime, size or inode changes.
+        """
+        key = self._snapshot_key()
+        version = _file_version(self.token_file)
+        cached = _snapshots.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        token_data = self.load_token() if version is not None else None
+        snapshot = TokenSnapshot(token_data, version) if token_data else None
+        _snapshots[key] = (version, snapshot)
+        return snapshot
 
 
 def view_token(args):
     """View the current token information"""
-    manager = TokenManager(args.token_file)
-    token_data = manager.load_token()
+    snapshot = TokenManager(args.token_file).snapshot()
     
-    if not token_data:
+    if not snapshot:
         print("No token found.")
         return
     
     # Check token status
-    is_expired = manager.is_token_expired(token_data)
-    expiry_seconds = manager.get_token_expiry_seconds(token_data)
-    is_expiring_soon = manager.is_token_expiring_soon(token_data)
+    token_data = snapshot.data
+    is_expired = snapshot.expired
+    expiry_seconds = snapshot.expiry_seconds
+    is_expiring_soon = snapshot.expiring_soon()
     
     # Print token information
     print("\n=== Token Information ===")
@@ -228,19 +291,17 @@ def view_token(args):
 
 def decode_token(args):
     """Decode and display the token payload"""
-    manager = TokenManager(args.token_file)
-    token_data = manager.load_token()
+    snapshot = TokenManager(args.token_file).snapshot()
     
-    if not token_data:
+    if not snapshot:
         print("No token found.")
         return
     
-    token = token_data.get('access_token')
-    if not token:
+    if not snapshot.data.get('access_token'):
         print("No access token found in the token data.")
         return
     
-    decoded = manager.decode_token(token)
+    decoded = snapshot.claims
     
     print("\n=== Decoded Token Payload ===")
     print(json.dumps(decoded, indent=2))
@@ -267,17 +328,16 @@ def decode_token(args):
 
 def token_status(args):
     """Check the status of the current token"""
-    manager = TokenManager(args.token_file)
-    token_data = manager.load_token()
+    snapshot = TokenManager(args.token_file).snapshot()
     
-    if not token_data:
+    if not snapshot:
         print("No token found.")
         return 1  # Error exit code
     
     # Check token status
-    is_expired = manager.is_token_expired(token_data)
-    expiry_seconds = manager.get_token_expiry_seconds(token_data)
-    is_expiring_soon = manager.is_token_expiring_soon(token_data)
+    is_expired = snapshot.expired
+    expiry_seconds = snapshot.expiry_seconds
+    is_expiring_soon = snapshot.expiring_soon()
     
     if is_expired:
         print("EXPIRED")
@@ -290,7 +350,7 @@ def token_status(args):
         return 0  # Success exit code
 
 
-def main():
+def main(argv: Optional[List[str]] = None):
     """Main entry point for the token debugger CLI"""
     parser = argparse.ArgumentParser(description="OAuth Token Debugger")
     parser.add_argument('--token-file', default=TOKEN_FILE, 
@@ -311,13 +371,13 @@ def main():
                                          help='Check token status (for scripting)')
     status_parser.set_defaults(func=token_status)
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     if args.command is None:
         parser.print_help()
         return
     
-    args.func(args)
+    return args.func(args)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Token Service - keeps the OAuth access token fresh in the background
+
+TokenService holds the decrypted token in memory and refreshes it with the
+refresh_token grant ahead of `expires_at`: REFRESH_MARGIN seconds early,
+minus a random jitter so several processes sharing the token file don't all
+refresh at once. Jobs call get_token() whenever they need the token. An
+expired token makes the call wait for the refresh in progress (or run one)
+instead of failing the job mid-run.
+
+The token endpoint defaults to DEFAULT_TOKEN_URL and can be pointed
+elsewhere, such as a local fake auth server in tests, with $TOTAL_RECALL_TOKEN_URL.
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import datetime
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from .token_debugger import DEFAULT_EXPIRY_WARNING, TOKEN_FILE, TokenManager, TokenSnapshot
+except ImportError:
+    # When running as a standalone script
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from cli.token_debugger import DEFAULT_EXPIRY_WARNING, TOKEN_FILE, TokenManager, TokenSnapshot
+
+# Constants
+DEFAULT_TOKEN_URL = "https://auth.openai.com/oauth/token"
+TOKEN_URL_ENV = "TOTAL_RECALL_TOKEN_URL"
+REFRESH_MARGIN = DEFAULT_EXPIRY_WARNING  # Refresh this many seconds before expires_at
+REFRESH_JITTER = 60  # Up to this many seconds earlier still
+RETRY_DELAYS = (1, 2, 5, 10, 30)  # Seconds between failed refresh attempts; the last one repeats
+REQUEST_TIMEOUT = 10  # Seconds
+DEFAULT_WAIT = 30  # Seconds get_token waits for a refresh
+
+
+class TokenUnavailable(Exception):
+    """Raised when no valid access token can be provided"""
+
+
+class TokenService:
+    """Caches the access token in memory and refreshes it before it expires"""
+
+    def __init__(self, manager: Optional[TokenManager] = None, token_url: Optional[str] = None,
+                 margin: float = REFRESH_MARGIN, jitter: float = REFRESH_JITTER,
+                 retry_delays: List[float] = RETRY_DELAYS):
+        """
+        Create the service; call start() to refresh in the background
+
+        Args:
+            manager: Reads and writes the encrypted token file
+            token_url: OAuth token endpoint (default: $TOTAL_RECALL_TOKEN_URL or DEFAULT_TOKEN_URL)
+            margin: Seconds before expiry to refresh
+            jitter: Up to this many extra seconds early, chosen at random per token
+            retry_delays: Seconds between failed attempts; the last one repeats
+        """
+        self.manager = manager or TokenManager()
+        self.token_url = token_url or os.environ.get(TOKEN_URL_ENV) or DEFAULT_TOKEN_URL
+        self.margin = margin
+        self.jitter = jitter
+        self.retry_delays = list(retry_delays)
+        self.last_error: Optional[str] = None
+        self._token: Optional[Dict[str, Any]] = None
+        self._snapshot: Optional[TokenSnapshot] = None  # Snapshot the cached token came from
+        self._refresh_at: Optional[datetime.datetime] = None
+        self._retry_at: Optional[datetime.datetime] = None
+        self._failures = 0
+        self._refreshing = False
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        lock = threading.Lock()
+        self._wake = threading.Condition(lock)  # Wakes the background thread
+        self._refreshed = threading.Condition(lock)  # Wakes jobs waiting for a refresh
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def add_listener(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """Call callback with the new token data after each refresh (without holding the lock)"""
+        self._listeners.append(callback)
+
+    def _current(self) -> Optional[Dict[str, Any]]:
+        """Get the cached token, reloading it if another process rewrote the file"""
+        snapshot = self.manager.snapshot()
+        if snapshot is not self._snapshot:
+            self._set_snapshot(snapshot)
+        return self._token
+
+    def _set_snapshot(self, snapshot: Optional[TokenSnapshot]) -> None:
+        """Cache a token and schedule its refresh"""
+        self._snapshot = snapshot
+        self._token = snapshot.data if snapshot else None
+        if snapshot is None or snapshot.expires_at is None:
+            # Treated as expired by TokenSnapshot, so due now
+            self._refresh_at = datetime.datetime.now()
+        else:
+            early = self.margin + random.uniform(0, self.jitter)
+            self._refresh_at = snapshot.expires_at - datetime.timedelta(seconds=early)
+
+    def _is_valid(self) -> bool:
+        """Check that the cached token exists and hasn't expired"""
+        return self._snapshot is not None and not self._snapshot.expired
+
+    def get_token(self, timeout: float = DEFAULT_WAIT) -> Dict[str, Any]:
+        """
+        Get a valid token, waiting for (or running) a refresh if it has expired
+
+        Raises:
+            TokenUnavailable: If there is no token, or it couldn't be refreshed within timeout
+        """
+        deadline = time.monotonic() + timeout
+        with self._refreshed:
+            while True:
+                token_data = self._current()
+                if self._is_valid():
+                    return token_data
+                if not token_data:
+                    raise TokenUnavailable("No token found. Please authenticate first.")
+                if not token_data.get('refresh_token'):
+                    raise TokenUnavailable("Token is expired and has no refresh token. Please re-authenticate.")
+
+                if self._thread is None and not self._refreshing:
+                    # No background thread - refresh on this one
+                    self._refresh_locked()
+                    continue
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TokenUnavailable(f"Token is expired and wasn't refreshed in time: {self.last_error}")
+                self._wake.notify()
+                self._refreshed.wait(remaining)
+
+    def access_token(self, timeout: float = DEFAULT_WAIT) -> str:
+        """Get a valid access token"""
+        return self.get_token(timeout)['access_token']
+
+    def refresh(self) -> Dict[str, Any]:
+        """Refresh the token now, whether or not it is due"""
+        with self._refreshed:
+            self._current()
+            return self._refresh_locked()
+
+    def _refresh_locked(self) -> Dict[str, Any]:
+        """
+        Exchange the refresh token for a new access token (called holding the lock)
+
+        The HTTP request is made without the lock, so jobs holding a valid
+        token aren't held up. A refresh already in progress is waited for and
+        its result shared, so the token endpoint sees one request at a time.
+        """
+        if self._refreshing:
+            while self._refreshing:
+                self._refreshed.wait()
+            if self.last_error:
+                raise TokenUnavailable(self.last_error)
+            return self._token
+
+        token_data = self._token
+        if not token_data or not token_data.get('refresh_token'):
+            raise TokenUnavailable("No refresh token available. Please re-authenticate.")
+
+        self._refreshing = True
+        self._refreshed.release()
+        try:
+            new_token = self._request_refresh(token_data)
+            error = None
+        except TokenUnavailable as e:
+            error = e
+        finally:
+            self._refreshed.acquire()
+            self._refreshing = False
+
+        if error is not None:
+            delay = self.retry_delays[min(self._failures, len(self.retry_delays) - 1)]
+            self._failures += 1
+            self._retry_at = datetime.datetime.now() + datetime.timedelta(seconds=delay)
+            self.last_error = str(error)
+            self._refreshed.notify_all()
+            raise error
+
+        self.manager.save_token(new_token, verbose=False)
+        self._failures = 0
+        self._retry_at = None
+        self.last_error = None
+        # save_token cached a snapshot of the new file, so this doesn't decrypt it again
+        self._set_snapshot(self.manager.snapshot())
+        self._refreshed.notify_all()
+
+        # Listeners run without the lock, so they can call get_token()
+        listeners = list(self._listeners)
+        self._refreshed.release()
+        try:
+            for callback in listeners:
+                callback(new_token)
+        finally:
+            self._refreshed.acquire()
+        return new_token
+
+    def _request_refresh(self, token_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Call the token endpoint and build the new token data"""
+        import requests
+
+        form = {"grant_type": "refresh_token", "refresh_token": token_data['refresh_token']}
+        if token_data.get('client_id'):
+            form["client_id"] = token_data['client_id']
+        try:
+            response = requests.post(self.token_url, data=form, timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+            payload = response.json()
+            access_token = payload['access_token']
+        except (requests.RequestException, ValueError, KeyError) as e:
+            raise TokenUnavailable(f"Token refresh failed: {e}") from None
+
+        # Keep fields the server didn't send again, such as a refresh token that wasn't rotated
+        new_token = dict(token_data)
+        new_token.update({key: value for key, value in payload.items() if key != 'expires_in'})
+        new_token['access_token'] = access_token
+        if 'expires_in' in payload:
+            expiry = datetime.datetime.now() + datetime.timedelta(seconds=int(payload['expires_in']))
+            new_token['expires_at'] = expiry.isoformat()
+        return new_token
+
+    def start(self) -> None:
+        """Start refreshing in a background thread"""
+        with self._wake:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="token-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread"""
+        with self._wake:
+            thread, self._thread = self._thread, None
+            self._stopping = True
+            self._wake.notify()
+        if thread is not None:
+            thread.join()
+
+    def _next_delay(self) -> Optional[float]:
+        """Seconds until the next refresh attempt, or None if there is nothing to refresh"""
+        token_data = self._current()
+        if not token_data or not token_data.get('refresh_token'):
+            return None
+        due = max(self._refresh_at, self._retry_at or self._refresh_at)
+        return max(0.0, (due - datetime.datetime.now()).total_seconds())
+
+    def _run(self) -> None:
+        """Background loop: sleep until the token is due, then refresh it"""
+        with self._wake:
+            while not self._stopping:
+                delay = self._next_delay()
+                if delay is None or delay > 0:
+                    # Woken early by stop() or a job waiting on an expired token; re-check either way
+                    self._wake.wait(delay)
+                    continue
+                try:
+                    self._refresh_locked()
+                except TokenUnavailable:
+                    # Retried once _retry_at passes
+                    pass
+
+
+def refresh_token_command(args):
+    """Refresh the access token now"""
+    service = TokenService(TokenManager(args.token_file), args.token_url)
+    try:
+        token_data = service.refresh()
+    except TokenUnavailable as e:
+        print(e)
+        return 1
+    print(f"Token refreshed; expires at {token_data.get('expires_at', 'unknown')}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main entry point for the token service CLI"""
+    parser = argparse.ArgumentParser(description="OAuth Token Service")
+    parser.add_argument('--token-file', default=TOKEN_FILE,
+                        help=f"Path to token file (default: {TOKEN_FILE})")
+    parser.add_argument('--token-url', default=None,
+                        help=f"OAuth token endpoint (default: ${TOKEN_URL_ENV} or {DEFAULT_TOKEN_URL})")
+
+    subparsers = parser.add_subparsers(dest='command', help='Command to execute')
+
+    # refresh-token command
+    refresh_parser = subparsers.add_parser('refresh-token', help='Refresh the access token now')
+    refresh_parser.set_defaults(func=refresh_token_command)
+
+    args = parser.parse_args(argv)
+
+    if args.command is None:
+        parser.print_help()
+        return
+
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+"""
+Tokenizer - pluggable token counting for the CLI tools
+
+Two backends are available:
+
+- heuristic: one token per four characters. Free to compute, but badly off
+  for code and non-English text.
+- bpe: an offline byte-pair encoder that loads a vocabulary file from disk
+  (the rank files published for tiktoken encodings such as cl100k_base, one
+  base64-encoded token and its rank per line). Text is pre-split into words
+  and each distinct word is encoded once, then served from a cache.
+
+Both support counting many strings at once with count_batch.
+"""
+
+import os
+import re
+import base64
+import hashlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Constants
+HEURISTIC = "heuristic"
+BPE = "bpe"
+BACKENDS = [HEURISTIC, BPE]
+DEFAULT_BACKEND = HEURISTIC
+DEFAULT_VOCAB_PATH = os.path.expanduser("~/.total_recall/tokenizers/cl100k_base.tiktoken")
+CHARS_PER_TOKEN = 4
+WORD_CACHE_SIZE = 200_000  # Distinct words kept encoded; the cache is cleared when it fills
+
+# The cl100k_base pre-tokenizer, written for the standard library re module:
+# \p{L} becomes [^\W\d_] and \p{N} becomes \d
+WORD_PATTERN = (
+    r"'(?i:[sdmt]|ll|ve|re)"
+    r"|(?:[^\r\n\w]|_)?[^\W\d_]+"
+    r"|\d{1,3}"
+    r"| ?(?:[^\s\w]|_)+[\r\n]*"
+    r"|\s*[\r\n]"
+    r"|\s+(?!\S)"
+    r"|\s+"
+)
+
+
+class Tokenizer:
+    """Counts tokens in text"""
+
+    backend = HEURISTIC
+
+    def __init__(self):
+        """Create the heuristic tokenizer"""
+        self.vocab_path: Optional[str] = None
+        self.name = HEURISTIC
+
+    def count(self, text: str) -> int:
+        """Count the tokens in a text"""
+        return len(text) // CHARS_PER_TOKEN
+
+    def count_batch(self, texts: Iterable[str]) -> List[int]:
+        """Count the tokens in each of several texts"""
+        return [len(text) // CHARS_PER_TOKEN for text in texts]
+
+
+class BPETokenizer(Tokenizer):
+    """Byte-pair encoder over a ranked vocabulary, with a per-word cache"""
+
+    backend = BPE
+
+    def __init__(self, ranks: Dict[bytes, int], pattern: str = WORD_PATTERN, name: str = BPE):
+        """
+        Create an encoder
+
+        Args:
+            ranks: Token bytes to rank; lower ranks merge first. Every single
+                byte should have a rank so that any text can be encoded.
+            pattern: Regex that splits text into words before merging
+            name: Identifies the vocabulary (used in cache keys)
+        """
+        self.vocab_path = None
+        self.name = name
+        self._ranks = ranks
+        self._words = re.compile(pattern)
+        self._cache: Dict[str, Tuple[int, ...]] = {}
+
+    @classmethod
+    def from_file(cls, path: str, pattern: str = WORD_PATTERN) -> "BPETokenizer":
+        """Load a vocabulary file of base64-encoded tokens and their ranks"""
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        ranks = {}
+        for line_number, line in enumerate(data.splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                token, rank = line.split()
+                ranks[base64.b64decode(token)] = int(rank)
+            except ValueError:
+                raise ValueError(f"Invalid vocabulary file {path}, line {line_number}") from None
+
+        stem = os.path.splitext(os.path.basename(path))[0]
+        tokenizer = cls(ranks, pattern, f"{BPE}:{stem}:{hashlib.sha256(data).hexdigest()[:16]}")
+        tokenizer.vocab_path = path
+        return tokenizer
+
+    def _merge(self, word: bytes) -> Tuple[int, ...]:
+        """Encode one word by repeatedly merging its lowest-ranked adjacent pair"""
+        ranks = self._ranks
+        rank = ranks.get(word)
+        if rank is not None:
+            return (rank,)
+
+        parts = [word[i:i + 1] for i in range(len(word))]
+        while len(parts) > 1:
+            best_rank = None
+            best = 0
+            for i in range(len(parts) - 1):
+                rank = ranks.get(parts[i] + parts[i + 1])
+                if rank is not None and (best_rank is None or rank < best_rank):
+                    best_rank = rank
+                    best = i
+            if best_rank is None:
+                break
+            parts[best:best + 2] = [parts[best] + parts[best + 1]]
+
+        # Bytes missing from the vocabulary still count as one token each
+        return tuple(ranks.get(part, -1) for part in parts)
+
+    def _encode_word(self, word: str) -> Tuple[int, ...]:
+        """Encode one word, using the cache"""
+        tokens = self._cache.get(word)
+        if tokens is None:
+            if len(self._cache) >= WORD_CACHE_SIZE:
+                self._cache.clear()
+            tokens = self._cache[word] = self._merge(word.encode("utf-8", "surrogatepass"))
+        return tokens
+
+    def encode(self, text: str) -> List[int]:
+        """Encode a text to token ranks"""
+        tokens = []
+        for word in self._words.findall(text):
+            tokens.extend(self._encode_word(word))
+        return tokens
+
+    def count(self, text: str) -> int:
+        """Count the tokens in a text"""
+        cache = self._cache
+        total = 0
+        for word in self._words.findall(text):
+            tokens = cache.get(word)
+            total += len(tokens if tokens is not None else self._encode_word(word))
+        return total
+
+    def count_batch(self, texts: Iterable[str]) -> List[int]:
+        """Count the tokens in each of several texts"""
+        count = self.count
+        return [count(text) for text in texts]
+
+
+# Loaded tokenizers by (backend, vocabulary path), with the vocabulary file's
+# mtime and size when loaded, so an edited vocabulary is picked up
+_tokenizers: Dict[Tuple[str, Optional[str]], Tuple[Optional[Tuple[int, int]], Tokenizer]] = {}
+
+
+def load_tokenizer(backend: str = DEFAULT_BACKEND, vocab_path: Optional[str] = None) -> Tokenizer:
+    """
+    Get a tokenizer by backend name
+
+    Tokenizers are loaded once per process and shared, so their word caches
+    stay warm across files. A vocabulary file that has changed since it was
+    loaded is loaded again.
+
+    Args:
+        backend: One of BACKENDS
+        vocab_path: Vocabulary file for the bpe backend (default: DEFAULT_VOCAB_PATH)
+    """
+    if backend == HEURISTIC:
+        vocab_path = None
+    elif backend == BPE:
+        vocab_path = os.path.abspath(os.path.expanduser(vocab_path or DEFAULT_VOCAB_PATH))
+    else:
+        raise ValueError(f"Unknown tokenizer backend: {backend} (choose from {', '.join(BACKENDS)})")
+
+    version = None
+    if vocab_path is not None:
+        try:
+            stat = os.stat(vocab_path)
+            version = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            pass
+
+    key = (backend, vocab_path)
+    cached = _tokenizers.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    tokenizer = Tokenizer() if backend == HEURISTIC else BPETokenizer.from_file(vocab_path)
+    _tokenizers[key] = (version, tokenizer)
+    return tokenizer
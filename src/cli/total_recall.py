@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Total Recall - single entry point for the CLI tools
+
+    total-recall <command> [options]
+
+Each command belongs to one of the tools (chunker engine, recall tester,
+token debugger, endpoint tester). Only the module of the chosen command is
+imported, so a quick command such as token-status doesn't pay for loading
+the chunker or the HTTP stack. Options that come before the command are
+passed through to its tool, e.g. `total-recall --no-cache process --file x`.
+
+When `total-recall daemon` is running, commands are sent to it over a Unix
+socket and run there with warm state; otherwise they run in-process.
+"""
+
+import sys
+import importlib
+from typing import List, Optional
+
+# Constants
+PROG = "total-recall"
+
+# Command name -> (tool module, help); kept here so listing commands imports nothing
+COMMANDS = {
+    "process": ("chunker_engine", "Process a conversation file"),
+    "process-dir": ("chunker_engine", "Process all conversation files in a directory or glob"),
+    "list-memories": ("recall_tester", "List all available memory files"),
+    "ask-question": ("recall_tester", "Ask a question against a memory file"),
+    "view-token": ("token_debugger", "View current token information"),
+    "decode-token": ("token_debugger", "Decode and display token payload"),
+    "token-status": ("token_debugger", "Check token status (for scripting)"),
+    "refresh-token": ("token_service", "Refresh the access token now"),
+    "test-endpoints": ("endpoint_tester", "Test all configured endpoints"),
+    "test-endpoint": ("endpoint_tester", "Test a specific endpoint"),
+    "add-endpoint": ("endpoint_tester", "Add a new endpoint to test"),
+    "remove-endpoint": ("endpoint_tester", "Remove an endpoint"),
+    "list-endpoints": ("endpoint_tester", "List all configured endpoints"),
+    "daemon": ("daemon", "Run the daemon that serves commands over a Unix socket"),
+    "daemon-stop": ("daemon", "Stop the running daemon"),
+}
+
+# Tool options that can come before the command and take a value
+VALUE_OPTIONS = {
+    "--output-dir", "--cache-path", "--cache-size", "--tokenizer", "--vocab",  # chunker_engine
+    "--memory-dir",  # recall_tester
+    "--token-file", "--token-url", "--endpoints-file",  # token_debugger, token_service, endpoint_tester
+    "--socket",  # daemon
+}
+
+
+def load_tool(module: str):
+    """Import one tool module"""
+    if __package__:
+        return importlib.import_module(f".{module}", __package__)
+    # When running as a standalone script
+    import os
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return importlib.import_module(f"cli.{module}")
+
+
+def print_usage(file=None) -> None:
+    """List the available commands"""
+    file = file or sys.stdout
+    print(f"usage: {PROG} [tool options] <command> [options]\n", file=file)
+    print("commands:", file=file)
+    for name, (module, help_text) in COMMANDS.items():
+        print(f"  {name:<18} {help_text}", file=file)
+    print(f"\nRun '{PROG} <command> --help' for the options of a command.", file=file)
+
+
+def find_command(argv: List[str]) -> Optional[str]:
+    """
+    Get the command in a command line
+
+    The command is the first positional argument. The values of options
+    before it are skipped, so `--output-dir process process` finds the
+    second `process`.
+    """
+    args = iter(argv)
+    for arg in args:
+        if arg.startswith("-"):
+            if arg in VALUE_OPTIONS:
+                next(args, None)
+            continue
+        return arg if arg in COMMANDS else None
+    return None
+
+
+def run(argv: List[str]) -> int:
+    """Run a command line in this process"""
+    tool = load_tool(COMMANDS[find_command(argv)][0])
+    sys.argv[0] = PROG
+    return tool.main(argv) or 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Dispatch to the daemon if one is running, or else to the tool that owns the command"""
+    argv = sys.argv[1:] if argv is None else argv
+    command = find_command(argv)
+    if command is None:
+        if not argv or argv[0] in ("-h", "--help"):
+            print_usage()
+            return 0
+        print(f"{PROG}: unknown command: {' '.join(argv)}\n", file=sys.stderr)
+        print_usage(sys.stderr)
+        return 2
+
+    if COMMANDS[command][0] != "daemon":
+        response = load_tool("daemon_client").run_in_daemon(argv)
+        if response is not None:
+            sys.stdout.write(response["stdout"])
+            sys.stderr.write(response["stderr"])
+            return response["code"]
+    return run(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
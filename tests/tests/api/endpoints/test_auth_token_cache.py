@@ -0,0 +1,65 @@
+import pytest
+import sys
+import os
+import time
+from unittest.mock import patch
+
+# Make the API package importable
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../api')))
+
+from app.api.endpoints import auth
+
+
+class TestTokenCache:
+    """Test suite for the verified token cache used by get_current_user"""
+    
+    def setup_method(self):
+        """Set up test fixtures before each test method"""
+        auth.token_cache.clear()
+        auth.fake_users_db["cache_user"] = auth.User(username="cache_user")
+    
+    def test_verified_token_skips_decode(self):
+        """Test that a second lookup is served from the cache"""
+        # Arrange
+        token = auth.create_access_token({"sub": "cache_user"})
+        
+        # Act
+        with patch.object(auth.jwt, "decode", wraps=auth.jwt.decode) as mock_decode:
+            first = auth.verify_token(token)
+            second = auth.verify_token(token)
+        
+        # Assert
+        assert first == second == "cache_user"
+        assert mock_decode.call_count == 1
+    
+    def test_entry_respects_token_expiry(self):
+        """Test that cached entries never outlive the exp claim"""
+        # Arrange
+        cache = auth.TokenCache(ttl=60)
+        
+        # Act
+        cache.put("token", "cache_user", exp=time.time() - 1)
+        
+        # Assert
+        assert cache.get("token") is None
+    
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test LRU eviction"""
+        # Arrange
+        cache = auth.TokenCache(max_size=2)
+        cache.put("a", "user_a")
+        cache.put("b", "user_b")
+        cache.get("a")
+        
+        # Act
+        cache.put("c", "user_c")
+        
+        # Assert
+        assert cache.get("b") is None
+        assert cache.get("a") == "user_a"
+    
+    def test_invalid_token_is_not_cached(self):
+        """Test that invalid tokens still raise"""
+        with pytest.raises(auth.JWTError):
+            auth.verify_token("not.a.token")
+        assert auth.token_cache.get("not.a.token") is None
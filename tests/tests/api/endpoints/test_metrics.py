@@ -0,0 +1,105 @@
+import sys
+import os
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+# Make the API package importable
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../api')))
+
+from app.utils import metrics
+
+
+class TestMetricsRegistry:
+    """Test suite for the metrics primitives and text exposition"""
+    
+    def setup_method(self):
+        """Set up test fixtures before each test method"""
+        self.registry = metrics.MetricsRegistry()
+    
+    def test_counter_renders_total_with_labels(self):
+        """Test that counters are rendered with a _total suffix"""
+        # Arrange
+        counter = self.registry.counter("jobs", "Jobs run", ("kind",))
+        
+        # Act
+        counter.inc(("export",))
+        counter.inc(("export",), 2)
+        output = self.registry.render()
+        
+        # Assert
+        assert "# TYPE jobs counter" in output
+        assert 'jobs_total{kind="export"} 3' in output
+    
+    def test_histogram_buckets_are_cumulative(self):
+        """Test that histogram buckets accumulate and end with +Inf"""
+        # Arrange
+        histogram = self.registry.histogram("latency", "Latency", buckets=(0.1, 1.0))
+        
+        # Act
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value)
+        snapshot = histogram.snapshot()
+        output = self.registry.render()
+        
+        # Assert
+        assert snapshot["buckets"] == [(0.1, 1), (1.0, 2), (float("inf"), 3)]
+        assert snapshot["count"] == 3
+        assert 'latency_bucket{le="+Inf"} 3' in output
+    
+    def test_gauge_reads_callback(self):
+        """Test that callback gauges are evaluated at render time"""
+        # Arrange
+        depth = {"value": 0}
+        self.registry.gauge("depth", "Queue depth", ("queue",),
+                            callback=lambda: {("export",): depth["value"]})
+        
+        # Act
+        depth["value"] = 7
+        output = self.registry.render()
+        
+        # Assert
+        assert 'depth{queue="export"} 7' in output
+
+
+class TestRequestMetricsMiddleware:
+    """Test suite for the request metrics middleware"""
+    
+    def setup_method(self):
+        """Set up test fixtures before each test method"""
+        router = APIRouter()
+        
+        @router.get("/items/{item_id}")
+        async def get_item(item_id: str):
+            return {"id": item_id}
+        
+        app = FastAPI()
+        app.include_router(router, prefix="/api/test")
+        app.add_middleware(metrics.RequestMetricsMiddleware, log_requests=False)
+        self.client = TestClient(app)
+    
+    def test_requests_are_labelled_by_route_template(self):
+        """Test that concrete paths collapse onto the prefixed route template"""
+        # Arrange
+        labels = ("GET", "/api/test/items/{item_id}", "200")
+        before = metrics.REQUESTS.values.get(labels, 0)
+        
+        # Act
+        self.client.get("/api/test/items/1")
+        self.client.get("/api/test/items/2")
+        
+        # Assert
+        assert metrics.REQUESTS.values[labels] == before + 2
+        assert metrics.REQUEST_LATENCY.snapshot(labels[:2])["count"] >= 2
+    
+    def test_unmatched_paths_share_one_label(self):
+        """Test that unknown paths don't create a label per URL"""
+        # Arrange
+        labels = ("GET", "unmatched", "404")
+        before = metrics.REQUESTS.values.get(labels, 0)
+        
+        # Act
+        self.client.get("/does/not/exist")
+        
+        # Assert
+        assert metrics.REQUESTS.values[labels] == before + 1
+        assert not any("/does/not/exist" in key[1] for key in metrics.REQUESTS.values)
@@ -0,0 +1,273 @@
+import pytest
+import sys
+import os
+import time
+import asyncio
+
+# Make the API package importable
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../api')))
+
+from app.api.endpoints import websocket
+from fastapi import WebSocketDisconnect
+
+from app.api.endpoints.auth import User, create_access_token
+from app.services.progress_tracking_service import ProgressHub
+
+
+class FakeWebSocket:
+    """WebSocket stand-in that records sent messages"""
+    
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.sent = []
+        self.closed_with = None
+    
+    async def send_text(self, text):
+        if self.fail:
+            raise RuntimeError("connection reset")
+        await asyncio.sleep(self.delay)
+        self.sent.append(text)
+    
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+class ScriptedWebSocket(FakeWebSocket):
+    """FakeWebSocket that receives queued messages, connecting with an optional token"""
+    
+    def __init__(self, token=None):
+        super().__init__()
+        self.query_params = {"token": token} if token else {}
+        self.headers = {}
+        self.incoming = asyncio.Queue()
+    
+    async def accept(self):
+        pass
+    
+    async def receive_text(self):
+        text = await self.incoming.get()
+        if text is None:
+            raise WebSocketDisconnect()
+        return text
+
+
+class TestWebSocketBroadcast:
+    """Test suite for queued WebSocket delivery"""
+    
+    def setup_method(self):
+        """Set up test fixtures before each test method"""
+        websocket.active_connections.clear()
+    
+    def connect(self, client_id, fake, **kwargs):
+        connection = websocket.ClientConnection(client_id, fake, **kwargs)
+        websocket.active_connections[client_id] = connection
+        return connection
+    
+    def test_slow_client_does_not_delay_broadcast(self):
+        """Test that broadcasting returns without waiting for slow clients"""
+        async def scenario():
+            slow = FakeWebSocket(delay=1.0)
+            self.connect("slow", slow)
+            fast = [FakeWebSocket() for _ in range(1000)]
+            for i, fake in enumerate(fast):
+                self.connect(f"client_{i}", fake)
+            
+            start = time.perf_counter()
+            await websocket.broadcast_message("announcement", {"message": "hello"})
+            elapsed = time.perf_counter() - start
+            
+            await asyncio.sleep(0.05)
+            for connection in list(websocket.active_connections.values()):
+                await connection.close()
+            return elapsed, fast
+        
+        # Act
+        elapsed, fast = asyncio.run(scenario())
+        
+        # Assert
+        assert elapsed < 0.1
+        assert all(len(fake.sent) == 1 for fake in fast)
+    
+    def test_drop_oldest_policy(self):
+        """Test that a full queue discards the oldest message"""
+        async def scenario():
+            connection = self.connect("client", FakeWebSocket(delay=1.0), max_queue_size=2)
+            await asyncio.sleep(0)
+            for i in range(5):
+                connection.enqueue(str(i))
+            queued = [text for text, _ in connection.queue._queue]
+            await connection.close()
+            return connection, queued
+        
+        # Act
+        connection, queued = asyncio.run(scenario())
+        
+        # Assert
+        assert queued == ["3", "4"]
+        assert connection.dropped == 3
+    
+    def test_disconnect_policy(self):
+        """Test that a full queue disconnects the client"""
+        async def scenario():
+            fake = FakeWebSocket(delay=1.0)
+            connection = self.connect("client", fake, max_queue_size=1, policy=websocket.DISCONNECT)
+            await asyncio.sleep(0)
+            connection.enqueue("a")
+            connection.enqueue("b")
+            await asyncio.sleep(0.01)
+            return fake
+        
+        # Act
+        fake = asyncio.run(scenario())
+        
+        # Assert
+        assert fake.closed_with == websocket.SLOW_CONSUMER_CLOSE_CODE
+        assert "client" not in websocket.active_connections
+    
+    def test_dropped_progress_replaced_by_snapshot(self, monkeypatch):
+        """Test that dropping a progress delta sends the task's full state instead"""
+        # Arrange
+        hub = ProgressHub()
+        monkeypatch.setattr(websocket, "progress_hub", hub)
+        hub.apply("task_1", {"status": "processing", "progress": 0.9, "message": "Indexing"})
+        
+        async def scenario():
+            fake = FakeWebSocket(delay=0.01)
+            connection = self.connect("client", fake, max_queue_size=2)
+            await asyncio.sleep(0)
+            connection.enqueue("notice")
+            websocket._send_local(["client"], websocket.PROGRESS_EVENT, {"task_id": "task_1", "message": "Indexing"})
+            websocket._send_local(["client"], websocket.PROGRESS_EVENT, {"task_id": "task_1", "progress": 0.9})
+            websocket._send_local(["client"], websocket.PROGRESS_EVENT, {"task_id": "task_1", "progress": 0.95})
+            connection.enqueue("later")
+            await asyncio.sleep(0.1)
+            await connection.close()
+            return fake, connection
+        
+        # Act
+        fake, connection = asyncio.run(scenario())
+        
+        # Assert
+        messages = [websocket.serialization.loads(text) if text.startswith("{") else text for text in fake.sent]
+        assert messages[0] == {"event": websocket.PROGRESS_EVENT, "data": {"task_id": "task_1", "status": "processing",
+                                                             "progress": 0.9, "message": "Indexing"}}
+        assert messages[1:] == ["later"]
+        assert connection.dropped == 3
+    
+    def test_disconnect_closes_once(self):
+        """Test that an overflowing client under DISCONNECT is closed by a single task"""
+        async def scenario():
+            fake = FakeWebSocket(delay=1.0)
+            connection = self.connect("client", fake, max_queue_size=1, policy=websocket.DISCONNECT)
+            await asyncio.sleep(0)
+            results = [connection.enqueue(str(i)) for i in range(4)]
+            closing = connection._closing
+            await closing
+            return results, closing, fake
+        
+        # Act
+        results, closing, fake = asyncio.run(scenario())
+        
+        # Assert
+        assert results == [True, False, False, False]
+        assert closing.done()
+        assert fake.closed_with == websocket.SLOW_CONSUMER_CLOSE_CODE
+    
+    def test_failed_client_is_removed(self):
+        """Test that a client whose socket errors is dropped"""
+        async def scenario():
+            self.connect("client", FakeWebSocket(fail=True))
+            await websocket.send_progress_update("client", "ping", {})
+            await asyncio.sleep(0.01)
+        
+        # Act
+        asyncio.run(scenario())
+        
+        # Assert
+        assert "client" not in websocket.active_connections
+
+
+class TestProgressSubscriptions:
+    """Test suite for authorizing WebSocket progress subscriptions"""
+    
+    @pytest.fixture(autouse=True)
+    def setup_hub(self, monkeypatch):
+        """Use a fresh hub with one admin user"""
+        self.hub = ProgressHub()
+        monkeypatch.setattr(websocket, "progress_hub", self.hub)
+        monkeypatch.setattr(websocket.config, "ADMIN_USERS", {"root"})
+        self.hub.register("task_1", "alice")
+        self.hub.publish("task_1", {"status": "processing", "progress": 0.5})
+    
+    def test_owner_can_subscribe(self):
+        """Test that a user can subscribe to their own task"""
+        # Act
+        snapshot = websocket.subscribe_to_progress("client", User(username="alice"), "task_1")
+        
+        # Assert
+        assert snapshot["progress"] == 0.5
+    
+    @pytest.mark.parametrize("user, task_id", [
+        (None, "task_1"),
+        ("alice", None),
+        ("alice", "*"),
+        ("bob", "task_1"),
+    ])
+    def test_subscription_refused(self, user, task_id):
+        """Test that anonymous, implicit, wildcard and foreign subscriptions are refused"""
+        # Arrange
+        user = User(username=user) if user else None
+        
+        # Act / Assert
+        with pytest.raises(PermissionError):
+            websocket.subscribe_to_progress("client", user, task_id)
+        assert self.hub.subscribers("task_1") == set()
+    
+    def test_admin_can_subscribe_to_all_tasks(self):
+        """Test that admins may watch every task"""
+        # Act
+        websocket.subscribe_to_progress("client", User(username="root"), "*")
+        
+        # Assert
+        assert self.hub.subscribers("task_1") == {"client"}
+    
+    @pytest.mark.parametrize("takeover_user", [None, "bob", "alice"])
+    def test_takeover_keeps_subscriptions_only_for_same_user(self, monkeypatch, takeover_user):
+        """Test that a socket taking over a client ID only inherits subscriptions of the same user"""
+        # Arrange
+        for username in ("alice", "bob"):
+            monkeypatch.setitem(websocket.fake_users_db, username, User(username=username))
+        self.hub.min_interval = 0
+        self.hub.set_sender(websocket.send_to_clients)
+        token = lambda username: create_access_token({"sub": username}) if username else None
+        
+        async def scenario():
+            first = ScriptedWebSocket(token("alice"))
+            first_task = asyncio.create_task(websocket.websocket_endpoint(first, "shared"))
+            first.incoming.put_nowait('{"event": "subscribe", "data": {"task_id": "task_1"}}')
+            await asyncio.sleep(0.05)
+            
+            second = ScriptedWebSocket(token(takeover_user))
+            second_task = asyncio.create_task(websocket.websocket_endpoint(second, "shared"))
+            await asyncio.sleep(0.05)
+            subscribers = self.hub.subscribers("task_1")
+            self.hub.publish("task_1", {"status": "processing", "progress": 0.9, "secret": "alice-data"})
+            await asyncio.sleep(0.05)
+            
+            first.incoming.put_nowait(None)
+            second.incoming.put_nowait(None)
+            await asyncio.gather(first_task, second_task)
+            return subscribers, second.sent
+        
+        # Act
+        subscribers, received = asyncio.run(scenario())
+        
+        # Assert
+        leaked = [text for text in received if "alice-data" in text]
+        if takeover_user == "alice":
+            assert subscribers == {"shared"}
+            assert len(leaked) == 1
+        else:
+            assert subscribers == set()
+            assert leaked == []
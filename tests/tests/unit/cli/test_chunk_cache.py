@@ -0,0 +1,135 @@
+import pytest
+import sys
+import os
+import json
+from unittest.mock import patch
+
+# Make the CLI package importable
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../src')))
+
+from cli.chunk_cache import ChunkCache, content_hash, entry_key
+from cli.chunker_engine import ChunkerEngine, STRATEGIES
+
+
+def make_conversations(count):
+    """Build conversations with mixed roles and some oversized ones"""
+    return [
+        {"id": f"conv_{i}", "title": f"Topic {i % 3}",
+         "messages": [
+             {"role": "user" if j % 3 else "assistant", "content": f"message {i}.{j} " * (20 + 150 * (i % 3))}
+             for j in range(6)
+         ]}
+        for i in range(count)
+    ]
+
+
+class TestChunkCache:
+    """Test suite for the per-conversation chunk cache"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.conversations = make_conversations(20)
+        self.max_tokens = 600
+    
+    def test_round_trip(self, tmp_path):
+        """Test that stored entries are returned and missing ones left out"""
+        # Arrange
+        cache = ChunkCache(str(tmp_path / "cache.db"))
+        
+        # Act
+        cache.put_many({b"a" * 16: {"tokens": 5}, b"b" * 16: {"groups": [[0, 2, 7]]}})
+        found = cache.get_many([b"a" * 16, b"b" * 16, b"c" * 16])
+        
+        # Assert
+        assert found == {b"a" * 16: {"tokens": 5}, b"b" * 16: {"groups": [[0, 2, 7]]}}
+        assert (cache.hits, cache.misses) == (2, 1)
+        cache.close()
+    
+    def test_key_covers_content_strategy_and_limit(self):
+        """Test that changing the conversation, strategy or limit changes the key"""
+        # Arrange
+        conversation = self.conversations[0]
+        changed = dict(conversation, title="Another title")
+        
+        # Act
+        key = entry_key(content_hash(conversation), "size", 1500)
+        
+        # Assert
+        assert key == entry_key(content_hash(dict(conversation)), "size", 1500)
+        assert key != entry_key(content_hash(changed), "size", 1500)
+        assert key != entry_key(content_hash(conversation), "role", 1500)
+        assert key != entry_key(content_hash(conversation), "size", 1000)
+    
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Test that eviction keeps the cache under its limit and drops the oldest entries"""
+        # Arrange
+        cache = ChunkCache(str(tmp_path / "cache.db"), max_bytes=2000)
+        value = {"tokens": "x" * 80}
+        cache.put_many({bytes([i]) * 16: value for i in range(10)})
+        cache.get_many([bytes([0]) * 16])
+        
+        # Act
+        cache.put_many({bytes([i]) * 16: value for i in range(10, 25)})
+        
+        # Assert
+        assert cache.size() <= 2000
+        assert cache.get_many([bytes([0]) * 16]) != {}
+        assert cache.get_many([bytes([1]) * 16]) == {}
+        assert cache.get_many([bytes([24]) * 16]) != {}
+        cache.close()
+    
+    @pytest.mark.parametrize("strategy", STRATEGIES)
+    def test_cached_chunks_match_uncached(self, tmp_path, strategy):
+        """Test that chunks built from cached results equal freshly computed ones"""
+        # Arrange
+        uncached = ChunkerEngine(str(tmp_path / "uncached"))
+        cached = ChunkerEngine(str(tmp_path / "cached"), ChunkCache(str(tmp_path / "cache.db")))
+        chunk = lambda engine: getattr(engine, f"chunk_by_{strategy}")(self.conversations, self.max_tokens)
+        
+        # Act
+        expected = chunk(uncached)
+        cold = chunk(cached)
+        warm = chunk(cached)
+        
+        # Assert
+        assert cold == expected
+        assert warm == expected
+        assert cached.cache.hits == len(self.conversations)
+        cached.cache.close()
+    
+    def test_only_changed_conversations_are_recounted(self, tmp_path):
+        """Test that re-processing an updated export only counts the changed conversation"""
+        # Arrange
+        source = str(tmp_path / "conversations.json")
+        chunker = ChunkerEngine(str(tmp_path / "processed"), ChunkCache(str(tmp_path / "cache.db")))
+        with open(source, 'w') as f:
+            json.dump(self.conversations, f)
+        chunker.process_file(source, "size", self.max_tokens)
+        
+        updated = [dict(conv) for conv in self.conversations]
+        updated[5]["messages"] = updated[5]["messages"] + [{"role": "user", "content": "one more"}]
+        with open(source, 'w') as f:
+            json.dump(updated, f)
+        counted = []
+        count_tokens = chunker.count_tokens
+        
+        def counting(text):
+            counted.append(text)
+            return count_tokens(text)
+        
+        # Act
+        with patch.object(chunker, "count_tokens", side_effect=counting):
+            chunker.process_file(source, "size", self.max_tokens)
+        
+        # Assert
+        assert counted
+        contents = [msg["content"] for msg in updated[5]["messages"]]
+        for text in counted:
+            # The conversation, one of its messages, or a piece of it carrying some of its messages
+            value = json.loads(text)
+            if "messages" in value:
+                assert value["id"] == updated[5]["id"]
+                assert all(any(msg["content"] in content for content in contents) for msg in value["messages"])
+            else:
+                assert any(value["content"] in content for content in contents)
+        chunker.cache.close()
@@ -0,0 +1,106 @@
+import pytest
+import sys
+import os
+
+# Make the CLI package importable
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../src')))
+
+from cli.chunk_store import ChunkStore, ChunkStoreError, is_chunk_store, load_summary, write_chunk_store
+from cli import serialization
+
+
+def make_chunks(count):
+    """Build chunks in the layout produced by the chunker engine"""
+    return [
+        {
+            "conversations": [
+                {"id": f"conv_{i}_{j}", "messages": [{"role": "user", "content": f"chunk {i} message {j} é"}]}
+                for j in range(i + 1)
+            ],
+            "token_count": 100 + i,
+            "chunk_strategy": "size"
+        }
+        for i in range(count)
+    ]
+
+
+class TestChunkStore:
+    """Test suite for the binary chunk store"""
+    
+    def setup_method(self):
+        """Set up test fixtures before each test method"""
+        self.metadata = {"chunking_strategy": "size", "total_chunks": 5, "total_conversations": 15}
+        self.chunks = make_chunks(5)
+    
+    def test_round_trip_with_random_access(self, tmp_path):
+        """Test that any chunk can be fetched on its own"""
+        # Arrange
+        path = str(tmp_path / "memory.chunks")
+        write_chunk_store(path, self.chunks, self.metadata)
+        
+        # Act
+        with ChunkStore(path) as store:
+            third = store.get_chunk(3)
+            last = store[-1]
+            everything = store.to_dict()
+        
+        # Assert
+        assert third == self.chunks[3]
+        assert last == self.chunks[4]
+        assert everything == dict(self.metadata, chunks=self.chunks)
+    
+    def test_stats_come_from_the_index(self, tmp_path):
+        """Test that chunk stats are read without parsing chunk records"""
+        # Arrange
+        path = str(tmp_path / "memory.chunks")
+        write_chunk_store(path, self.chunks, self.metadata)
+        
+        # Act
+        with ChunkStore(path) as store:
+            store.get_chunk = None  # Any record access would now fail
+            stats = store.chunk_stats(2)
+            count = len(store)
+            metadata = store.metadata
+        
+        # Assert
+        assert stats == {"token_count": 102, "conversation_count": 3}
+        assert count == 5
+        assert metadata == self.metadata
+    
+    def test_out_of_range_index(self, tmp_path):
+        """Test that a missing chunk raises IndexError"""
+        # Arrange
+        path = str(tmp_path / "memory.chunks")
+        write_chunk_store(path, self.chunks, self.metadata)
+        
+        # Act / Assert
+        with ChunkStore(path) as store:
+            with pytest.raises(IndexError):
+                store.get_chunk(5)
+    
+    def test_json_file_is_rejected(self, tmp_path):
+        """Test that JSON memory files are not mistaken for chunk stores"""
+        # Arrange
+        path = str(tmp_path / "memory.json")
+        serialization.dump_file(dict(self.metadata, chunks=self.chunks), path)
+        
+        # Act / Assert
+        assert not is_chunk_store(path)
+        with pytest.raises(ChunkStoreError):
+            ChunkStore(path)
+    
+    def test_summary_is_the_same_for_both_formats(self, tmp_path):
+        """Test that load_summary reports the same stats for stores and JSON files"""
+        # Arrange
+        store_path = str(tmp_path / "memory.chunks")
+        json_path = str(tmp_path / "memory.json")
+        write_chunk_store(store_path, self.chunks, self.metadata)
+        serialization.dump_file(dict(self.metadata, chunks=self.chunks), json_path)
+        
+        # Act
+        store_summary = load_summary(store_path)
+        json_summary = load_summary(json_path)
+        
+        # Assert
+        assert store_summary == json_summary
+        assert [s["conversation_count"] for s in store_summary["chunk_stats"]] == [1, 2, 3, 4, 5]
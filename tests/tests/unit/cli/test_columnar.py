@@ -0,0 +1,110 @@
+import sys
+import os
+import json
+import tracemalloc
+
+# Make the CLI package importable
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../src')))
+
+from cli.columnar import ColumnarConversations, ConversationSlice
+
+
+def count_tokens(text):
+    """Token counter matching the chunker's approximation"""
+    return len(text) // 4
+
+
+class TestColumnarConversations:
+    """Test suite for the columnar conversation representation"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.conversations = [
+            {"id": "regular", "title": "Plain chat",
+             "messages": [{"role": "user", "content": "Hello ☃ 😀"},
+                          {"content": "Reversed keys", "role": "assistant"}],
+             "create_time": "2025-04-20T10:30:00"},
+            {"messages": [{"role": "user", "content": "extra field", "ts": 1},
+                          {"content": "no role"},
+                          {"role": None, "content": "null role"},
+                          {"role": "user", "content": "lone \ud800 surrogate"},
+                          "not a dict"],
+             "id": "irregular"},
+            {"id": "no-messages", "title": "Empty"},
+            {"id": "odd-messages", "messages": {"unexpected": True}}
+        ]
+    
+    def test_round_trip(self):
+        """Test that conversations rebuild exactly, key order included"""
+        # Arrange
+        originals = json.loads(json.dumps(self.conversations))
+        
+        # Act
+        columns = ColumnarConversations.from_conversations(self.conversations, count_tokens)
+        rebuilt = [columns.conversation(i) for i in range(len(columns))]
+        
+        # Assert
+        assert len(columns) == len(originals)
+        assert rebuilt == originals
+        assert [json.dumps(conv) for conv in rebuilt] == [json.dumps(conv) for conv in originals]
+    
+    def test_materialize_split_piece(self):
+        """Test that a split piece is a copy with a message range and a marker"""
+        # Arrange
+        columns = ColumnarConversations.from_conversations(self.conversations, count_tokens)
+        expected = dict(self.conversations[1], messages=self.conversations[1]["messages"][1:3], _chunked=True)
+        
+        # Act
+        piece = columns.materialize(ConversationSlice(1, 1, 3, "_chunked"))
+        
+        # Assert
+        assert piece == expected
+        assert list(piece) == list(expected)
+    
+    def test_token_counts_match_dicts(self):
+        """Test that token counts equal counting the original dicts"""
+        # Arrange
+        columns = ColumnarConversations.from_conversations(self.conversations, count_tokens)
+        
+        # Act / Assert
+        for index, conv in enumerate(self.conversations):
+            assert columns.conversation_tokens(index) == count_tokens(json.dumps(conv))
+        assert list(columns.message_tokens(0)) == [
+            count_tokens(json.dumps(msg)) for msg in self.conversations[0]["messages"]
+        ]
+        assert columns.roles(0)[0] != columns.roles(0)[1]
+    
+    def test_release_frees_parsed_conversations(self):
+        """Test that release drops each converted conversation from the list"""
+        # Arrange
+        conversations = json.loads(json.dumps(self.conversations))
+        
+        # Act
+        columns = ColumnarConversations.from_conversations(conversations, count_tokens, release=True)
+        
+        # Assert
+        assert conversations == [None] * len(self.conversations)
+        assert columns.conversation(0)["messages"][0]["content"] == "Hello ☃ 😀"
+    
+    def test_uses_less_memory_than_dicts(self):
+        """Test that a chat-like export takes much less memory as columns"""
+        # Arrange
+        export = json.dumps([
+            {"id": f"conv_{i}", "title": f"Conversation {i}",
+             "messages": [{"role": "user" if j % 2 == 0 else "assistant", "content": f"short reply {i}.{j}"}
+                          for j in range(30)]}
+            for i in range(300)
+        ])
+        
+        # Act
+        tracemalloc.start()
+        conversations = json.loads(export)
+        as_dicts = tracemalloc.get_traced_memory()[0]
+        columns = ColumnarConversations.from_conversations(conversations, count_tokens, release=True)
+        del conversations
+        as_columns = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        
+        # Assert
+        assert len(columns) == 300
+        assert as_columns * 3 < as_dicts
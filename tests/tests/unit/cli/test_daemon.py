@@ -0,0 +1,198 @@
+import pytest
+import sys
+import os
+import json
+import threading
+
+# Make the CLI package importable
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../src')))
+
+from cli import daemon, daemon_client, recall_tester, total_recall
+from cli.chunker_engine import ChunkerEngine
+
+
+def write_conversations(path, count):
+    """Write a conversation file for the chunker"""
+    conversations = [
+        {"id": f"conv_{i}", "title": f"Conversation {i}",
+         "messages": [{"role": "user", "content": f"apples and pears {i} " * 50}]}
+        for i in range(count)
+    ]
+    with open(path, 'w') as f:
+        json.dump(conversations, f)
+
+
+class TestDaemon:
+    """Test suite for the daemon and its client"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.server = None
+    
+    def teardown_method(self):
+        """Stop the daemon if a test started one"""
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+    
+    def start(self, tmp_path):
+        """Start a daemon on a socket in tmp_path, serving from a background thread"""
+        socket_path = str(tmp_path / "daemon.sock")
+        self.server = daemon.start_server(socket_path)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return socket_path
+    
+    def test_no_daemon(self, tmp_path):
+        """Test that the client reports no daemon when nothing is listening"""
+        # Arrange
+        stale = tmp_path / "stale.sock"
+        stale.write_text("")
+        
+        # Act / Assert
+        assert daemon_client.run_in_daemon(["list-memories"], str(tmp_path / "missing.sock")) is None
+        assert daemon_client.run_in_daemon(["list-memories"], str(stale)) is None
+    
+    def test_command_output_and_exit_code(self, tmp_path):
+        """Test that a served command returns its output and exit code"""
+        # Arrange
+        socket_path = self.start(tmp_path)
+        
+        # Act
+        listed = daemon_client.run_in_daemon(["--memory-dir", str(tmp_path), "list-memories"], socket_path)
+        invalid = daemon_client.run_in_daemon(["process"], socket_path)
+        
+        # Assert
+        assert listed == {"code": 0, "stdout": "No memory files found.\n", "stderr": ""}
+        assert invalid["code"] == 2
+        assert "--file" in invalid["stderr"]
+    
+    def test_relative_paths_use_client_directory(self, tmp_path, monkeypatch):
+        """Test that relative paths are resolved against the client's working directory"""
+        # Arrange
+        socket_path = self.start(tmp_path)
+        work_dir = tmp_path / "work"
+        work_dir.mkdir()
+        write_conversations(work_dir / "conversations.json", 4)
+        monkeypatch.chdir(work_dir)
+        
+        # Act
+        response = daemon_client.run_in_daemon(
+            ["--output-dir", "processed", "--no-cache", "process", "--file", "conversations.json"], socket_path)
+        
+        # Assert
+        assert response["code"] == 0
+        assert os.listdir(work_dir / "processed")
+        assert os.getcwd() == str(work_dir)
+    
+    def test_dispatcher_uses_daemon(self, tmp_path, monkeypatch, capsys):
+        """Test that total-recall sends commands to a running daemon"""
+        # Arrange
+        socket_path = self.start(tmp_path)
+        monkeypatch.setenv(daemon_client.SOCKET_ENV, socket_path)
+        ran = []
+        monkeypatch.setattr(self.server, "execute",
+                            lambda argv, cwd: ran.append(argv) or {"code": 3, "stdout": "served\n", "stderr": ""})
+        
+        # Act
+        code = total_recall.main(["token-status"])
+        
+        # Assert
+        assert code == 3
+        assert ran == [["token-status"]]
+        assert capsys.readouterr().out == "served\n"
+    
+    def test_dispatcher_falls_back_in_process(self, tmp_path, monkeypatch, capsys):
+        """Test that total-recall runs commands itself when no daemon is running"""
+        # Arrange
+        monkeypatch.setenv(daemon_client.SOCKET_ENV, str(tmp_path / "missing.sock"))
+        
+        # Act
+        code = total_recall.main(["--memory-dir", str(tmp_path), "list-memories"])
+        
+        # Assert
+        assert code == 0
+        assert capsys.readouterr().out == "No memory files found.\n"
+    
+    def test_stop(self, tmp_path):
+        """Test that daemon-stop shuts the daemon down and removes its socket"""
+        # Arrange
+        socket_path = self.start(tmp_path)
+        server, self.server = self.server, None
+        
+        # Act
+        code = daemon.main(["--socket", socket_path, "daemon-stop"])
+        server.server_close()
+        
+        # Assert
+        assert code == 0
+        assert not os.path.exists(socket_path)
+        assert daemon_client.run_in_daemon(["list-memories"], socket_path) is None
+    
+    def test_second_daemon_refused(self, tmp_path):
+        """Test that a daemon won't start on a socket another daemon is serving"""
+        # Arrange
+        socket_path = self.start(tmp_path)
+        
+        # Act / Assert
+        with pytest.raises(RuntimeError, match="already running"):
+            daemon.start_server(socket_path)
+
+
+class TestRecallIndexCache:
+    """Test suite for reusing loaded memory files between questions"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        recall_tester._indexes.clear()
+    
+    def test_index_reused_until_file_changes(self, tmp_path):
+        """Test that a memory file is loaded once and reloaded after it is rewritten"""
+        # Arrange
+        source = str(tmp_path / "conversations.json")
+        write_conversations(source, 6)
+        output_dir = str(tmp_path / "processed")
+        output_file = ChunkerEngine(output_dir).process_file(source, "size", 10000)
+        tester = recall_tester.RecallTester(output_dir)
+        loads = []
+        load_memory_file = tester.load_memory_file
+        tester.load_memory_file = lambda name: loads.append(name) or load_memory_file(name)
+        
+        # Act
+        first = tester.ask_question("apples", os.path.basename(output_file))
+        second = tester.ask_question("pears", os.path.basename(output_file))
+        write_conversations(source, 3)
+        ChunkerEngine(output_dir).process_file(source, "size", 10000)
+        third = tester.ask_question("apples", os.path.basename(output_file))
+        
+        # Assert
+        assert len(loads) == 2
+        assert len(first[0]["conversations"]) == len(second[0]["conversations"]) == 6
+        assert len(third[0]["conversations"]) == 3
+    
+    def test_evicted_and_replaced_stores_are_closed(self, tmp_path, monkeypatch):
+        """Test that chunk stores dropped from the cache are closed"""
+        # Arrange
+        monkeypatch.setattr(recall_tester, "MAX_CACHED_INDEXES", 1)
+        output_dir = str(tmp_path / "processed")
+        names = []
+        for name in ("first", "second"):
+            source = str(tmp_path / f"{name}.json")
+            write_conversations(source, 3)
+            names.append(os.path.basename(ChunkerEngine(output_dir).process_file(source, "size", 10000,
+                                                                                 output_format="store")))
+        tester = recall_tester.RecallTester(output_dir)
+        
+        # Act
+        tester.ask_question("apples", names[0])
+        first_store = tester.load_index(names[0])[0]["chunks"]
+        write_conversations(str(tmp_path / "first.json"), 2)
+        ChunkerEngine(output_dir).process_file(str(tmp_path / "first.json"), "size", 10000, output_format="store")
+        tester.ask_question("apples", names[0])
+        replacing_store = tester.load_index(names[0])[0]["chunks"]
+        tester.ask_question("apples", names[1])
+        
+        # Assert
+        assert isinstance(first_store, recall_tester.ChunkStore)
+        assert first_store._file.closed
+        assert replacing_store._file.closed
+        assert list(recall_tester._indexes) == [os.path.join(output_dir, names[1])]
@@ -0,0 +1,86 @@
+import pytest
+import sys
+import os
+import json
+from unittest.mock import patch
+
+# Make the CLI package importable
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../src')))
+
+from cli import memory_summary
+from cli.chunker_engine import ChunkerEngine
+
+
+def write_conversations(path, count):
+    """Write a conversation file for the chunker"""
+    conversations = [
+        {"id": f"conv_{i}", "title": f"Conversation {i}",
+         "messages": [{"role": "user", "content": f"message {i} " * 200}]}
+        for i in range(count)
+    ]
+    with open(path, 'w') as f:
+        json.dump(conversations, f)
+
+
+class TestMemorySummary:
+    """Test suite for memory file summary sidecars"""
+    
+    @pytest.mark.parametrize("output_format", ["store", "json"])
+    def test_processing_writes_sidecar(self, tmp_path, output_format):
+        """Test that processing writes a sidecar matching the output"""
+        # Arrange
+        source = str(tmp_path / "conversations.json")
+        write_conversations(source, 12)
+        chunker = ChunkerEngine(str(tmp_path / "processed"))
+        
+        # Act
+        output_file = chunker.process_file(source, "size", 1500, output_format=output_format)
+        summary = memory_summary.read_summary(output_file)
+        
+        # Assert
+        assert os.path.exists(memory_summary.summary_path(output_file))
+        assert summary["total_conversations"] == 12
+        assert summary["total_chunks"] == len(summary["chunk_stats"])
+        assert summary["total_tokens"] == sum(tokens for tokens, _ in summary["chunk_stats"])
+        assert sum(summary["token_histogram"]["counts"]) == summary["total_chunks"]
+        assert summary["source_hash"] == memory_summary.hash_bytes(open(source, 'rb').read())
+    
+    def test_fresh_sidecar_is_read_without_opening_memory_file(self, tmp_path):
+        """Test that a matching sidecar answers on its own"""
+        # Arrange
+        source = str(tmp_path / "conversations.json")
+        write_conversations(source, 5)
+        output_file = ChunkerEngine(str(tmp_path / "processed")).process_file(source)
+        
+        # Act
+        with patch.object(memory_summary, "load_summary", side_effect=AssertionError("memory file parsed")):
+            summary = memory_summary.read_summary(output_file)
+        
+        # Assert
+        assert summary["total_conversations"] == 5
+    
+    def test_stale_or_missing_sidecar_is_rebuilt(self, tmp_path):
+        """Test that a changed memory file gets a new sidecar"""
+        # Arrange
+        source = str(tmp_path / "conversations.json")
+        write_conversations(source, 5)
+        chunker = ChunkerEngine(str(tmp_path / "processed"))
+        output_file = chunker.process_file(source, output_format="json")
+        os.remove(memory_summary.summary_path(output_file))
+        
+        # Act
+        rebuilt = memory_summary.read_summary(output_file)
+        
+        # Assert
+        assert rebuilt["total_conversations"] == 5
+        assert rebuilt["source_hash"] is None
+        assert os.path.exists(memory_summary.summary_path(output_file))
+    
+    def test_token_histogram_buckets(self):
+        """Test bucket boundaries, including chunks above the limit"""
+        # Act
+        histogram = memory_summary.token_histogram([0, 149, 150, 1500, 1501], 1500)
+        
+        # Assert
+        assert histogram["bucket_width"] == 150
+        assert histogram["counts"] == [2, 1, 0, 0, 0, 0, 0, 0, 0, 1, 1]
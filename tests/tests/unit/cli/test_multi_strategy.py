@@ -0,0 +1,97 @@
+import pytest
+import sys
+import os
+import json
+from unittest.mock import patch
+
+# Make the CLI package importable
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../src')))
+
+from cli import serialization
+from cli.chunker_engine import ChunkerEngine, STRATEGIES, parse_strategies
+
+
+def write_conversations(path, count):
+    """Write a conversation file with long, mixed-role conversations"""
+    conversations = [
+        {"id": f"conv_{i}", "title": f"Topic {i % 3} discussion",
+         "messages": [
+             {"role": "user" if j % 3 else "assistant", "content": f"message {i}.{j} " * (40 + 60 * (i % 4))}
+             for j in range(8)
+         ]}
+        for i in range(count)
+    ]
+    with open(path, 'w') as f:
+        json.dump(conversations, f)
+
+
+class TestMultiStrategy:
+    """Test suite for building several chunkings in one pass"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.max_tokens = 800
+    
+    def test_parse_strategies(self):
+        """Test parsing of comma-separated strategy lists"""
+        # Act / Assert
+        assert parse_strategies("size") == ["size"]
+        assert parse_strategies("size, topic,role,size") == ["size", "topic", "role"]
+        with pytest.raises(Exception):
+            parse_strategies("size,bogus")
+    
+    def test_one_pass_matches_separate_runs(self, tmp_path):
+        """Test that a combined run writes the same chunks as one run per strategy"""
+        # Arrange
+        source = str(tmp_path / "conversations.json")
+        write_conversations(source, 15)
+        separate = ChunkerEngine(str(tmp_path / "separate"))
+        combined = ChunkerEngine(str(tmp_path / "combined"))
+        
+        # Act
+        expected = [separate.process_file(source, strategy, self.max_tokens, output_format="json")
+                    for strategy in STRATEGIES]
+        actual = combined.process_file_strategies(source, STRATEGIES, self.max_tokens, output_format="json")
+        
+        # Assert
+        assert [os.path.basename(path) for path in actual] == [os.path.basename(path) for path in expected]
+        for expected_file, actual_file in zip(expected, actual):
+            assert serialization.load_file(actual_file) == serialization.load_file(expected_file)
+    
+    def test_conversations_are_tokenized_once(self, tmp_path):
+        """Test that each conversation is counted once across all strategies"""
+        # Arrange
+        source = str(tmp_path / "conversations.json")
+        write_conversations(source, 10)
+        chunker = ChunkerEngine(str(tmp_path / "processed"))
+        conversations = serialization.load_file(source)
+        serialized = {json.dumps(conv) for conv in conversations}
+        counted = []
+        count_tokens = chunker.count_tokens
+        
+        def counting(text):
+            counted.append(text)
+            return count_tokens(text)
+        
+        # Act
+        with patch.object(chunker, "count_tokens", side_effect=counting):
+            chunker.process_file_strategies(source, STRATEGIES, self.max_tokens)
+        
+        # Assert
+        conversation_counts = [text for text in counted if text in serialized]
+        assert len(conversation_counts) == len(conversations)
+    
+    def test_unknown_strategy_writes_nothing(self, tmp_path):
+        """Test that an unknown strategy fails before any output is written"""
+        # Arrange
+        source = str(tmp_path / "conversations.json")
+        write_conversations(source, 3)
+        output_dir = tmp_path / "processed"
+        chunker = ChunkerEngine(str(output_dir))
+        
+        # Act
+        output_files = chunker.process_file_strategies(source, ["size", "bogus"])
+        
+        # Assert
+        assert output_files is None
+        assert os.listdir(output_dir) == []
@@ -0,0 +1,175 @@
+import pytest
+import sys
+import os
+import json
+import time
+import signal
+import functools
+
+# Make the CLI package importable
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../src')))
+
+from cli import serialization
+from cli.chunk_store import ChunkStore
+from cli import chunker_engine
+from cli.chunker_engine import ChunkerEngine, expand_inputs
+
+
+def write_conversations(path, count):
+    """Write a conversation file for the chunker"""
+    conversations = [
+        {"id": f"conv_{i}", "title": f"Conversation {i}",
+         "messages": [{"role": "user", "content": f"message {i} " * 200}]}
+        for i in range(count)
+    ]
+    with open(path, 'w') as f:
+        json.dump(conversations, f)
+
+
+def dying_worker(marker_file, *args):
+    """Kill the worker process on c.json; only the first time if marker_file is given"""
+    file_path = args[3]
+    if file_path.endswith("c.json") and not (marker_file and os.path.exists(marker_file)):
+        if marker_file:
+            open(marker_file, 'w').close()
+        os._exit(1)
+    return _process_file_worker(*args)
+
+
+_process_file_worker = chunker_engine._process_file_worker
+
+
+class TestProcessDir:
+    """Test suite for parallel directory processing"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.counts = {"a.json": 3, "b.json": 5, "c.json": 8}
+    
+    def make_inputs(self, tmp_path):
+        """Create an input directory with valid conversation files"""
+        input_dir = tmp_path / "input"
+        input_dir.mkdir()
+        for name, count in self.counts.items():
+            write_conversations(str(input_dir / name), count)
+        return input_dir
+    
+    def test_expand_inputs_directory_and_glob(self, tmp_path):
+        """Test that a directory and a glob expand to the same files"""
+        # Arrange
+        input_dir = self.make_inputs(tmp_path)
+        (input_dir / "notes.txt").write_text("not a conversation file")
+        
+        # Act
+        from_dir = expand_inputs(str(input_dir))
+        from_glob = expand_inputs(str(input_dir / "*.json"))
+        
+        # Assert
+        assert from_dir == from_glob
+        assert [os.path.basename(path) for path in from_dir] == sorted(self.counts)
+    
+    @pytest.mark.parametrize("output_format", ["store", "json"])
+    def test_process_files_in_parallel(self, tmp_path, output_format):
+        """Test that every file is chunked by the pool"""
+        # Arrange
+        input_dir = self.make_inputs(tmp_path)
+        output_dir = tmp_path / "processed"
+        chunker = ChunkerEngine(str(output_dir))
+        
+        # Act
+        results = chunker.process_files(expand_inputs(str(input_dir)), output_format=output_format,
+                                         workers=2, progress=False)
+        
+        # Assert
+        assert all(error is None for _, _, error in results)
+        for file_path, output_files, _ in results:
+            output_file, = output_files
+            expected = self.counts[os.path.basename(file_path)]
+            if output_format == "store":
+                with ChunkStore(output_file) as store:
+                    assert store.metadata["total_conversations"] == expected
+            else:
+                assert serialization.load_file(output_file)["total_conversations"] == expected
+        assert not [name for name in os.listdir(output_dir) if name.endswith(".tmp")]
+    
+    def test_failing_file_is_skipped(self, tmp_path):
+        """Test that a broken file fails alone while the others are processed"""
+        # Arrange
+        input_dir = self.make_inputs(tmp_path)
+        (input_dir / "broken.json").write_text("{not json")
+        output_dir = tmp_path / "processed"
+        chunker = ChunkerEngine(str(output_dir))
+        
+        # Act
+        results = chunker.process_files(expand_inputs(str(input_dir)), workers=2, progress=False)
+        
+        # Assert
+        by_name = {os.path.basename(file_path): (output_files, error) for file_path, output_files, error in results}
+        assert by_name["broken.json"][0] is None
+        assert "Error loading conversations" in by_name["broken.json"][1]
+        for name in self.counts:
+            assert by_name[name][1] is None
+            assert all(os.path.exists(output_file) for output_file in by_name[name][0])
+        assert not [name for name in os.listdir(output_dir) if name.endswith(".tmp")]
+    
+    def test_files_finish_after_a_worker_dies(self, tmp_path, monkeypatch):
+        """Test that a dead worker doesn't fail the files that were queued with it"""
+        # Arrange
+        input_dir = self.make_inputs(tmp_path)
+        output_dir = tmp_path / "processed"
+        marker_file = str(tmp_path / "killed")
+        monkeypatch.setattr(chunker_engine, "_process_file_worker", functools.partial(dying_worker, marker_file))
+        chunker = ChunkerEngine(str(output_dir))
+        
+        # Act
+        results = chunker.process_files(expand_inputs(str(input_dir)), output_format="store",
+                                         workers=2, progress=False)
+        
+        # Assert
+        assert os.path.exists(marker_file)
+        assert [error for _, _, error in results] == [None, None, None]
+        for file_path, output_files, _ in results:
+            with ChunkStore(output_files[0]) as store:
+                assert store.metadata["total_conversations"] == self.counts[os.path.basename(file_path)]
+    
+    def test_file_that_always_kills_its_worker_fails(self, tmp_path, monkeypatch):
+        """Test that a file that takes down every pool is reported instead of retried forever"""
+        # Arrange
+        input_dir = self.make_inputs(tmp_path)
+        monkeypatch.setattr(chunker_engine, "_process_file_worker",
+                            functools.partial(dying_worker, None))
+        chunker = ChunkerEngine(str(tmp_path / "processed"))
+        
+        # Act
+        results = chunker.process_files(expand_inputs(str(input_dir)), workers=2, progress=False)
+        
+        # Assert
+        by_name = {os.path.basename(file_path): (output_files, error) for file_path, output_files, error in results}
+        assert by_name["c.json"][0] is None
+        assert "terminated abruptly" in by_name["c.json"][1]
+    
+    def test_kept_pool_replaced_after_worker_dies(self, tmp_path):
+        """Test that the daemon's pool is replaced once a worker has died"""
+        # Arrange
+        input_dir = self.make_inputs(tmp_path)
+        chunker = ChunkerEngine(str(tmp_path / "processed"))
+        chunker_engine.keep_worker_pool(2)
+        try:
+            chunker.process_files(expand_inputs(str(input_dir)), progress=False)
+            broken_pool = chunker_engine._worker_pool
+            os.kill(next(iter(broken_pool._processes)), signal.SIGKILL)
+            for _ in range(100):
+                if broken_pool._broken:
+                    break
+                time.sleep(0.05)
+            
+            # Act
+            results = chunker.process_files(expand_inputs(str(input_dir)), progress=False)
+            
+            # Assert
+            assert broken_pool._broken
+            assert chunker_engine._worker_pool is not broken_pool
+            assert [error for _, _, error in results] == [None, None, None]
+        finally:
+            chunker_engine._worker_pool.shutdown()
+            chunker_engine._worker_pool = None
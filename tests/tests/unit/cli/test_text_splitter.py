@@ -0,0 +1,185 @@
+import pytest
+import sys
+import os
+import json
+
+# Make the CLI package importable
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../src')))
+
+from cli.text_splitter import split_text, find_boundaries, PARAGRAPH, SENTENCE
+from cli.chunker_engine import ChunkerEngine
+
+
+def count_tokens(text):
+    """Token counter matching the chunker's approximation"""
+    return len(text) // 4
+
+
+class TestTextSplitter:
+    """Test suite for splitting oversized text within a token budget"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.paragraphs = "\n\n".join(
+            " ".join(f"Sentence {p}.{s} has a few words in it." for s in range(8)) for p in range(12)
+        )
+        self.code = (
+            "Here is the fix.\n\n```python\n"
+            + "".join(f"value_{i} = compute(i). strip()  # step {i}\n" for i in range(60))
+            + "```\n\nThat should do it."
+        )
+    
+    def assert_covers(self, text, pieces, max_tokens):
+        """Check the pieces fit the budget and rejoin to the text"""
+        assert all(tokens <= max_tokens for _, _, tokens in pieces)
+        assert all(tokens == count_tokens(text[start:end]) for start, end, tokens in pieces)
+        assert "".join(text[start:end] for start, end, _ in pieces) == text
+        assert [end for _, end, _ in pieces[:-1]] == [start for start, _, _ in pieces[1:]]
+    
+    def test_text_within_budget_is_not_split(self):
+        """Test that text that already fits comes back whole"""
+        # Act
+        pieces = split_text("short text", count_tokens, 100)
+        
+        # Assert
+        assert pieces == [(0, 10, 2)]
+    
+    def test_prefers_paragraph_boundaries(self):
+        """Test that pieces end at paragraph breaks when one is available"""
+        # Arrange
+        max_tokens = 250
+        
+        # Act
+        pieces = split_text(self.paragraphs, count_tokens, max_tokens)
+        
+        # Assert
+        self.assert_covers(self.paragraphs, pieces, max_tokens)
+        assert len(pieces) > 1
+        assert all(self.paragraphs[start:end].endswith("\n\n") for start, end, _ in pieces[:-1])
+    
+    def test_falls_back_to_sentences(self):
+        """Test that a paragraph too long for the budget is cut at sentence ends"""
+        # Arrange
+        text = " ".join(f"Sentence {s} has a few words in it." for s in range(100))
+        max_tokens = 60
+        
+        # Act
+        pieces = split_text(text, count_tokens, max_tokens)
+        
+        # Assert
+        self.assert_covers(text, pieces, max_tokens)
+        assert all(text[start:end].endswith(". ") for start, end, _ in pieces[:-1])
+    
+    def test_code_blocks_are_cut_at_lines(self):
+        """Test that fenced code is cut at line breaks, not at periods inside it"""
+        # Arrange
+        max_tokens = 120
+        
+        # Act
+        boundaries = find_boundaries(self.code)
+        pieces = split_text(self.code, count_tokens, max_tokens)
+        
+        # Assert
+        fence_start = self.code.index("```")
+        fence_end = self.code.rindex("```")
+        assert not [pos for pos in boundaries[SENTENCE] if fence_start < pos < fence_end]
+        assert fence_start in boundaries[PARAGRAPH]
+        self.assert_covers(self.code, pieces, max_tokens)
+        assert all(self.code[start:end].endswith("\n") for start, end, _ in pieces[:-1])
+    
+    def test_text_without_boundaries_is_cut_anywhere(self):
+        """Test that text with no whitespace is still cut to the budget"""
+        # Arrange
+        text = "x" * 1000
+        
+        # Act
+        pieces = split_text(text, count_tokens, 30)
+        
+        # Assert
+        self.assert_covers(text, pieces, 30)
+    
+    def test_overhead_larger_than_budget(self):
+        """Test that text is returned whole when even an empty piece doesn't fit"""
+        # Arrange
+        text = "word " * 100
+        
+        # Act
+        pieces = split_text(text, lambda part: count_tokens(part) + 50, 40)
+        
+        # Assert
+        assert pieces == [(0, len(text), count_tokens(text) + 50)]
+
+
+class TestOversizedMessages:
+    """Test suite for chunking conversations with messages over the token limit"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.chunker = ChunkerEngine()
+        self.max_tokens = 200
+        self.long_message = "\n\n".join(
+            " ".join(f"Point {p}.{s} is worth making." for s in range(6)) for p in range(20)
+        )
+        self.conversations = [
+            {"id": "conv_0", "title": "Long answer",
+             "messages": [{"role": "user", "content": "Explain everything"},
+                          {"role": "assistant", "content": self.long_message},
+                          {"role": "user", "content": "Thanks"}]},
+            {"id": "conv_1", "title": "Long question",
+             "messages": [{"role": "user", "content": self.long_message},
+                          {"role": "assistant", "content": "Sure"}]},
+            {"id": "conv_2", "title": "Escaped text",
+             "messages": [{"role": "user", "content": "Ünïcödé ☃ text\twith \"quotes\" " * 60}]}
+        ]
+    
+    def rejoined(self, chunks, conv_id, role):
+        """Concatenate the message contents of one role in one conversation, across chunks"""
+        return "".join(
+            msg["content"]
+            for chunk in chunks for conv in chunk["conversations"] if conv["id"] == conv_id
+            for msg in conv["messages"] if msg["role"] == role
+        )
+    
+    @pytest.mark.parametrize("strategy", ["size", "role"])
+    def test_every_chunk_fits(self, strategy):
+        """Test that no chunk exceeds the limit when a message is bigger than it"""
+        # Act
+        chunks = getattr(self.chunker, f"chunk_by_{strategy}")(self.conversations, self.max_tokens)
+        
+        # Assert
+        for chunk in chunks:
+            assert chunk["token_count"] <= self.max_tokens
+            for conv in chunk["conversations"]:
+                assert self.chunker.count_tokens(json.dumps(conv["messages"][0])) <= self.max_tokens
+    
+    @pytest.mark.parametrize("strategy", ["size", "role"])
+    def test_emitted_conversations_fit_with_their_envelope(self, strategy):
+        """Test that split pieces fit the limit once serialized with id, title, marker and message list"""
+        # Arrange
+        max_tokens = 60
+        conversations = self.conversations + [
+            {"id": "conv_3", "title": "A rather long title that takes up a good part of the budget",
+             "messages": [{"role": "user", "content": f"Short message {i}"} for i in range(30)]}
+        ]
+        
+        # Act
+        chunks = getattr(self.chunker, f"chunk_by_{strategy}")(conversations, max_tokens)
+        
+        # Assert
+        for chunk in chunks:
+            for conv in chunk["conversations"]:
+                assert self.chunker.count_tokens(json.dumps(conv)) <= max_tokens
+            if len(chunk["conversations"]) == 1:
+                assert chunk["token_count"] == self.chunker.count_tokens(json.dumps(chunk["conversations"][0]))
+    
+    @pytest.mark.parametrize("strategy", ["size", "role"])
+    def test_split_message_rejoins(self, strategy):
+        """Test that the parts of a split message rejoin to the original content"""
+        # Act
+        chunks = getattr(self.chunker, f"chunk_by_{strategy}")(self.conversations, self.max_tokens)
+        
+        # Assert
+        assert self.rejoined(chunks, "conv_0", "assistant") == self.long_message
+        assert self.rejoined(chunks, "conv_1", "user") == self.long_message
+        assert self.rejoined(chunks, "conv_0", "user") == "Explain everythingThanks"
+        assert self.rejoined(chunks, "conv_2", "user") == self.conversations[2]["messages"][0]["content"]
@@ -0,0 +1,107 @@
+import pytest
+import sys
+import os
+import json
+import base64
+import datetime
+
+# Make the CLI package importable
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../src')))
+
+from cli import token_debugger
+from cli.token_debugger import TokenManager
+
+
+def make_jwt(claims):
+    """Build an unsigned JWT carrying claims"""
+    def segment(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip('=')
+    return f"{segment({'alg': 'none'})}.{segment(claims)}.signature"
+
+
+def expiring_in(seconds):
+    return (datetime.datetime.now() + datetime.timedelta(seconds=seconds)).isoformat()
+
+
+class TestTokenSnapshot:
+    """Test suite for the cached, decrypted view of the token file"""
+    
+    @pytest.fixture(autouse=True)
+    def setup_files(self, tmp_path, monkeypatch):
+        """Keep the salt and token files in tmp_path, and count decryptions"""
+        monkeypatch.setattr(token_debugger, "SALT_FILE", str(tmp_path / ".salt"))
+        token_debugger._snapshots.clear()
+        self.token_file = str(tmp_path / "auth" / "token.json")
+        self.loads = []
+        load_token = TokenManager.load_token
+        monkeypatch.setattr(TokenManager, "load_token",
+                            lambda manager: self.loads.append(manager.token_file) or load_token(manager))
+    
+    def save(self, seconds, **fields):
+        token_data = dict({"access_token": make_jwt({"sub": "user-1", "exp": 1}),
+                           "expires_at": expiring_in(seconds)}, **fields)
+        TokenManager(self.token_file).save_token(token_data, verbose=False)
+    
+    def test_snapshot_reused_until_file_changes(self):
+        """Test that the token file is decrypted once per version on disk"""
+        # Arrange
+        self.save(3600)
+        token_debugger._snapshots.clear()
+        manager = TokenManager(self.token_file)
+        
+        # Act
+        first = manager.snapshot()
+        second = TokenManager(self.token_file).snapshot()
+        self.save(7200, scope="read")
+        third = manager.snapshot()
+        
+        # Assert
+        assert second is first
+        assert len(self.loads) == 1
+        assert third is not first
+        assert third.data["scope"] == "read"
+        assert len(self.loads) == 1  # save_token cached the new version
+    
+    def test_status_queries(self):
+        """Test expiry queries on a snapshot"""
+        # Arrange
+        self.save(100)
+        snapshot = TokenManager(self.token_file).snapshot()
+        
+        # Act / Assert
+        assert not snapshot.expired
+        assert 95 <= snapshot.expiry_seconds <= 100
+        assert snapshot.expiring_soon()
+        assert not snapshot.expiring_soon(10)
+    
+    def test_claims_decoded_quietly(self, capsys):
+        """Test that claims are decoded once, and undecodable tokens don't print"""
+        # Arrange
+        self.save(3600)
+        snapshot = TokenManager(self.token_file).snapshot()
+        opaque = token_debugger.TokenSnapshot({"access_token": "not-a-jwt"})
+        
+        # Act
+        claims = snapshot.claims
+        
+        # Assert
+        assert claims == {"sub": "user-1", "exp": 1}
+        assert snapshot.claims is claims
+        assert opaque.claims == {"error": "Could not decode token"}
+        assert capsys.readouterr().out == ""
+    
+    def test_token_status_command(self, capsys):
+        """Test token-status exit codes"""
+        # Arrange
+        argv = ["--token-file", self.token_file, "token-status"]
+        
+        # Act
+        missing = token_debugger.main(argv)
+        self.save(3600)
+        valid = token_debugger.main(argv)
+        self.save(-10)
+        expired = token_debugger.main(argv)
+        
+        # Assert
+        assert (missing, valid, expired) == (1, 0, 2)
+        assert capsys.readouterr().out.splitlines()[-1] == "EXPIRED"
@@ -0,0 +1,239 @@
+import pytest
+import sys
+import os
+import json
+import time
+import datetime
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Make the CLI package importable
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../src')))
+
+from cli import token_debugger
+from cli.endpoint_tester import EndpointTester
+from cli.token_service import TokenService, TokenUnavailable
+
+
+class FakeAuthServer(ThreadingHTTPServer):
+    """Local OAuth token endpoint that issues access-N/refresh-N tokens"""
+    
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeAuthHandler)
+        self.requests = []
+        self.failures = 0  # Answer this many requests with a 500 first
+        self.delay = 0  # Seconds to wait before answering
+        self.expires_in = 3600
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+    
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class FakeAuthHandler(BaseHTTPRequestHandler):
+    """Answers token refreshes, and GETs that check the bearer token"""
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def reply(self, code, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        form = dict(urllib.parse.parse_qsl(self.rfile.read(length).decode()))
+        self.server.requests.append(form)
+        time.sleep(self.server.delay)
+        if self.server.failures:
+            self.server.failures -= 1
+            self.reply(500, {"error": "unavailable"})
+            return
+        issued = len(self.server.requests)
+        self.reply(200, {"access_token": f"access-{issued}", "refresh_token": f"refresh-{issued}",
+                         "token_type": "Bearer", "expires_in": self.server.expires_in})
+    
+    def do_GET(self):
+        latest = f"Bearer access-{len(self.server.requests)}"
+        self.reply(200 if self.headers["Authorization"] == latest else 401, {"path": self.path})
+
+
+def expiring_in(seconds):
+    return (datetime.datetime.now() + datetime.timedelta(seconds=seconds)).isoformat()
+
+
+class TestTokenService:
+    """Test suite for refreshing the token ahead of expiry"""
+    
+    @pytest.fixture(autouse=True)
+    def setup_files(self, tmp_path, monkeypatch):
+        """Keep the salt and token files in tmp_path, and start a fake auth server"""
+        monkeypatch.setattr(token_debugger, "SALT_FILE", str(tmp_path / ".salt"))
+        self.token_file = str(tmp_path / "auth" / "token.json")
+        self.manager = token_debugger.TokenManager(self.token_file)
+        self.server = FakeAuthServer()
+        yield
+        self.server.shutdown()
+        self.server.server_close()
+    
+    def save(self, seconds, refresh_token="refresh-0"):
+        """Save a token expiring in seconds"""
+        token_data = {"access_token": "access-0", "expires_at": expiring_in(seconds)}
+        if refresh_token:
+            token_data["refresh_token"] = refresh_token
+        self.manager.save_token(token_data, verbose=False)
+    
+    def service(self, **kwargs):
+        kwargs.setdefault("jitter", 0)
+        return TokenService(self.manager, self.server.url, **kwargs)
+    
+    def test_valid_token_cached(self):
+        """Test that a valid token is returned without a refresh"""
+        # Arrange
+        self.save(3600)
+        service = self.service()
+        
+        # Act
+        first = service.get_token()
+        second = service.get_token()
+        
+        # Assert
+        assert first["access_token"] == "access-0"
+        assert second is first
+        assert self.server.requests == []
+    
+    def test_expired_token_refreshed_inline(self):
+        """Test that an expired token is refreshed on the calling thread and saved"""
+        # Arrange
+        self.save(-10)
+        service = self.service()
+        
+        # Act
+        token = service.access_token()
+        
+        # Assert
+        assert token == "access-1"
+        assert self.server.requests == [{"grant_type": "refresh_token", "refresh_token": "refresh-0"}]
+        saved = self.manager.load_token()
+        assert saved["access_token"] == "access-1"
+        assert saved["refresh_token"] == "refresh-1"
+        assert not self.manager.snapshot().expired
+    
+    def test_refresh_scheduled_ahead_of_expiry(self):
+        """Test that the background thread refreshes a token before it expires"""
+        # Arrange
+        self.save(3)
+        service = self.service(margin=2.5)
+        refreshed = threading.Event()
+        service.add_listener(lambda token_data: refreshed.set())
+        
+        # Act
+        with service:
+            assert refreshed.wait(5)
+            token = service.access_token()
+        
+        # Assert
+        assert token == "access-1"
+        assert len(self.server.requests) == 1
+    
+    def test_waiting_jobs_share_one_refresh(self):
+        """Test that jobs waiting on an expired token are all served by a single refresh"""
+        # Arrange
+        self.save(-10)
+        self.server.delay = 0.2
+        service = self.service()
+        tokens = []
+        
+        # Act
+        with service:
+            jobs = [threading.Thread(target=lambda: tokens.append(service.access_token())) for _ in range(8)]
+            for job in jobs:
+                job.start()
+            for job in jobs:
+                job.join()
+        
+        # Assert
+        assert tokens == ["access-1"] * 8
+        assert len(self.server.requests) == 1
+    
+    def test_listener_can_get_token(self):
+        """Test that a listener calling get_token() doesn't deadlock on the refresh lock"""
+        # Arrange
+        self.save(-10)
+        service = self.service()
+        seen = []
+        service.add_listener(lambda token_data: seen.append(service.access_token()))
+        job = threading.Thread(target=service.get_token, daemon=True)
+        
+        # Act
+        job.start()
+        job.join(5)
+        
+        # Assert
+        assert not job.is_alive()
+        assert seen == ["access-1"]
+    
+    def test_failed_refresh_retried(self):
+        """Test that a failed refresh is retried after a backoff delay"""
+        # Arrange
+        self.save(-10)
+        self.server.failures = 2
+        service = self.service(retry_delays=[0.05])
+        
+        # Act
+        with service:
+            token = service.access_token(timeout=5)
+        
+        # Assert
+        assert token == "access-3"
+        assert len(self.server.requests) == 3
+    
+    def test_no_refresh_token(self):
+        """Test that an expired token without a refresh token can't be provided"""
+        # Arrange
+        self.save(-10, refresh_token=None)
+        service = self.service()
+        
+        # Act / Assert
+        with pytest.raises(TokenUnavailable, match="re-authenticate"):
+            service.get_token()
+        assert self.server.requests == []
+    
+    def test_token_rewritten_by_another_process(self):
+        """Test that a token saved by another process replaces the cached one"""
+        # Arrange
+        self.save(3600)
+        service = self.service()
+        service.get_token()
+        
+        # Act
+        token_data = {"access_token": "access-other", "expires_at": expiring_in(7200)}
+        token_debugger.TokenManager(self.token_file).save_token(token_data, verbose=False)
+        
+        # Assert
+        assert service.access_token() == "access-other"
+    
+    def test_endpoint_tester_refreshes_expired_token(self, tmp_path, monkeypatch, capsys):
+        """Test that endpoint tests refresh an expired token instead of aborting"""
+        # Arrange
+        self.save(-10)
+        monkeypatch.setenv("TOTAL_RECALL_TOKEN_URL", self.server.url)
+        endpoints_file = tmp_path / "endpoints.json"
+        endpoints_file.write_text(json.dumps([
+            {"name": name, "url": f"{self.server.url}/{name}", "method": "GET"} for name in ("a", "b")
+        ]))
+        tester = EndpointTester(self.token_file, str(endpoints_file))
+        
+        # Act
+        results = tester.test_all_endpoints()
+        
+        # Assert
+        assert [result["status_code"] for result in results] == [200, 200]
+        assert len(self.server.requests) == 1
+        assert "expired" not in capsys.readouterr().out
@@ -0,0 +1,155 @@
+import pytest
+import sys
+import os
+import re
+import base64
+
+# Make the CLI package importable
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../src')))
+
+from cli.tokenizer import BPETokenizer, Tokenizer, WORD_PATTERN, load_tokenizer
+from cli.chunk_cache import ChunkCache
+from cli.chunker_engine import ChunkerEngine
+
+
+MERGES = [b"he", b"ll", b"hell", b"hello", b" w", b" wo", b"or", b" wor", b" world"]
+
+
+def write_vocab(path, merges=MERGES):
+    """Write a vocabulary of every single byte plus the given merges"""
+    tokens = [bytes([i]) for i in range(256)] + merges
+    with open(path, 'w') as f:
+        for rank, token in enumerate(tokens):
+            f.write(f"{base64.b64encode(token).decode()} {rank}\n")
+    return str(path)
+
+
+class TestTokenizer:
+    """Test suite for the pluggable tokenizer backends"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.texts = ["hello world", "hello hello, world!", "", "héllo wörld 12345", "x = f(y)\n\n"]
+    
+    def test_heuristic_matches_character_estimate(self):
+        """Test that the heuristic backend counts one token per four characters"""
+        # Arrange
+        tokenizer = Tokenizer()
+        
+        # Act
+        counts = tokenizer.count_batch(self.texts)
+        
+        # Assert
+        assert counts == [len(text) // 4 for text in self.texts]
+        assert tokenizer.count("hello world") == 2
+    
+    def test_bpe_merges_by_rank(self, tmp_path):
+        """Test that the lowest-ranked pairs are merged first"""
+        # Arrange
+        tokenizer = BPETokenizer.from_file(write_vocab(tmp_path / "tiny.tiktoken"))
+        
+        # Act
+        tokens = tokenizer.encode("hello world")
+        
+        # Assert
+        assert tokens == [259, 264]
+        assert tokenizer.encode("help") == [256, ord("l"), ord("p")]
+        assert tokenizer.count("héllo") == 5  # h, two bytes for é, ll, o
+    
+    def test_partial_merge(self, tmp_path):
+        """Test that merging stops when no adjacent pair is in the vocabulary"""
+        # Arrange
+        tokenizer = BPETokenizer.from_file(write_vocab(tmp_path / "tiny.tiktoken", MERGES[:6]))
+        
+        # Act
+        tokens = tokenizer.encode(" world")
+        
+        # Assert
+        assert tokens == [261, ord("r"), ord("l"), ord("d")]
+    
+    def test_batch_matches_single_counts(self, tmp_path):
+        """Test that batch counting agrees with counting one text at a time"""
+        # Arrange
+        tokenizer = BPETokenizer.from_file(write_vocab(tmp_path / "tiny.tiktoken"))
+        
+        # Act
+        counts = tokenizer.count_batch(self.texts)
+        
+        # Assert
+        assert counts == [len(tokenizer.encode(text)) for text in self.texts]
+        assert counts == [tokenizer.count(text) for text in self.texts]
+    
+    def test_words_are_cached(self, tmp_path):
+        """Test that each distinct word is encoded only once"""
+        # Arrange
+        tokenizer = BPETokenizer.from_file(write_vocab(tmp_path / "tiny.tiktoken"))
+        merged = []
+        merge = tokenizer._merge
+        tokenizer._merge = lambda word: merged.append(word) or merge(word)
+        
+        # Act
+        tokenizer.count_batch(["hello world"] * 50 + ["hello there"])
+        
+        # Assert
+        assert merged == [b"hello", b" world", b" there"]
+    
+    def test_word_pattern_matches_cl100k_splits(self):
+        """Test that the pre-tokenizer splits text like cl100k_base"""
+        # Act
+        words = re.findall(WORD_PATTERN, "I'm here 12345 times!!\n\n  def _x():")
+        
+        # Assert
+        assert words == ["I", "'m", " here", " ", "123", "45", " times", "!!\n\n", " ", " def", " _", "x", "():"]
+    
+    def test_invalid_vocabulary(self, tmp_path):
+        """Test that a malformed vocabulary file is reported with its line"""
+        # Arrange
+        path = tmp_path / "bad.tiktoken"
+        path.write_text("aGk= 0\nnot a valid line\n")
+        
+        # Act / Assert
+        with pytest.raises(ValueError, match="line 2"):
+            BPETokenizer.from_file(str(path))
+    
+    def test_unknown_backend(self):
+        """Test that an unknown backend name is rejected"""
+        # Act / Assert
+        with pytest.raises(ValueError, match="Unknown tokenizer backend"):
+            load_tokenizer("sentencepiece")
+    
+    def test_loaded_tokenizer_reused_until_vocabulary_changes(self, tmp_path):
+        """Test that a tokenizer is shared, and reloaded once its vocabulary file is rewritten"""
+        # Arrange
+        vocab = write_vocab(tmp_path / "tiny.tiktoken")
+        
+        # Act
+        first = load_tokenizer("bpe", vocab)
+        second = load_tokenizer("bpe", vocab)
+        write_vocab(tmp_path / "tiny.tiktoken", MERGES[:1])
+        third = load_tokenizer("bpe", vocab)
+        
+        # Assert
+        assert second is first
+        assert third is not first
+        assert third.name != first.name
+        assert load_tokenizer("bpe", vocab) is third
+    
+    def test_engine_uses_tokenizer(self, tmp_path):
+        """Test that the chunker counts and caches with its tokenizer"""
+        # Arrange
+        vocab = write_vocab(tmp_path / "tiny.tiktoken")
+        conversations = [{"id": f"conv_{i}", "messages": [{"role": "user", "content": "hello world " * 40}]}
+                         for i in range(3)]
+        cache = ChunkCache(str(tmp_path / "cache.db"))
+        heuristic = ChunkerEngine(str(tmp_path / "processed"), cache)
+        bpe = ChunkerEngine(str(tmp_path / "processed"), cache, load_tokenizer("bpe", vocab))
+        
+        # Act
+        heuristic_chunks = heuristic.chunk_by_size(conversations, 10_000)
+        bpe_chunks = bpe.chunk_by_size(conversations, 10_000)
+        
+        # Assert
+        assert bpe.count_tokens("hello world") == 2
+        assert [chunk["token_count"] for chunk in heuristic_chunks] != [chunk["token_count"] for chunk in bpe_chunks]
+        assert cache.misses == 6
+        cache.close()
@@ -0,0 +1,104 @@
+import pytest
+import sys
+import os
+import re
+import json
+import subprocess
+
+# Make the CLI package importable
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../src'))
+sys.path.insert(0, SRC_DIR)
+
+from cli import total_recall
+
+
+def run_dispatcher(argv):
+    """Run the dispatcher in a fresh interpreter and report which heavy modules it loaded"""
+    code = (
+        "import sys, json\n"
+        "from cli import total_recall\n"
+        f"code = total_recall.main({argv!r})\n"
+        "heavy = ['numpy', 'requests', 'jwt', 'cryptography', 'tqdm', 'cli.chunker_engine', 'cli.token_debugger']\n"
+        "print(json.dumps({'code': code, 'loaded': [name for name in heavy if name in sys.modules]}))\n"
+    )
+    env = dict(os.environ, TOTAL_RECALL_SOCKET="")  # Never use a daemon the developer has running
+    result = subprocess.run([sys.executable, "-c", code], cwd=SRC_DIR, env=env, capture_output=True, text=True,
+                            check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestTotalRecall:
+    """Test suite for the total-recall command dispatcher"""
+    
+    def test_usage_lists_commands(self, capsys):
+        """Test that running without a command lists every command"""
+        # Act
+        code = total_recall.main([])
+        
+        # Assert
+        output = capsys.readouterr().out
+        assert code == 0
+        assert all(name in output for name in total_recall.COMMANDS)
+    
+    def test_unknown_command(self, capsys):
+        """Test that an unknown command is reported with a usage error"""
+        # Act
+        code = total_recall.main(["frobnicate"])
+        
+        # Assert
+        assert code == 2
+        assert "unknown command" in capsys.readouterr().err
+    
+    def test_commands_match_tools(self):
+        """Test that every command is defined by the tool it dispatches to"""
+        for name, (module, _) in total_recall.COMMANDS.items():
+            # Arrange
+            tool = total_recall.load_tool(module)
+            
+            # Act / Assert
+            with pytest.raises(SystemExit) as exit_info:
+                tool.main([name, "--help"])
+            assert exit_info.value.code == 0
+    
+    def test_command_is_first_positional_argument(self):
+        """Test that option values and later arguments aren't taken for the command"""
+        # Act / Assert
+        assert total_recall.find_command(["--token-file", "process", "token-status"]) == "token-status"
+        assert total_recall.find_command(["--output-dir=process", "--no-cache", "process-dir"]) == "process-dir"
+        assert total_recall.find_command(["ask-question", "--question", "process", "--file", "x"]) == "ask-question"
+        assert total_recall.find_command(["notes.json", "process"]) is None
+    
+    def test_value_options_match_tools(self, capsys):
+        """Test that every tool option taking a value is known to the dispatcher"""
+        for module in sorted({module for module, _ in total_recall.COMMANDS.values()}):
+            # Arrange
+            tool = total_recall.load_tool(module)
+            
+            # Act
+            with pytest.raises(SystemExit):
+                tool.main(["--help"])
+            options = set(re.findall(r"^  (--[\w-]+) [A-Z{]", capsys.readouterr().out, re.MULTILINE))
+            
+            # Assert
+            assert options and options <= total_recall.VALUE_OPTIONS, module
+    
+    def test_only_chosen_tool_is_imported(self, tmp_path):
+        """Test that a recall command doesn't load the chunker, HTTP or crypto modules"""
+        # Act
+        result = run_dispatcher(["--memory-dir", str(tmp_path), "list-memories"])
+        
+        # Assert
+        assert result == {"code": 0, "loaded": []}
+    
+    def test_chunker_command_skips_pool_and_progress_bar(self, tmp_path):
+        """Test that processing a single file doesn't load NumPy, tqdm or the token tools"""
+        # Arrange
+        source = tmp_path / "conversations.json"
+        source.write_text(json.dumps([{"id": "a", "messages": [{"role": "user", "content": "hi"}]}]))
+        
+        # Act
+        result = run_dispatcher(["--output-dir", str(tmp_path / "out"), "--no-cache",
+                                 "process", "--file", str(source)])
+        
+        # Assert
+        assert result == {"code": 0, "loaded": ["cli.chunker_engine"]}
@@ -0,0 +1,140 @@
+import pytest
+from unittest.mock import MagicMock
+import sys
+import os
+
+# Make the API package importable
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../api')))
+
+from app.services.browser_pool_service import BrowserPoolService
+
+
+def make_page():
+    """Create a mock page that behaves like an open, responsive page"""
+    page = MagicMock()
+    page.is_closed.return_value = False
+    page.evaluate.return_value = 1
+    return page
+
+
+class TestBrowserPoolService:
+    """Test suite for the browser pool service"""
+    
+    def setup_method(self):
+        """Set up test fixtures before each test method"""
+        self.playwright = MagicMock()
+        self.browser = self.playwright.start.return_value.chromium.launch.return_value
+        self.browser.is_connected.return_value = True
+        self.browser.new_context.side_effect = lambda: MagicMock(new_page=MagicMock(side_effect=make_page))
+        
+        self.pool = BrowserPoolService(max_contexts=2, playwright_factory=lambda: self.playwright)
+    
+    def test_pages_are_reused_across_leases(self):
+        """Test that a released page is handed out again without relaunching"""
+        # Act
+        with self.pool.lease("user_1", "session_token") as first_page:
+            pass
+        with self.pool.lease("user_1") as second_page:
+            pass
+        
+        # Assert
+        assert first_page is second_page
+        assert self.pool.stats["launches"] == 1
+        assert self.pool.stats["pages_created"] == 1
+        assert self.pool.stats["pages_reused"] == 1
+    
+    def test_session_cookie_is_set_on_new_context(self):
+        """Test that the session token is installed in the context"""
+        # Act
+        with self.pool.lease("user_1", "session_token"):
+            pass
+        
+        # Assert
+        context = self.pool._contexts["user_1"].context
+        cookie = context.add_cookies.call_args[0][0][0]
+        assert cookie["value"] == "session_token"
+    
+    def test_unhealthy_page_is_replaced(self):
+        """Test that a page failing the health check is discarded"""
+        # Arrange
+        with self.pool.lease("user_1") as page:
+            pass
+        page.is_closed.return_value = True
+        
+        # Act
+        with self.pool.lease("user_1") as new_page:
+            pass
+        
+        # Assert
+        assert new_page is not page
+        page.close.assert_called_once()
+    
+    def test_page_is_discarded_after_error(self):
+        """Test that a page from a failed job is not reused"""
+        # Act
+        with pytest.raises(RuntimeError):
+            with self.pool.lease("user_1"):
+                raise RuntimeError("job failed")
+        
+        # Assert
+        assert self.pool._contexts["user_1"].idle_pages == []
+    
+    def test_least_recently_used_session_is_evicted(self):
+        """Test that the pool keeps at most max_contexts sessions"""
+        # Act
+        for session_id in ["user_1", "user_2", "user_3"]:
+            with self.pool.lease(session_id):
+                pass
+        
+        # Assert
+        assert list(self.pool._contexts) == ["user_2", "user_3"]
+    
+    def test_browser_is_relaunched_when_disconnected(self):
+        """Test recovery from a crashed browser"""
+        # Arrange
+        with self.pool.lease("user_1"):
+            pass
+        self.browser.is_connected.return_value = False
+        
+        # Act
+        with self.pool.lease("user_1"):
+            pass
+        
+        # Assert
+        assert self.pool.stats["launches"] == 2
+    
+    def test_new_session_token_gets_new_context(self):
+        """Test that a changed session token replaces the session's context once its pages are returned"""
+        # Arrange
+        old_page = self.pool.acquire("user_1", "old_token")
+        old_context = self.pool._contexts["user_1"]
+        
+        # Act
+        with self.pool.lease("user_1", "new_token"):
+            pass
+        old_context.context.close.assert_not_called()
+        self.pool.release("user_1", old_page)
+        
+        # Assert
+        new_context = self.pool._contexts["user_1"]
+        assert new_context is not old_context
+        assert new_context.context.add_cookies.call_args[0][0][0]["value"] == "new_token"
+        old_context.context.close.assert_called_once()
+        old_page.close.assert_called_once()
+    
+    def test_release_after_session_closed(self):
+        """Test that a page leased before close_session doesn't affect the session's new context"""
+        # Arrange
+        stale_page = self.pool.acquire("user_1", "session_token")
+        self.pool.close_session("user_1")
+        page = self.pool.acquire("user_1", "session_token")
+        
+        # Act
+        self.pool.release("user_1", stale_page)
+        
+        # Assert
+        assert self.pool._contexts["user_1"].leased == 1
+        assert self.pool._contexts["user_1"].idle_pages == []
+        stale_page.close.assert_called_once()
+        self.pool.release("user_1", page)
+        assert self.pool._contexts["user_1"].leased == 0
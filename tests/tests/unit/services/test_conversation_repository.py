@@ -0,0 +1,105 @@
+import sys
+import os
+from datetime import datetime
+
+# Make the API package importable
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../api')))
+
+from app.services.conversation_repository import ConversationRepository
+
+
+class TestConversationRepository:
+    """Test suite for the shared conversation repository"""
+    
+    def setup_method(self):
+        """Set up test fixtures before each test method"""
+        self.conversations = [
+            {
+                "id": f"conv{i}",
+                "title": f"Conversation {i}",
+                "create_time": "2025-04-20T10:30:00",
+                "update_time": f"2025-04-2{i}T11:45:00",
+                "messages": [{"role": "user", "content": f"Message {i}"}]
+            }
+            for i in range(5)
+        ]
+        self.repository = ConversationRepository(self.conversations, cache_size=3)
+    
+    def test_get_parses_timestamps(self):
+        """Test that stored conversations come back parsed"""
+        # Act
+        conv = self.repository.get("conv1")
+        
+        # Assert
+        assert conv["title"] == "Conversation 1"
+        assert conv["create_time"] == datetime(2025, 4, 20, 10, 30)
+    
+    def test_get_missing_conversation(self):
+        """Test looking up an unknown conversation"""
+        assert self.repository.get("missing") is None
+    
+    def test_get_many_preserves_order_and_skips_unknown(self):
+        """Test batch lookup ordering"""
+        # Act
+        result = self.repository.get_many(["conv3", "missing", "conv0", "conv3"])
+        
+        # Assert
+        assert list(result) == ["conv3", "conv0"]
+    
+    def test_get_many_fetches_misses_in_one_round_trip(self):
+        """Test that cache misses are batched into a single fetch"""
+        # Arrange
+        calls = []
+        original_fetch = self.repository._fetch
+        self.repository._fetch = lambda ids: calls.append(list(ids)) or original_fetch(ids)
+        
+        # Act
+        self.repository.get_many(["conv0", "conv1", "conv2"])
+        self.repository.get_many(["conv0", "conv1", "conv2"])
+        
+        # Assert
+        assert calls == [["conv0", "conv1", "conv2"]]
+    
+    def test_cache_evicts_least_recently_used(self):
+        """Test LRU eviction"""
+        # Arrange
+        self.repository.get_many(["conv0", "conv1", "conv2"])
+        self.repository.get("conv0")
+        
+        # Act
+        self.repository.get("conv3")
+        
+        # Assert
+        assert list(self.repository._cache) == ["conv2", "conv0", "conv3"]
+    
+    def test_list_all_larger_than_cache(self):
+        """Test listing more conversations than the cache can hold"""
+        assert len(self.repository.list_all()) == 5
+    
+    def test_save_invalidates_cached_entry(self):
+        """Test that saving replaces the cached conversation"""
+        # Arrange
+        self.repository.get("conv1")
+        updated = dict(self.conversations[1], title="Renamed")
+        
+        # Act
+        self.repository.save(updated)
+        
+        # Assert
+        assert self.repository.get("conv1")["title"] == "Renamed"
+    
+    def test_owned_conversations_hidden_from_other_users(self):
+        """Test that lookups scoped to a user skip other users' conversations"""
+        # Arrange
+        self.repository.save(dict(self.conversations[0], id="alice_conv", owner="alice"))
+        
+        # Act
+        alice_ids = [conv["id"] for conv in self.repository.list_all("alice")]
+        bob_ids = [conv["id"] for conv in self.repository.list_all("bob")]
+        
+        # Assert
+        assert "alice_conv" in alice_ids
+        assert "alice_conv" not in bob_ids
+        assert len(bob_ids) == 5
+        assert self.repository.get("alice_conv", "bob") is None
+        assert self.repository.get("alice_conv") is not None
@@ -0,0 +1,259 @@
+import pytest
+import functools
+import sys
+import os
+import json
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import requests
+
+# Make the API package importable
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../api')))
+
+from jose import jwt
+
+from app.api.endpoints import conversations
+from app.services import conversation_sync_service
+from app.services.conversation_repository import ConversationRepository
+from app.services.conversation_sync_service import (
+    ConversationCache, ConversationSyncService, account_key, to_repository_record
+)
+
+
+class MockBackend:
+    """Local stand-in for the ChatGPT backend API"""
+    
+    def __init__(self, count):
+        self.conversations = {
+            f"conv_{i}": {"title": f"Conversation {i}", "update_time": 1650000000 + i}
+            for i in range(count)
+        }
+        self.detail_requests = []
+        self.list_requests = []
+        backend = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+            
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path == "/backend-api/conversations":
+                    params = parse_qs(url.query)
+                    offset, limit = int(params["offset"][0]), int(params["limit"][0])
+                    backend.list_requests.append(offset)
+                    ids = sorted(backend.conversations)
+                    body = {
+                        "items": [{"id": i, **backend.conversations[i]} for i in ids[offset:offset + limit]],
+                        "total": len(ids)
+                    }
+                elif url.path.startswith("/backend-api/conversation/"):
+                    conv_id = url.path.rsplit("/", 1)[1]
+                    backend.detail_requests.append(conv_id)
+                    conv = backend.conversations[conv_id]
+                    body = {
+                        "conversation_id": conv_id,
+                        "title": conv["title"],
+                        "update_time": conv["update_time"],
+                        "current_node": "n2",
+                        "mapping": {
+                            "n0": {"message": None, "parent": None},
+                            "n1": {"message": {"author": {"role": "user"}, "content": {"parts": ["Hi"]}}, "parent": "n0"},
+                            "n2": {"message": {"author": {"role": "assistant"}, "content": {"parts": ["Hello"]}}, "parent": "n1"}
+                        }
+                    }
+                else:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                payload = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+        
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/backend-api"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def backend():
+    mock_backend = MockBackend(25)
+    yield mock_backend
+    mock_backend.server.shutdown()
+
+
+class TestConversationSyncService:
+    """Test suite for the conversation sync service"""
+    
+    def make_service(self, backend, tmp_path):
+        return ConversationSyncService(
+            "mock_token_123",
+            base_url=backend.url,
+            cache=ConversationCache(str(tmp_path)),
+            page_size=10
+        )
+    
+    def test_initial_sync_fetches_everything(self, backend, tmp_path):
+        """Test the first sync pages through the list and fetches every conversation"""
+        # Act
+        result = self.make_service(backend, tmp_path).sync()
+        
+        # Assert
+        assert result["listed"] == 25
+        assert result["fetched"] == 25
+        assert sorted(backend.list_requests) == [0, 10, 20]
+        cached = ConversationCache(str(tmp_path)).load_conversation("conv_3")
+        assert [m["content"] for m in cached["messages"]] == ["Hi", "Hello"]
+    
+    def test_resync_only_fetches_changed(self, backend, tmp_path):
+        """Test that unchanged conversations are not fetched again"""
+        # Arrange
+        self.make_service(backend, tmp_path).sync()
+        backend.detail_requests.clear()
+        backend.conversations["conv_7"]["update_time"] += 100
+        
+        # Act
+        result = self.make_service(backend, tmp_path).sync()
+        
+        # Assert
+        assert backend.detail_requests == ["conv_7"]
+        assert result["fetched"] == 1
+        assert result["fetched_ids"] == ["conv_7"]
+        assert result["unchanged"] == 24
+    
+    def test_sync_drops_deleted_conversations(self, backend, tmp_path):
+        """Test that conversations removed upstream leave the cache"""
+        # Arrange
+        self.make_service(backend, tmp_path).sync()
+        del backend.conversations["conv_0"]
+        
+        # Act
+        result = self.make_service(backend, tmp_path).sync()
+        
+        # Assert
+        assert result["deleted"] == 1
+        assert result["deleted_ids"] == ["conv_0"]
+        assert ConversationCache(str(tmp_path)).load_conversation("conv_0") is None
+    
+    def test_cache_writes_leave_no_temporary_files(self, backend, tmp_path):
+        """Test that cache files are written through unique temporary files that are cleaned up"""
+        # Act
+        self.make_service(backend, tmp_path).sync()
+        
+        # Assert
+        leftovers = [name for _, _, names in os.walk(tmp_path) for name in names if name.endswith(".tmp")]
+        assert leftovers == []
+    
+    def test_cache_is_keyed_by_account(self, tmp_path, monkeypatch):
+        """Test that tokens of one account share a cache and other accounts get their own"""
+        # Arrange
+        monkeypatch.setattr(conversation_sync_service, "DEFAULT_CACHE_DIR", str(tmp_path))
+        first = jwt.encode({"sub": "user-1", "iat": 1}, "secret")
+        refreshed = jwt.encode({"sub": "user-1", "iat": 2}, "secret")
+        other = jwt.encode({"sub": "user-2", "iat": 1}, "secret")
+        
+        # Act
+        cache_dirs = [ConversationSyncService(token).cache.cache_dir for token in (first, refreshed, other)]
+        
+        # Assert
+        assert cache_dirs[0] == cache_dirs[1] == os.path.join(str(tmp_path), account_key(first))
+        assert cache_dirs[2] != cache_dirs[0]
+        assert account_key("not-a-jwt") != account_key("also-not-a-jwt")
+    
+    def test_sync_rejects_unsafe_ids(self, backend, tmp_path):
+        """Test that a conversation ID that would escape the cache directory is not fetched or written"""
+        # Arrange
+        backend.conversations["../../escape"] = {"title": "Escape", "update_time": 1650000000}
+        cache_dir = tmp_path / "cache"
+        service = ConversationSyncService("mock_token_123", base_url=backend.url,
+                                          cache=ConversationCache(str(cache_dir)), page_size=10)
+        
+        # Act
+        result = service.sync()
+        
+        # Assert
+        assert result["failed"] == [{"id": "../../escape", "reason": "Invalid conversation ID"}]
+        assert result["fetched"] == 25
+        assert "../../escape" not in backend.detail_requests
+        assert not (tmp_path / "escape.json").exists()
+        with pytest.raises(ValueError):
+            service.cache.save_conversation({"id": "../escape", "messages": []})
+    
+    def test_sync_closes_sessions(self, backend, tmp_path):
+        """Test that the per-thread HTTP sessions are closed when the sync ends"""
+        # Arrange
+        service = self.make_service(backend, tmp_path)
+        closed = []
+        original_close = requests.Session.close
+        
+        # Act
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            monkeypatch.setattr(requests.Session, "close",
+                                lambda session: closed.append(session) or original_close(session))
+            service.sync()
+        
+        # Assert
+        assert closed
+        assert service._sessions == []
+    
+    def test_repository_record(self):
+        """Test conversion of a synced conversation to the repository's record format"""
+        # Arrange
+        conversation = {"id": "conv_1", "title": None, "update_time": 1650000000, "messages": []}
+        
+        # Act
+        record = to_repository_record(conversation)
+        
+        # Assert
+        assert record["title"] == ""
+        assert record["create_time"] == record["update_time"] == datetime.fromtimestamp(1650000000).isoformat()
+        assert to_repository_record({"id": "conv_2", "messages": []}) is None
+
+
+class TestRunSync:
+    """Test suite for applying a sync to the conversation repository"""
+    
+    @pytest.fixture(autouse=True)
+    def isolate(self, backend, tmp_path, monkeypatch):
+        """Point the sync at the mock backend, a temporary cache and a fresh repository"""
+        self.backend = backend
+        self.repository = ConversationRepository()
+        monkeypatch.setattr(conversation_sync_service, "DEFAULT_CACHE_DIR", str(tmp_path))
+        monkeypatch.setattr(conversations, "ConversationSyncService",
+                            functools.partial(ConversationSyncService, base_url=backend.url, page_size=10))
+        monkeypatch.setattr(conversations, "conversation_repository", self.repository)
+        monkeypatch.setattr(conversations, "_loaded_caches", set())
+    
+    def test_only_changes_are_applied(self):
+        """Test that a resync saves the changed conversations and removes the deleted ones"""
+        # Arrange
+        conversations.run_sync("mock_token_123", "alice")
+        saved = []
+        original_save = self.repository.save
+        self.repository.save = lambda record: saved.append(record["id"]) or original_save(record)
+        self.backend.conversations["conv_7"]["update_time"] += 100
+        del self.backend.conversations["conv_0"]
+        
+        # Act
+        result = conversations.run_sync("mock_token_123", "alice")
+        
+        # Assert
+        assert saved == ["conv_7"]
+        assert "fetched_ids" not in result and "deleted_ids" not in result
+        assert self.repository.get("conv_0") is None
+        assert len(self.repository.list_all("alice")) == 24
+    
+    def test_synced_conversations_belong_to_the_user(self):
+        """Test that synced conversations are only listed for the user who synced them"""
+        # Act
+        conversations.run_sync("mock_token_123", "alice")
+        
+        # Assert
+        assert len(self.repository.list_all("alice")) == 25
+        assert self.repository.list_all("bob") == []
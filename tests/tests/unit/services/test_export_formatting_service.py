@@ -0,0 +1,154 @@
+import pytest
+import sys
+import os
+import io
+import csv
+import json
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# Make the API package importable
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../api')))
+
+from app.models.schemas import ExportFormat
+from app.services.export_formatting_service import format_export
+
+
+def make_conversations(count):
+    """Build conversations with content that needs escaping"""
+    return [
+        {
+            "id": f"conv_{i}",
+            "title": f"Conversation {i}, \"quoted\"",
+            "create_time": datetime(2023, 1, 1, 12, i),
+            "update_time": datetime(2023, 1, 2, 12, i),
+            "messages": [
+                {"role": "user", "content": f"Question {i}\nwith a newline"},
+                {"role": "assistant", "content": "Answer, with é, 日本語, 😀 and \"quotes\""}
+            ]
+        }
+        for i in range(count)
+    ]
+
+
+def reference_json(conversations, include_metadata):
+    """Format JSON for all conversations in one go"""
+    export_data = []
+    for conv in conversations:
+        item = {
+            "id": conv["id"],
+            "title": conv["title"],
+            "messages": [{"role": m["role"], "content": m["content"]} for m in conv["messages"]]
+        }
+        if include_metadata:
+            item["create_time"] = conv["create_time"].isoformat()
+            item["update_time"] = conv["update_time"].isoformat()
+        export_data.append(item)
+    return json.dumps(export_data, indent=2)
+
+
+def reference_csv(conversations, include_metadata):
+    """Format CSV for all conversations in one go"""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    header = ["Conversation ID", "Title", "Role", "Content"]
+    if include_metadata:
+        header.extend(["Create Time", "Update Time"])
+    writer.writerow(header)
+    for conv in conversations:
+        for msg in conv["messages"]:
+            row = [conv["id"], conv["title"], msg["role"], msg["content"]]
+            if include_metadata:
+                row.extend([conv["create_time"].isoformat(), conv["update_time"].isoformat()])
+            writer.writerow(row)
+    return output.getvalue()
+
+
+class TestFormatExport:
+    """Test suite for chunked export formatting"""
+    
+    def setup_method(self):
+        """Set up test fixtures before each test method"""
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="export-test")
+    
+    def teardown_method(self):
+        """Tear down test fixtures after each test method"""
+        self.executor.shutdown(wait=True)
+    
+    def format(self, conversations, format, include_metadata=True, chunk_size=2, on_progress=None):
+        """Run format_export on the test executor"""
+        return asyncio.run(format_export(
+            conversations, format, include_metadata,
+            chunk_size=chunk_size, executor=self.executor, on_progress=on_progress
+        ))
+    
+    @pytest.mark.parametrize("count", [0, 1, 2, 5])
+    @pytest.mark.parametrize("include_metadata", [True, False])
+    def test_json_matches_single_pass_output(self, count, include_metadata):
+        """Test that chunked JSON is byte-identical to dumping everything at once"""
+        # Arrange
+        conversations = make_conversations(count)
+        
+        # Act
+        content = self.format(conversations, ExportFormat.JSON, include_metadata)
+        
+        # Assert
+        assert content == reference_json(conversations, include_metadata)
+    
+    def test_json_escapes_non_ascii(self):
+        """Test that non-ASCII text is escaped as in json.dumps, and round-trips"""
+        # Arrange
+        conversations = make_conversations(1)
+        
+        # Act
+        content = self.format(conversations, ExportFormat.JSON)
+        
+        # Assert
+        assert content.isascii()
+        assert "\\u00e9" in content
+        assert "\\ud83d\\ude00" in content
+        assert json.loads(content)[0]["messages"][1]["content"] == conversations[0]["messages"][1]["content"]
+    
+    @pytest.mark.parametrize("include_metadata", [True, False])
+    def test_csv_matches_single_pass_output(self, include_metadata):
+        """Test that chunked CSV has one header and the same rows"""
+        # Arrange
+        conversations = make_conversations(5)
+        
+        # Act
+        content = self.format(conversations, ExportFormat.CSV, include_metadata)
+        
+        # Assert
+        assert content == reference_csv(conversations, include_metadata)
+    
+    def test_txt_contains_every_conversation_in_order(self):
+        """Test that TXT output keeps the conversation order across chunks"""
+        # Arrange
+        conversations = make_conversations(5)
+        
+        # Act
+        content = self.format(conversations, ExportFormat.TXT)
+        
+        # Assert
+        positions = [content.index(f"ID: conv_{i}\n") for i in range(5)]
+        assert positions == sorted(positions)
+        assert content.count("USER: Question") == 5
+    
+    def test_progress_is_reported_on_the_loop_per_chunk(self):
+        """Test that progress is reported from the loop thread after each chunk"""
+        # Arrange
+        conversations = make_conversations(5)
+        progress = []
+        loop_thread = threading.get_ident()
+        
+        def on_progress(fraction):
+            assert threading.get_ident() == loop_thread
+            progress.append(fraction)
+        
+        # Act
+        self.format(conversations, ExportFormat.TXT, on_progress=on_progress)
+        
+        # Assert
+        assert progress == [0.4, 0.8, 1.0]
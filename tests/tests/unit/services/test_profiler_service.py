@@ -0,0 +1,99 @@
+import pytest
+import sys
+import os
+import time
+import asyncio
+
+# Make the API package importable
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../api')))
+
+from app.services.profiler_service import (
+    SamplingProfiler, LoopLagProbe, ProfilerService, ProfilerBusyError
+)
+
+
+def busy_wait(seconds):
+    """Burn CPU so the sampler sees this frame"""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class TestSamplingProfiler:
+    """Test suite for the sampling profiler"""
+    
+    def test_collapsed_stacks_include_hot_function(self):
+        """Test that a busy function shows up in the collapsed stacks"""
+        # Arrange
+        profiler = SamplingProfiler(interval=0.001)
+        
+        # Act
+        profiler.start()
+        busy_wait(0.1)
+        profiler.stop()
+        lines = profiler.collapsed().splitlines()
+        
+        # Assert
+        assert profiler.samples > 0
+        hot = [line for line in lines if "busy_wait" in line]
+        assert hot
+        stack, count = hot[0].rsplit(" ", 1)
+        assert stack.startswith("MainThread;")
+        assert int(count) > 0
+        assert not any(line.startswith("sampling-profiler") for line in lines)
+
+
+class TestLoopLagProbe:
+    """Test suite for the event loop lag probe"""
+    
+    def test_blocking_call_shows_as_lag(self):
+        """Test that blocking the loop is reported as lag"""
+        # Arrange
+        probe = LoopLagProbe(interval=0.005)
+        
+        async def run():
+            probe.start()
+            await asyncio.sleep(0.02)
+            busy_wait(0.1)
+            await asyncio.sleep(0.02)
+            await probe.stop()
+        
+        # Act
+        asyncio.run(run())
+        summary = probe.summary()
+        
+        # Assert
+        assert summary["probes"] > 0
+        assert summary["max_ms"] >= 80
+
+
+class TestProfilerService:
+    """Test suite for the profiler service"""
+    
+    def setup_method(self):
+        """Set up test fixtures before each test method"""
+        self.service = ProfilerService()
+    
+    def test_profile_reports_stacks_and_lag(self):
+        """Test that a profile returns samples, stacks and loop lag"""
+        # Act
+        result = asyncio.run(self.service.profile(0.05, interval=0.002))
+        
+        # Assert
+        assert result["samples"] > 0
+        assert result["collapsed"]
+        assert result["loop_lag"]["probes"] > 0
+        assert not self.service.running
+    
+    def test_concurrent_profiles_are_rejected(self):
+        """Test that only one profile runs at a time"""
+        # Arrange
+        async def run():
+            first = asyncio.ensure_future(self.service.profile(0.05))
+            await asyncio.sleep(0)
+            with pytest.raises(ProfilerBusyError):
+                await self.service.profile(0.05)
+            await first
+        
+        # Act / Assert
+        asyncio.run(run())
@@ -0,0 +1,140 @@
+import pytest
+import sys
+import os
+import time
+import asyncio
+
+# Make the API package importable
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../api')))
+
+from app.services.progress_tracking_service import ALL_TASKS, ProgressHub
+
+
+class TestProgressHub:
+    """Test suite for the task progress pub/sub hub"""
+    
+    def setup_method(self):
+        """Set up test fixtures before each test method"""
+        self.sent = []
+        
+        async def sender(client_ids, event, data):
+            for client_id in sorted(client_ids):
+                self.sent.append((client_id, event, dict(data)))
+        
+        self.hub = ProgressHub(min_interval=0.05, sender=sender)
+    
+    def test_updates_are_filtered_by_task(self):
+        """Test that clients only receive updates for their tasks"""
+        async def scenario():
+            self.hub.subscribe("client_a", "task_1")
+            self.hub.subscribe("client_b", "task_2")
+            self.hub.publish("task_1", {"status": "processing", "progress": 0.1})
+            await asyncio.sleep(0.01)
+        
+        # Act
+        asyncio.run(scenario())
+        
+        # Assert
+        assert [client for client, _, _ in self.sent] == ["client_a"]
+    
+    def test_updates_are_coalesced(self):
+        """Test that a burst of updates produces at most one message per interval"""
+        async def scenario():
+            self.hub.subscribe("client_a", "task_1")
+            for i in range(100):
+                self.hub.publish("task_1", {"status": "processing", "progress": i / 100})
+            await asyncio.sleep(0.1)
+        
+        # Act
+        asyncio.run(scenario())
+        
+        # Assert
+        assert len(self.sent) == 2
+        assert self.sent[-1][2]["progress"] == 0.99
+    
+    def test_only_changed_fields_are_sent(self):
+        """Test delta encoding of updates"""
+        async def scenario():
+            self.hub.subscribe("client_a", "task_1")
+            self.hub.publish("task_1", {"status": "processing", "progress": 0.1, "message": "Working"})
+            await asyncio.sleep(0.06)
+            self.hub.publish("task_1", {"status": "processing", "progress": 0.2, "message": "Working"})
+            await asyncio.sleep(0.01)
+        
+        # Act
+        asyncio.run(scenario())
+        
+        # Assert
+        assert self.sent[-1][2] == {"progress": 0.2, "task_id": "task_1"}
+    
+    def test_terminal_state_is_sent_immediately(self):
+        """Test that completion is not delayed by coalescing"""
+        async def scenario():
+            self.hub.subscribe("client_a", "task_1")
+            self.hub.publish("task_1", {"status": "processing", "progress": 0.5})
+            self.hub.publish("task_1", {"status": "completed", "progress": 1.0})
+            await asyncio.sleep(0)
+        
+        # Act
+        asyncio.run(scenario())
+        
+        # Assert
+        assert self.sent[-1][2]["status"] == "completed"
+    
+    def test_subscribe_returns_snapshot(self):
+        """Test that late subscribers get the current state"""
+        # Arrange
+        self.hub.publish("task_1", {"status": "processing", "progress": 0.4})
+        
+        # Act
+        snapshot = self.hub.subscribe("client_a", "task_1")
+        
+        # Assert
+        assert snapshot == {"status": "processing", "progress": 0.4, "task_id": "task_1"}
+    
+    def test_user_only_receives_own_tasks(self):
+        """Test that a user's subscription doesn't deliver tasks owned by someone else"""
+        async def scenario():
+            self.hub.register("task_1", "alice")
+            self.hub.register("task_2", "bob")
+            self.hub.subscribe("client_a", "task_1", user="alice")
+            self.hub.subscribe("client_b", "task_1", user="bob")
+            self.hub.subscribe("admin", ALL_TASKS)
+            self.hub.publish("task_1", {"status": "processing", "progress": 0.1})
+            self.hub.publish("task_2", {"status": "processing", "progress": 0.1})
+            await asyncio.sleep(0.01)
+        
+        # Act
+        asyncio.run(scenario())
+        
+        # Assert
+        assert sorted((client, data["task_id"]) for client, _, data in self.sent) == [
+            ("admin", "task_1"), ("admin", "task_2"), ("client_a", "task_1")
+        ]
+        with pytest.raises(PermissionError):
+            self.hub.subscribe("client_b", "task_1", user="bob")
+        with pytest.raises(PermissionError):
+            self.hub.subscribe("client_b", ALL_TASKS, user="bob")
+    
+    def test_finished_tasks_are_forgotten(self):
+        """Test that per-task state is dropped after the terminal update and expires later"""
+        async def scenario():
+            self.hub.subscribe("client_a", "task_1")
+            self.hub.publish("task_1", {"status": "processing", "progress": 0.5})
+            await asyncio.sleep(0.01)
+            self.hub.publish("task_1", {"status": "completed", "progress": 1.0})
+            await asyncio.sleep(0.01)
+        
+        # Act
+        self.hub.finished_ttl = 0.05
+        asyncio.run(scenario())
+        late = self.hub.subscribe("client_b", "task_1")
+        time.sleep(0.06)
+        expired = self.hub.subscribe("client_c", "task_1")
+        
+        # Assert
+        assert self.sent[-1][2]["status"] == "completed"
+        assert self.hub._latest == self.hub._sent == self.hub._last_flush == {}
+        assert late["status"] == "completed"
+        assert expired is None
+        assert self.hub._finished == {}
@@ -0,0 +1,93 @@
+import pytest
+import sys
+import os
+import asyncio
+
+# Make the API package importable
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../api')))
+
+from app.services.pubsub_service import InProcessBroker, SQLiteBroker, create_broker
+
+
+class TestPubSubService:
+    """Test suite for the pub/sub backplane brokers"""
+    
+    def test_in_process_broker_delivers_locally(self):
+        """Test that the default broker hands events straight to the handler"""
+        received = []
+        
+        async def scenario():
+            broker = InProcessBroker()
+            
+            async def handler(channel, message):
+                received.append((channel, message))
+            
+            await broker.start(handler)
+            await broker.publish("progress", {"task_id": "task_1"})
+            await broker.stop()
+        
+        # Act
+        asyncio.run(scenario())
+        
+        # Assert
+        assert received == [("progress", {"task_id": "task_1"})]
+    
+    def test_sqlite_broker_fans_out_between_workers(self, tmp_path):
+        """Test that an event published by one worker reaches every worker"""
+        path = str(tmp_path / "events.db")
+        received = {"worker_a": [], "worker_b": []}
+        
+        async def scenario():
+            brokers = {name: SQLiteBroker(path, poll_interval=0.01) for name in received}
+            for name, broker in brokers.items():
+                async def handler(channel, message, name=name):
+                    received[name].append(message["n"])
+                await broker.start(handler)
+            
+            for n in range(5):
+                await brokers["worker_a"].publish("broadcast", {"n": n})
+            await asyncio.sleep(0.1)
+            
+            for broker in brokers.values():
+                await broker.stop()
+        
+        # Act
+        asyncio.run(scenario())
+        
+        # Assert
+        assert received["worker_a"] == [0, 1, 2, 3, 4]
+        assert received["worker_b"] == [0, 1, 2, 3, 4]
+    
+    def test_sqlite_broker_skips_history(self, tmp_path):
+        """Test that a worker starting later does not replay old events"""
+        path = str(tmp_path / "events.db")
+        received = []
+        
+        async def scenario():
+            first = SQLiteBroker(path, poll_interval=0.01)
+            await first.start(lambda channel, message: asyncio.sleep(0))
+            await first.publish("broadcast", {"n": 1})
+            
+            late = SQLiteBroker(path, poll_interval=0.01)
+            
+            async def handler(channel, message):
+                received.append(message["n"])
+            
+            await late.start(handler)
+            await first.publish("broadcast", {"n": 2})
+            await asyncio.sleep(0.05)
+            await first.stop()
+            await late.stop()
+        
+        # Act
+        asyncio.run(scenario())
+        
+        # Assert
+        assert received == [2]
+    
+    def test_create_broker_from_url(self, tmp_path):
+        """Test broker selection by URL"""
+        assert isinstance(create_broker("memory://"), InProcessBroker)
+        assert isinstance(create_broker(f"sqlite:///{tmp_path}/events.db"), SQLiteBroker)
+        with pytest.raises(ValueError):
+            create_broker("redis://localhost")
@@ -0,0 +1,117 @@
+import pytest
+import sys
+import os
+import io
+import json
+import logging
+
+# Make the API package importable
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../api')))
+
+from app.utils import logger as log_utils
+
+
+class TestQueueLogging:
+    """Test suite for the queue-based structured logging pipeline"""
+    
+    def setup_method(self):
+        """Set up test fixtures before each test method"""
+        root = logging.getLogger()
+        self.saved_handlers = list(root.handlers)
+        self.saved_level = root.level
+        self.stream = io.StringIO()
+    
+    def teardown_method(self):
+        """Restore the logging configuration after each test method"""
+        log_utils.stop_logging()
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        for handler in self.saved_handlers:
+            root.addHandler(handler)
+        root.setLevel(self.saved_level)
+        access_logger = logging.getLogger(log_utils.ACCESS_LOGGER_NAME)
+        for existing in list(access_logger.filters):
+            access_logger.removeFilter(existing)
+    
+    def read_lines(self):
+        """Flush the listener and parse the JSON lines written so far"""
+        log_utils.stop_logging()
+        return [json.loads(line) for line in self.stream.getvalue().splitlines()]
+    
+    def test_records_are_written_as_json_with_extra_fields(self):
+        """Test that records are formatted off the caller and keep extra fields"""
+        # Arrange
+        log_utils.configure_logging(stream=self.stream)
+        log_utils.start_logging()
+        
+        # Act
+        logging.getLogger("total_recall").info("Hello %s", "world", extra={"task_id": "t1"})
+        lines = self.read_lines()
+        
+        # Assert
+        assert lines[0]["message"] == "Hello world"
+        assert lines[0]["logger"] == "total_recall"
+        assert lines[0]["task_id"] == "t1"
+    
+    def test_records_written_directly_until_listener_starts(self):
+        """Test that nothing is queued while the listener isn't running"""
+        # Arrange
+        log_utils.configure_logging(stream=self.stream)
+        root = logging.getLogger()
+        
+        # Act
+        logging.getLogger("total_recall").warning("direct")
+        before_start = self.stream.getvalue()
+        log_utils.start_logging()
+        queued = any(isinstance(handler, log_utils.DeferredQueueHandler) for handler in root.handlers)
+        log_utils.stop_logging()
+        logging.getLogger("total_recall").warning("direct again")
+        
+        # Assert
+        assert json.loads(before_start)["message"] == "direct"
+        assert queued
+        assert not any(isinstance(handler, log_utils.DeferredQueueHandler) for handler in root.handlers)
+        assert json.loads(self.stream.getvalue().splitlines()[-1])["message"] == "direct again"
+    
+    def test_exception_is_rendered(self):
+        """Test that tracebacks survive the trip through the queue"""
+        # Arrange
+        log_utils.configure_logging(stream=self.stream)
+        log_utils.start_logging()
+        
+        # Act
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logging.getLogger("total_recall").exception("failed")
+        lines = self.read_lines()
+        
+        # Assert
+        assert "ValueError: boom" in lines[0]["exception"]
+    
+    def test_access_log_is_sampled_per_route(self):
+        """Test that sampled routes are dropped but errors are always kept"""
+        # Arrange
+        log_utils.configure_logging(stream=self.stream, sample_rates={"/health": 0.0})
+        log_utils.start_logging()
+        access_logger = logging.getLogger(log_utils.ACCESS_LOGGER_NAME)
+        
+        # Act
+        access_logger.info("health", extra={"route": "/health", "status": 200})
+        access_logger.info("health error", extra={"route": "/health", "status": 503})
+        access_logger.info("other", extra={"route": "/api/export/formats", "status": 200})
+        lines = self.read_lines()
+        
+        # Assert
+        assert [line["message"] for line in lines] == ["health error", "other"]
+    
+    def test_parse_sample_rates(self):
+        """Test parsing of route=rate pairs"""
+        # Act
+        rates = log_utils.parse_sample_rates("/health=0, /api/processing/process/{task_id}=0.25,")
+        
+        # Assert
+        assert rates == {"/health": 0.0, "/api/processing/process/{task_id}": 0.25}
+        with pytest.raises(ValueError):
+            log_utils.parse_sample_rates("0.5")
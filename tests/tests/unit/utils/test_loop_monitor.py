@@ -0,0 +1,70 @@
+import sys
+import os
+import time
+import asyncio
+
+# Make the API package importable
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../api')))
+
+from app.utils.loop_monitor import LoopMonitor, LOOP_LAG, SLOW_CALLBACKS
+
+
+def blocking_handler(seconds):
+    """Hold the event loop like CPU-bound code in a request handler"""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class TestLoopMonitor:
+    """Test suite for the event loop watchdog"""
+    
+    def setup_method(self):
+        """Set up test fixtures before each test method"""
+        self.monitor = LoopMonitor(interval=0.01, threshold=0.05)
+    
+    def run_with_monitor(self, body):
+        """Run a coroutine function with the monitor started"""
+        async def run():
+            self.monitor.start()
+            await asyncio.sleep(0.03)
+            await body()
+            await asyncio.sleep(0.03)
+            await self.monitor.stop()
+        asyncio.run(run())
+    
+    def test_blocking_callback_is_captured_with_stack(self):
+        """Test that a blocked loop records the blocking code's stack"""
+        # Arrange
+        before = SLOW_CALLBACKS.values.get((), 0)
+        
+        async def body():
+            blocking_handler(0.2)
+        
+        # Act
+        self.run_with_monitor(body)
+        recent = self.monitor.recent()
+        
+        # Assert
+        assert len(recent) == 1
+        assert "blocking_handler" in recent[0]["stack"]
+        assert recent[0]["duration"] >= 0.15
+        assert SLOW_CALLBACKS.values[()] == before + 1
+        assert not self.monitor.running
+    
+    def test_cooperative_code_is_not_reported(self):
+        """Test that code yielding to the loop doesn't count as slow"""
+        # Arrange
+        before = LOOP_LAG.snapshot()["count"]
+        
+        async def body():
+            for _ in range(10):
+                blocking_handler(0.005)
+                await asyncio.sleep(0)
+        
+        # Act
+        self.run_with_monitor(body)
+        
+        # Assert
+        assert self.monitor.recent() == []
+        assert LOOP_LAG.snapshot()["count"] > before
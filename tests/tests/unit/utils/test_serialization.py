@@ -0,0 +1,118 @@
+import pytest
+import sys
+import os
+import json
+import importlib
+from datetime import datetime
+from unittest.mock import patch
+
+# Make the API package and the CLI tools importable
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../api')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../src')))
+
+from app.models.schemas import ProcessingStatus, WebSocketMessage
+from app.utils import serialization
+from cli import serialization as cli_serialization
+
+
+@pytest.fixture(params=["default", "stdlib"])
+def backend(request):
+    """The serialization module with the installed backend, and with orjson hidden"""
+    if request.param == "default":
+        yield serialization
+        return
+    with patch.dict(sys.modules, {"orjson": None}):
+        yield importlib.reload(serialization)
+    importlib.reload(serialization)
+
+
+class TestSerialization:
+    """Test suite for the JSON serialization layer"""
+    
+    def test_compact_output_round_trips(self, backend):
+        """Test that output is compact and decodes to the same data"""
+        # Arrange
+        data = {"id": "conv1", "messages": [{"role": "user", "content": "héllo \"world\""}]}
+        
+        # Act
+        encoded = backend.dumps(data)
+        
+        # Assert
+        assert isinstance(encoded, bytes)
+        assert encoded.startswith(b'{"id":"conv1","messages":[{"role":"user",')
+        assert backend.loads(encoded) == data
+        assert "héllo".encode() in encoded
+    
+    def test_indented_output_matches_stdlib_layout(self, backend):
+        """Test that indent=True produces the familiar two-space layout"""
+        # Arrange
+        data = {"a": [1, {"b": None}], "c": "d"}
+        
+        # Act
+        encoded = backend.dumps_str(data, indent=True)
+        
+        # Assert
+        assert encoded == json.dumps(data, indent=2)
+    
+    def test_ensure_ascii_matches_stdlib(self, backend):
+        """Test that ensure_ascii escapes like json.dumps, including surrogate pairs"""
+        # Arrange
+        data = {"clé": ["héllo", "日本語", "😀", "plain"]}
+        
+        # Act
+        encoded = backend.dumps_str(data, indent=True, ensure_ascii=True)
+        
+        # Assert
+        assert encoded == json.dumps(data, indent=2)
+    
+    def test_api_types_are_encoded(self, backend):
+        """Test datetimes, enums and pydantic models"""
+        # Arrange
+        data = {
+            "time": datetime(2025, 4, 20, 10, 30, 15),
+            "status": ProcessingStatus.COMPLETED,
+            "message": WebSocketMessage(event="pong", data={"timestamp": 1})
+        }
+        
+        # Act
+        decoded = backend.loads(backend.dumps(data))
+        
+        # Assert
+        assert decoded == {
+            "time": "2025-04-20T10:30:15",
+            "status": "completed",
+            "message": {"event": "pong", "data": {"timestamp": 1}}
+        }
+    
+    def test_invalid_input_raises_stdlib_error(self, backend):
+        """Test that decode errors can be caught as json.JSONDecodeError"""
+        # Act / Assert
+        with pytest.raises(json.JSONDecodeError):
+            backend.loads("{not json")
+    
+    def test_response_class_renders_compact_json(self):
+        """Test the response class used by the API"""
+        # Act
+        response = serialization.FastJSONResponse({"status": "healthy", "items": [1, 2]})
+        
+        # Assert
+        assert response.body == b'{"status":"healthy","items":[1,2]}'
+        assert response.media_type == "application/json"
+    
+    def test_cli_copy_encodes_the_same(self):
+        """Test that the CLI's copy of the encoder produces the same output"""
+        # Arrange
+        data = {
+            "time": datetime(2025, 4, 20, 10, 30, 15),
+            "status": ProcessingStatus.COMPLETED,
+            "tags": ["日本語", "😀"],
+            1: None
+        }
+        
+        # Act / Assert
+        assert cli_serialization.BACKEND == serialization.BACKEND
+        assert cli_serialization.dumps(data) == serialization.dumps(data)
+        for indent in (False, True):
+            for ensure_ascii in (False, True):
+                assert (cli_serialization.dumps_str(data, indent, ensure_ascii)
+                        == serialization.dumps_str(data, indent, ensure_ascii))